@@ -10,42 +10,101 @@ MissionControl = dofile(spoonPath .. "/mission_control.lua")
 -- API для Space Manager
 --------------------------------------------------------------------------------
 
+-- Дисплеи в порядке Mission Control (SLSCopyManagedDisplaySpaces = мониторы в
+-- com.apple.spaces.plist) — тот же порядок, что у сквозных индексов в PyQt
+-- (space_core/identity.py); дисплеи, которых там нет, — в конце слева направо
+function orderedScreens()
+    local byUUID, rest = {}, {}
+    for _, scr in ipairs(hs.screen.allScreens()) do
+        byUUID[scr:getUUID()] = scr
+    end
+    local result, seen = {}, {}
+    for _, monitor in ipairs(hs.spaces.data_managedDisplaySpaces() or {}) do
+        local id = monitor["Display Identifier"]
+        local scr = id == "Main" and hs.screen.primaryScreen() or byUUID[id]
+        if scr and not seen[scr:getUUID()] and #(monitor.Spaces or {}) > 0 then
+            seen[scr:getUUID()] = true
+            table.insert(result, scr)
+        end
+    end
+    for uuid, scr in pairs(byUUID) do
+        if not seen[uuid] then table.insert(rest, scr) end
+    end
+    table.sort(rest, function(a, b) return a:frame().x < b:frame().x end)
+    for _, scr in ipairs(rest) do table.insert(result, scr) end
+    return result
+end
+
+-- Spaces всех дисплеев подряд: сквозной индекс (1-based) -> spaceId
+local function allSpaces()
+    local result, seen = {}, {}
+    for _, scr in ipairs(orderedScreens()) do
+        for _, sid in ipairs(hs.spaces.spacesForScreen(scr) or {}) do
+            if not seen[sid] then
+                seen[sid] = true
+                table.insert(result, sid)
+            end
+        end
+    end
+    return result
+end
+
+-- spaceId -> {screen UUID, номер дисплея, индекс Space на своём дисплее}
+local function spaceLocations()
+    local result = {}
+    for displayIndex, scr in ipairs(orderedScreens()) do
+        local uuid = scr:getUUID()
+        for idx, sid in ipairs(hs.spaces.spacesForScreen(scr) or {}) do
+            result[sid] = {display = uuid, displayIndex = displayIndex, index = idx}
+        end
+    end
+    return result
+end
+
+local function windowRecord(win, locations)
+    local app = win:application()
+    local sp = hs.spaces.windowSpaces(win)
+    local spaceId = sp and sp[1] or nil
+    local loc = spaceId and locations[spaceId] or nil
+    local scr = win:screen()
+    return {
+        id = win:id(),
+        app = app and app:name() or "unknown",
+        title = win:title() or "",
+        spaceId = spaceId,
+        -- Индекс Space на дисплее окна (раньше — только главного, иначе nil)
+        spaceIndex = loc and loc.index or nil,
+        display = loc and loc.display or (scr and scr:getUUID() or nil),
+        displayIndex = loc and loc.displayIndex or nil,
+        visible = win:isVisible(),
+        minimized = win:isMinimized()
+    }
+end
+
 -- Получить список всех окон с информацией о space
 function getWindowsJSON()
-    local windows = hs.window.allWindows()
+    local locations = spaceLocations()
     local result = {}
-    for _, win in ipairs(windows) do
-        local app = win:application()
-        local appName = app and app:name() or "unknown"
-        local sp = hs.spaces.windowSpaces(win)
-        local spaceId = sp and sp[1] or nil
-
-        -- Найти индекс space
-        local spaceIndex = nil
-        if spaceId then
-            local spaces = hs.spaces.spacesForScreen()
-            for idx, sid in ipairs(spaces) do
-                if sid == spaceId then
-                    spaceIndex = idx
-                    break
-                end
-            end
-        end
+    for _, win in ipairs(hs.window.allWindows()) do
+        table.insert(result, windowRecord(win, locations))
+    end
+    return hs.json.encode(result)
+end
 
-        table.insert(result, {
-            id = win:id(),
-            app = appName,
-            title = win:title() or "",
-            spaceId = spaceId,
-            spaceIndex = spaceIndex,
-            visible = win:isVisible(),
-            minimized = win:isMinimized()
-        })
+-- Окна одного дисплея (для параллельных запросов по дисплеям)
+function getDisplayWindowsJSON(screenUUID)
+    local locations = spaceLocations()
+    local result = {}
+    for _, win in ipairs(hs.window.allWindows()) do
+        local rec = windowRecord(win, locations)
+        if rec.display == screenUUID then
+            table.insert(result, rec)
+        end
     end
     return hs.json.encode(result)
 end
 
--- Получить информацию о spaces
+-- Получить информацию о spaces (главный дисплей + все дисплеи в displays)
 function getSpacesJSON()
     local spaces = hs.spaces.spacesForScreen()
     local focused = hs.spaces.focusedSpace()
@@ -58,17 +117,46 @@ function getSpacesJSON()
         end
     end
 
+    local active = hs.spaces.activeSpaces()  -- screen UUID -> текущий Space
+    local displays = {}
+    for displayIndex, scr in ipairs(orderedScreens()) do
+        local uuid = scr:getUUID()
+        table.insert(displays, {
+            uuid = uuid,
+            name = scr:name(),
+            index = displayIndex,
+            spaces = hs.spaces.spacesForScreen(scr) or {},
+            current = active[uuid],
+        })
+    end
+
     return hs.json.encode({
         spaces = spaces,
         focused = focused,
         focusedIndex = focusedIndex,
-        count = #spaces
+        count = #spaces,
+        displays = displays
     })
 end
 
--- Получить текущий focused space index (1-based)
+-- ID окон по каждому Space всех дисплеев — без переключения Spaces
+function getSpaceWindowIdsJSON()
+    local result = {}
+    for _, scr in ipairs(orderedScreens()) do
+        for _, sid in ipairs(hs.spaces.spacesForScreen(scr) or {}) do
+            local ids = hs.spaces.windowsForSpace(sid)
+            if ids == nil then
+                return hs.json.encode({success = false})
+            end
+            table.insert(result, {id = sid, windows = ids})
+        end
+    end
+    return hs.json.encode({success = true, spaces = result})
+end
+
+-- Получить текущий focused space index (1-based, сквозной по всем дисплеям)
 function getFocusedSpaceIndex()
-    local spaces = hs.spaces.spacesForScreen()
+    local spaces = allSpaces()
     local focused = hs.spaces.focusedSpace()
     for idx, sid in ipairs(spaces) do
         if sid == focused then
@@ -78,28 +166,62 @@ function getFocusedSpaceIndex()
     return 1
 end
 
--- Переместить окно на space по индексу (1-based)
-function moveWindowToSpace(windowId, spaceIndex)
+-- Перенести окно на Space по ManagedSpaceID (любой дисплей) через Mission Control
+local function moveWindowToSpaceById(win, spaceId)
+    if not spaceLocations()[spaceId] then
+        return false, "invalid space id"
+    end
+    local success, err = MissionControl:moveWindowToSpace(win, spaceId)
+    return success and true or false, err
+end
+
+-- Переместить окно на space по ManagedSpaceID
+function moveWindowToSpaceId(windowId, spaceId)
     local win = hs.window.get(windowId)
     if not win then
         return hs.json.encode({success = false, error = "window not found"})
     end
+    local success, err = moveWindowToSpaceById(win, spaceId)
+    return hs.json.encode({success = success, error = err})
+end
 
-    local spaces = hs.spaces.spacesForScreen()
-    if not spaces or spaceIndex < 1 or spaceIndex > #spaces then
+-- Переместить окно на space по сквозному индексу (1-based, все дисплеи)
+function moveWindowToSpace(windowId, spaceIndex)
+    local spaces = allSpaces()
+    if spaceIndex < 1 or spaceIndex > #spaces then
         return hs.json.encode({success = false, error = "invalid space index"})
     end
+    return moveWindowToSpaceId(windowId, spaces[spaceIndex])
+end
 
-    local spaceId = spaces[spaceIndex]
-    local success, err = MissionControl:moveWindowToSpace(win, spaceId)
-
-    return hs.json.encode({success = success, error = err})
+-- Переместить несколько окон за один вызов: moves = {{windowId, spaceId}, ...}
+-- spaceId — ManagedSpaceID любого дисплея (раскладки space_core.layouts, уже
+-- сгруппированы по целевому Space). Переносим, как mw/mwi, симуляцией Mission
+-- Control: hs.spaces.moveWindowToSpace на новых macOS ничего не делает, но
+-- сообщает об успехе
+function moveWindowsToSpaces(moves)
+    local locations = spaceLocations()
+    local results = {}
+    for _, move in ipairs(moves) do
+        local windowId, spaceId = move[1], move[2]
+        local win = hs.window.get(windowId)
+        local success, err = false, nil
+        if not win then
+            err = "window not found"
+        elseif not locations[spaceId] then
+            err = "invalid space id"
+        else
+            success, err = moveWindowToSpaceById(win, spaceId)
+        end
+        table.insert(results, {id = windowId, success = success and true or false, error = err})
+    end
+    return hs.json.encode({success = true, results = results})
 end
 
--- Переключиться на space по индексу
+-- Переключиться на space по сквозному индексу (все дисплеи)
 function gotoSpace(spaceIndex)
-    local spaces = hs.spaces.spacesForScreen()
-    if not spaces or spaceIndex < 1 or spaceIndex > #spaces then
+    local spaces = allSpaces()
+    if spaceIndex < 1 or spaceIndex > #spaces then
         return hs.json.encode({success = false, error = "invalid space index"})
     end
 
@@ -108,6 +230,12 @@ function gotoSpace(spaceIndex)
     return hs.json.encode({success = true})
 end
 
+-- Переключиться на space по ManagedSpaceID (любой дисплей)
+function gotoSpaceId(spaceId)
+    local ok, err = hs.spaces.gotoSpace(spaceId)
+    return hs.json.encode({success = ok and true or false, error = err})
+end
+
 -- Активировать окно
 function focusWindow(windowId)
     local win = hs.window.get(windowId)
@@ -123,8 +251,78 @@ function smListWindows() return getWindowsJSON() end
 function smListSpaces() return getSpacesJSON() end
 function smFocusedSpace() return getFocusedSpaceIndex() end
 function smMoveWindow(wid, idx) return moveWindowToSpace(wid, idx) end
+function smMoveWindowId(wid, sid) return moveWindowToSpaceId(wid, sid) end
+function smMoveWindows(moves) return moveWindowsToSpaces(moves) end
 function smGotoSpace(idx) return gotoSpace(idx) end
 function smFocusWindow(wid) return focusWindow(wid) end
+function smListDisplayWindows(uuid) return getDisplayWindowsJSON(uuid) end
+function smSpaceWindowIds() return getSpaceWindowIdsJSON() end
+function smGotoSpaceId(sid) return gotoSpaceId(sid) end
+function smFocusedSpaceId() return hs.spaces.focusedSpace() end
+
+-- Короткие имена (их вызывает PyQt Space Manager через hs -c)
+lw = smListWindows
+ls = smListSpaces
+fs = smFocusedSpace
+mw = smMoveWindow
+mwi = smMoveWindowId
+mwb = smMoveWindows
+dw = smListDisplayWindows
+sw = smSpaceWindowIds
+
+--------------------------------------------------------------------------------
+-- ПОСТОЯННЫЙ КАНАЛ: Unix-сокет, строки JSON (space_core/channel.py)
+-- Запрос {"id", "cmd", "args"} -> ответ {"id", "ok", "result"|"error"}.
+-- Быстрее hs -c: нет форка CLI и компиляции Lua на каждое действие.
+-- Только фиксированные команды — произвольный Lua через сокет не выполняем.
+--------------------------------------------------------------------------------
+
+local channelDir = os.getenv("HOME") .. "/.config/space-manager"
+local channelPath = channelDir .. "/hs.sock"
+hs.fs.mkdir(channelDir)
+
+local channelCommands = {
+    focus = function(wid) return hs.json.decode(focusWindow(wid)) end,
+    ["goto"] = function(idx) return hs.json.decode(gotoSpace(idx)) end,
+    gotoId = function(sid) return hs.json.decode(gotoSpaceId(sid)) end,
+    focused = function() return hs.spaces.focusedSpace() end,
+    focusedWindow = function()
+        local win = hs.window.focusedWindow()
+        return win and win:id() or 0
+    end,
+}
+
+local function channelReply(line)
+    local ok, request = pcall(hs.json.decode, line)
+    if not ok or type(request) ~= "table" then
+        return {ok = false, error = "bad json"}
+    end
+    local command = channelCommands[request.cmd]
+    if not command then
+        return {id = request.id, ok = false, error = "unknown command " .. tostring(request.cmd)}
+    end
+    local done, result = pcall(command, table.unpack(request.args or {}))
+    if not done then
+        return {id = request.id, ok = false, error = tostring(result)}
+    end
+    -- focus/goto возвращают {success, error}: неудача — ошибка канала
+    if type(result) == "table" and result.success == false then
+        return {id = request.id, ok = false, error = result.error or "failed"}
+    end
+    return {id = request.id, ok = true, result = result}
+end
+
+os.remove(channelPath)  -- сокет от прошлой загрузки конфига
+-- hs.socket.server не адресует клиента: write уходит всем подключённым.
+-- Поэтому id запроса уникален на клиента (pid + метка + номер, channel.py),
+-- и GUI с демоном отбрасывают чужие ответы
+SpaceManagerChannel = hs.socket.server(channelPath, function(data)
+    for line in data:gmatch("[^\n]+") do
+        SpaceManagerChannel:write(hs.json.encode(channelReply(line)) .. "\n")
+    end
+    SpaceManagerChannel:read("\n")
+end)
+SpaceManagerChannel:read("\n")
 
 print("Hammerspoon Space Manager backend ready!")
 
@@ -132,32 +330,44 @@ print("Hammerspoon Space Manager backend ready!")
 -- SPACES MENUBAR - Названия рабочих столов в меню баре
 --------------------------------------------------------------------------------
 
--- Файл для хранения названий
-local spaceNamesFile = os.getenv("HOME") .. "/.hammerspoon/space_names.json"
+-- Общий файл названий (его же читают PyQt Space Manager и SketchyBar)
+local spaceNamesDir = os.getenv("HOME") .. "/.config/space-manager"
+local spaceNamesFile = spaceNamesDir .. "/space_names.json"
+-- Старое место — читается, только пока общего файла ещё нет
+local legacySpaceNamesFile = os.getenv("HOME") .. "/.hammerspoon/space_names.json"
 
--- Загрузить названия из файла
-local function loadSpaceNames()
-    local file = io.open(spaceNamesFile, "r")
+-- Прочитать JSON-файл названий
+local function readNamesFile(path)
+    local file = io.open(path, "r")
     if file then
         local content = file:read("*all")
         file:close()
         local ok, data = pcall(hs.json.decode, content)
         if ok and data then return data end
     end
-    return {}
+    return nil
 end
 
--- Сохранить названия в файл
+-- Загрузить названия из файла
+local function loadSpaceNames()
+    return readNamesFile(spaceNamesFile) or readNamesFile(legacySpaceNamesFile) or {}
+end
+
+-- Сохранить названия атомарно: временный файл + rename
 local function saveSpaceNames(names)
-    local file = io.open(spaceNamesFile, "w")
+    hs.fs.mkdir(spaceNamesDir)
+    local tmp = spaceNamesFile .. ".tmp"
+    local file = io.open(tmp, "w")
     if file then
-        file:write(hs.json.encode(names))
+        file:write(hs.json.encode(names, true))
         file:close()
+        os.rename(tmp, spaceNamesFile)
     end
 end
 
 -- Глобальные переменные
 local spaceNames = loadSpaceNames()
+local spaceNamesMtime = hs.fs.attributes(spaceNamesFile, "modification")
 local spacesMenubar = hs.menubar.new()
 
 -- Получить название для Space
@@ -165,10 +375,32 @@ local function getSpaceName(index)
     return spaceNames[tostring(index)] or ("Desktop " .. index)
 end
 
+-- Отправить название в SketchyBar (без ожидания, если он не установлен — тихо)
+local function pushNameToSketchybar(index, name)
+    local bin = hs.fs.attributes("/opt/homebrew/bin/sketchybar") and "/opt/homebrew/bin/sketchybar"
+        or "/usr/local/bin/sketchybar"
+    if hs.fs.attributes(bin) then
+        hs.task.new(bin, nil, {"--set", "space." .. index, "icon=" .. name}):start()
+    end
+end
+
 -- Установить название для Space
 local function setSpaceName(index, name)
     spaceNames[tostring(index)] = name
     saveSpaceNames(spaceNames)
+    spaceNamesMtime = hs.fs.attributes(spaceNamesFile, "modification")
+    pushNameToSketchybar(index, name)
+end
+
+-- Перечитать названия, только если файл изменился; true — если перечитали
+local function reloadSpaceNamesIfChanged()
+    local mtime = hs.fs.attributes(spaceNamesFile, "modification")
+    if mtime == nil or mtime == spaceNamesMtime then
+        return false
+    end
+    spaceNamesMtime = mtime
+    spaceNames = readNamesFile(spaceNamesFile) or {}
+    return true
 end
 
 -- Получить окна для конкретного Space
@@ -291,6 +523,26 @@ spaceWatcher:start()
 -- Инициализация
 updateSpacesMenubar()
 
+-- Названия переименовали в другом фронтенде (PyQt / вручную):
+-- PyQt вызывает smReloadSpaceNames() через hs -c, pathwatcher — страховка
+function smReloadSpaceNames()
+    if reloadSpaceNamesIfChanged() then
+        updateSpacesMenubar()
+        if SidePanelVisible then updateSidePanel() end
+    end
+    return true
+end
+
+SpaceNamesWatcher = hs.pathwatcher.new(spaceNamesDir, function(paths)
+    for _, path in ipairs(paths) do
+        if path:sub(-#"space_names.json") == "space_names.json" then
+            smReloadSpaceNames()
+            return
+        end
+    end
+end)
+SpaceNamesWatcher:start()
+
 --------------------------------------------------------------------------------
 -- ВЫЕЗЖАЮЩАЯ ПАНЕЛЬ СПРАВА (как Dock)
 --------------------------------------------------------------------------------
@@ -0,0 +1,6 @@
+"""
+Бенчмарки Space Manager.
+
+Запуск из каталога pyqt/:
+    python -m benchmarks.bench_ui --spaces 16 --windows 12 --apps 8
+"""
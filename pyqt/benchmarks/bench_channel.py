@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк канала к бэкенду (space_core.channel): round-trip команды по
+постоянному Unix-сокету против запуска процесса на каждое действие.
+
+Процесс — /usr/bin/true: это нижняя граница стоимости `hs -c` (форк + exec
+без самого Hammerspoon), реальный hs -c заметно дороже.
+
+    cd pyqt && python -m benchmarks.bench_channel --calls 2000
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+
+from benchmarks import common
+from space_core.channel import BackendChannel, ChannelServer
+
+
+def run(calls: int, spawns: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sock")
+        server = ChannelServer(path, {"focus": lambda wid: {"success": True}}).start()
+        channel = BackendChannel(path)
+        try:
+            channel.call("focus", 1)  # подключение — вне замера
+            results["channel call"] = common.summarize(
+                common.measure(lambda: channel.call("focus", 12345), repeat=calls))
+        finally:
+            channel.close()
+            server.stop()
+    true = shutil.which("true")
+    if true:
+        results["process spawn (floor of hs -c)"] = common.summarize(
+            common.measure(lambda: subprocess.run([true], stdin=subprocess.DEVNULL), repeat=spawns))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark of the backend channel")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--spawns", type=int, default=200)
+    parser.add_argument("--json", metavar="PATH", help="записать результат в JSON ('-' — stdout)")
+    args = parser.parse_args(argv)
+
+    params = {"calls": args.calls, "spawns": args.spawns}
+    results = run(args.calls, args.spawns)
+    if args.json:
+        common.dump_json(args.json, "channel", results, params)
+    if args.json != "-":
+        common.print_table("Backend channel", results, params)
+
+
+if __name__ == "__main__":
+    main()
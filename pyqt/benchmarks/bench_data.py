@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк пути данных (без Qt и macOS): разбор ответа Hammerspoon, выборки
+из кэша окон, точечные обновления, группировка, индекс поиска и запросы.
+
+Рабочие столы синтетические (benchmarks.synthetic.make_desktop): от 1 до 25
+Spaces, от 10 до 10 000 окон, приложения по Ципфу, длинные и юникодные
+заголовки. Для каждой операции — ops/s, p50/p99 на операцию и пиковая память
+(tracemalloc, отдельным прогоном, чтобы не искажать время).
+
+    cd pyqt && python -m benchmarks.bench_data --grid 1x10,8x500,25x10000
+    python -m benchmarks.bench_data --json results.json
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import sys
+import tracemalloc
+
+from benchmarks import common, synthetic
+from space_core import backend
+from space_core.query import group_windows_by_app, iter_windows
+
+DEFAULT_GRID = "1x10,8x500,16x2000,25x10000"
+
+# Операций в одном замере для дешёвых точечных вызовов — иначе меряется таймер
+_LOOKUPS = 200
+_UPDATES = 20
+
+
+def parse_grid(text: str) -> list:
+    """"1x10,25x10000" -> [(1, 10), (25, 10000)]"""
+    grid = []
+    for cell in text.split(","):
+        spaces, windows = cell.lower().split("x")
+        grid.append((int(spaces), int(windows)))
+    return grid
+
+
+def cases(data: list, spaces: int, seed: int = 1) -> list:
+    """[(имя, fn, операций за вызов)] для рабочего стола data (уже в кэше)"""
+    rnd = random.Random(seed)
+    picks = [rnd.choice(data) for _ in range(_LOOKUPS)]
+    # Заголовок, обрезанный как в карточке, — путь частичного совпадения
+    truncated = [(w["app"], w["title"][:25]) for w in picks[:_UPDATES]]
+    as_cards = [{"app": w["app"], "title": w["title"], "window_id": w["id"]} for w in data]
+
+    def exact_lookups():
+        for w in picks:
+            backend.get_window_id_by_title(w["app"], w["title"])
+
+    def partial_lookups():
+        for app, title in truncated:
+            backend.get_window_id_by_title(app, title)
+
+    def updates():
+        for w in picks[:_UPDATES]:
+            backend.update_window_workspace_in_cache(w["id"], rnd.randint(1, spaces))
+
+    def search():
+        backend.get_search_index().search("window 1")
+
+    def query():
+        for _ in iter_windows(backend.get_snapshot(), app="Terminal,Safari", title="window"):
+            pass
+
+    return [
+        ("_parse_hammerspoon_windows", lambda: backend._parse_hammerspoon_windows(data), 1),
+        ("get_windows_by_workspace", backend.get_windows_by_workspace, 1),
+        ("get_window_id_by_title (exact)", exact_lookups, len(picks)),
+        ("get_window_id_by_title (partial)", partial_lookups, len(truncated)),
+        ("update_window_workspace_in_cache", updates, _UPDATES),
+        ("group_windows_by_app", lambda: group_windows_by_app(as_cards), 1),
+        ("search index: search (synced)", search, 1),
+        ("query.iter_windows (app+title)", query, 1),
+    ]
+
+
+def peak_memory(fn) -> int:
+    """Пик выделенной памяти за один вызов fn, байты"""
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return max(0, peak - base)
+
+
+def run(grid: list, apps: int, skew: float, repeat: int, seed: int = 0) -> dict:
+    results = {}
+    # Backend печатает строку на каждую операцию — в замер входит, в консоль нет
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        for spaces, windows in grid:
+            data = synthetic.make_desktop(spaces, windows, apps=apps, skew=skew, seed=seed)
+            backend._parse_hammerspoon_windows(data)
+            for name, fn, ops in cases(data, spaces):
+                samples = common.measure(fn, repeat)
+                stats = common.summarize([s / ops for s in samples])
+                stats["ops_per_s"] = round(ops * len(samples) / sum(samples), 1) if sum(samples) else 0.0
+                stats["peak_kb"] = round(peak_memory(fn) / 1024, 1)
+                results[f"{name} [{spaces}x{windows}]"] = stats
+    return results
+
+
+def print_results(results: dict, params: dict):
+    common.print_table("Data path (per operation)", results, params)
+    width = max(len(name) for name in results)
+    print(f"\n   {'benchmark'.ljust(width)}  {'ops/s':>12}  {'peak':>10}")
+    for name, stats in results.items():
+        print(f"   {name.ljust(width)}  {stats['ops_per_s']:12,.0f}  {stats['peak_kb']:8.1f}KB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic data-path benchmark")
+    parser.add_argument("--grid", default=DEFAULT_GRID, help="SPACESxWINDOWS через запятую")
+    parser.add_argument("--apps", type=int, default=20)
+    parser.add_argument("--skew", type=float, default=1.2, help="показатель Ципфа для приложений (0 — равномерно)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="записать результат в JSON ('-' — stdout)")
+    args = parser.parse_args(argv)
+
+    params = {"grid": args.grid, "apps": args.apps, "skew": args.skew, "repeat": args.repeat,
+              "seed": args.seed, "python": sys.version.split()[0]}
+    results = run(parse_grid(args.grid), args.apps, args.skew, args.repeat, args.seed)
+    if args.json:
+        common.dump_json(args.json, "data", results, params)
+    if args.json != "-":
+        print_results(results, params)
+
+
+if __name__ == "__main__":
+    main()
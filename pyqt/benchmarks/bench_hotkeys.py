@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк движка hotkeys (space_core.hotkeys): время Python на событие клавиатуры.
+
+Синтетический поток: обычный набор текста и редкие аккорды с автоповтором.
+pynput и Qt не нужны.
+
+    cd pyqt && python -m benchmarks.bench_hotkeys --events 200000
+"""
+
+import argparse
+import time
+
+from benchmarks import common, synthetic
+from space_core.hotkeys import HotkeyEngine, replay
+
+
+def run(events: int, chord_every: int, repeat: int) -> tuple:
+    stream = synthetic.key_stream(events, chord_every=chord_every, repeat=repeat)
+    fired = []
+    # Часы потока: ~100 событий в секунду, как при быстром наборе
+    tick = [0.0]
+    engine = HotkeyEngine(dispatch=lambda action, arg: fired.append((action, arg)), clock=lambda: tick[0])
+
+    samples = []
+    for kind, key in stream:
+        tick[0] += 0.01
+        t0 = time.perf_counter()
+        if kind == "down":
+            engine.press(key)
+        else:
+            engine.release(key)
+        samples.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    replay(HotkeyEngine(), stream)
+    elapsed = time.perf_counter() - t0
+
+    results = {"event (press/release)": common.summarize(samples)}
+    stats = dict(engine.stats(), events_per_s=round(len(stream) / elapsed))
+    return results, stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark of the hotkey engine")
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--chord-every", type=int, default=200, help="аккорд через столько клавиш")
+    parser.add_argument("--repeat", type=int, default=8, help="автоповторов на аккорд")
+    parser.add_argument("--json", metavar="PATH", help="записать результат в JSON ('-' — stdout)")
+    args = parser.parse_args(argv)
+
+    params = {"events": args.events, "chord_every": args.chord_every, "repeat": args.repeat}
+    results, stats = run(args.events, args.chord_every, args.repeat)
+    params["engine"] = stats
+    if args.json:
+        common.dump_json(args.json, "hotkeys", results, params)
+    if args.json != "-":
+        common.print_table("Hotkey engine", results, params)
+
+
+if __name__ == "__main__":
+    main()
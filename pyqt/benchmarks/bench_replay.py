@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк по записанной сессии (space_core.recording): реальные ответы
+Hammerspoon с реальной машины, воспроизведённые на любой (в т.ч. Linux).
+
+Запросы идут в исходном порядке через ReplayBackend (задержки бэкенда —
+исходные, ускоренные --speed или нулевые при --speed 0); ответы со списками
+окон проходят тот же путь, что в приложении: разбор JSON, публикация снимка,
+выборка окон по Spaces.
+
+    SPACE_MANAGER_RECORD=~/session.ndjson.gz ./space_manager_v2.py   # на маке
+    cd pyqt && python -m benchmarks.bench_replay ~/session.ndjson.gz --speed 0
+    python -m benchmarks.bench_replay --synthesize /tmp/s.ndjson.gz --windows 5000
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import time
+
+from benchmarks import common, synthetic
+from space_core import backend
+from space_core.recording import Recorder, ReplayBackend, load
+
+# Запросы, чей ответ — список окон (идёт в кэш)
+_WINDOW_LISTS = ("return lw()", "return dw(")
+
+
+def synthesize(path: str, spaces: int, windows: int, refreshes: int, latency: float):
+    """Записать «сессию» поддельного бэкенда: ls/lw при старте и refreshes обновлений"""
+    from space_core.fake import FakeHammerspoon
+    data = synthetic.make_desktop(spaces, windows)
+    fake = FakeHammerspoon(data, spaces=spaces, latency=latency)
+    recorder = Recorder(path)
+    hs_call = recorder.wrap_hs_call(fake.hs_call)
+    for i in range(refreshes + 1):
+        hs_call("return ls()")
+        hs_call("return lw()")
+        if i:
+            w = data[i % len(data)]
+            hs_call(f"return mw({w['id']}, {1 + i % spaces})")
+    recorder.close()
+    return recorder.count
+
+
+def replay_session(records: list, speed: float) -> dict:
+    """Один проход сессии: {"total", "wait", "process": [длительности обработки списков окон]}"""
+    replay = ReplayBackend(records, speed)
+    replay.install()
+    wait, process = 0.0, []
+    t_start = time.perf_counter()
+    for record in records:
+        t0 = time.perf_counter()
+        if record.get("kind") == "ch":
+            try:
+                replay.call(record["cmd"], *record["args"])
+            except Exception:
+                pass
+            wait += time.perf_counter() - t0
+            continue
+        output = replay.hs_call(record["req"])
+        t1 = time.perf_counter()
+        wait += t1 - t0
+        if not output:
+            continue
+        if record["req"].startswith(_WINDOW_LISTS):
+            backend._parse_hammerspoon_windows(json.loads(output))
+            backend.get_windows_by_workspace()
+            process.append(time.perf_counter() - t1)
+        else:
+            json.loads(output)
+    return {"total": time.perf_counter() - t_start, "wait": wait, "process": process}
+
+
+def run(path: str, speed: float, repeat: int) -> tuple:
+    header, records = load(path)
+    totals, waits, process = [], [], []
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        for _ in range(repeat):
+            result = replay_session(records, speed)
+            totals.append(result["total"])
+            waits.append(result["wait"])
+            process += result["process"]
+    results = {
+        "session total": common.summarize(totals),
+        "backend wait (replayed)": common.summarize(waits),
+        "window list: decode + cache + group": common.summarize(process),
+    }
+    params = {"records": len(records), "recorded_at": header.get("started"), "speed": speed, "repeat": repeat}
+    return results, params
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark against a recorded backend session")
+    parser.add_argument("recording", nargs="?", help="файл записи (.ndjson.gz)")
+    parser.add_argument("--speed", type=float, default=0.0, help="1 — исходные задержки, 0 — без задержек")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", metavar="PATH", help="записать результат в JSON ('-' — stdout)")
+    parser.add_argument("--synthesize", metavar="PATH", help="записать синтетическую сессию и выйти")
+    parser.add_argument("--spaces", type=int, default=16)
+    parser.add_argument("--windows", type=int, default=2000)
+    parser.add_argument("--refreshes", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="задержка hs -c в синтетической сессии, с")
+    args = parser.parse_args(argv)
+
+    if args.synthesize:
+        count = synthesize(args.synthesize, args.spaces, args.windows, args.refreshes, args.latency)
+        print(f"[REPLAY] {count} records written to {args.synthesize}")
+        return
+    if not args.recording:
+        parser.error("recording path required (or --synthesize PATH)")
+
+    results, params = run(args.recording, args.speed, args.repeat)
+    if args.json:
+        common.dump_json(args.json, "replay", results, params)
+    if args.json != "-":
+        common.print_table("Replayed session", results, params)
+
+
+if __name__ == "__main__":
+    main()
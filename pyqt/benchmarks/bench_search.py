@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк индекса поиска окон (space_core.search): задержка на нажатие клавиши.
+
+Имитирует набор запросов по символу на синтетическом рабочем столе
+и недавний фокус части окон. Qt и macOS-модули не нужны.
+
+    cd pyqt && python -m benchmarks.bench_search --windows 5000
+"""
+
+import argparse
+import random
+
+from benchmarks import common, synthetic
+from space_core.search import WindowSearchIndex
+
+QUERIES = ["chrome", "term space 3", "tlgrm", "code window 12", "zzzq", "window"]
+
+
+def keystroke_samples(index: WindowSearchIndex, queries: list, repeat: int) -> list:
+    """Время каждого префикса каждого запроса (как при наборе)"""
+    import time
+    samples = []
+    for _ in range(repeat):
+        for query in queries:
+            for i in range(1, len(query) + 1):
+                t0 = time.perf_counter()
+                index.search(query[:i])
+                samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def run(windows: int, spaces: int, apps: int, repeat: int) -> dict:
+    per_space = max(1, windows // spaces)
+    data = synthetic.make_windows(spaces, per_space, apps)
+    cache_like = [dict(w, workspace=str(w["spaceIndex"])) for w in data]
+
+    index = WindowSearchIndex()
+    results = {
+        "sync (cold build)": common.summarize(
+            common.measure(lambda: index.sync(cache_like), 1, warmup=0, setup=index.clear)),
+    }
+    index.sync(cache_like)
+    results["sync (no changes)"] = common.summarize(
+        common.measure(lambda: index.sync(cache_like), max(3, repeat // 4)))
+
+    rnd = random.Random(1)
+    for w in rnd.sample(data, min(200, len(data))):
+        index.touch(w["id"])
+
+    results["keystroke"] = common.summarize(keystroke_samples(index, QUERIES, repeat))
+
+    def touch_and_search():
+        index.touch(rnd.choice(data)["id"])
+        index.search("window 1")
+
+    results["touch + search"] = common.summarize(common.measure(touch_and_search, repeat * 10))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark of the window search index")
+    parser.add_argument("--windows", type=int, default=5000)
+    parser.add_argument("--spaces", type=int, default=16)
+    parser.add_argument("--apps", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", metavar="PATH", help="записать результат в JSON ('-' — stdout)")
+    args = parser.parse_args(argv)
+
+    params = {"windows": args.windows, "spaces": args.spaces, "apps": args.apps, "repeat": args.repeat}
+    results = run(args.windows, args.spaces, args.apps, args.repeat)
+    if args.json:
+        common.dump_json(args.json, "search", results, params)
+    if args.json != "-":
+        common.print_table("Window search index", results, params)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк старта по точкам входа: время процесса и импортов (-X importtime).
+
+Каждая точка входа запускается отдельным процессом `python -X importtime -c ...`
+несколько раз; меряется время процесса целиком и суммарное время импортов
+верхнего уровня, плюс самые тяжёлые модули — чтобы видеть, кто тянет
+Qt/фреймворки. Первый прогон (прогрев .pyc) в замер не входит.
+
+    cd pyqt && python -m benchmarks.bench_startup --repeat 10
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmarks import common
+
+PYQT_DIR = Path(__file__).resolve().parent.parent
+
+# Имя -> код, который выполняет точка входа до первой полезной работы
+ENTRY_POINTS = {
+    "headless query (space_core.backend)":
+        "import space_core.backend as b; b.get_snapshot(); b.get_spaces_count()",
+    "GUI module (space_manager_v2)":
+        "import space_manager_v2",
+    "headless CLI (space_manager_v2 list-spaces --fake)":
+        "import runpy, sys; sys.argv = ['space_manager_v2.py', 'list-spaces', '--fake']; "
+        "runpy.run_path('space_manager_v2.py', run_name='__main__')",
+}
+
+# Модули, которых не должно быть в headless-старте
+HEAVY = ("PyQt6", "AppKit", "Foundation", "Quartz", "objc", "pynput")
+
+
+def parse_importtime(stderr: str) -> tuple:
+    """(сумма импортов верхнего уровня в мс, {модуль: собственное время в мс})"""
+    total_us, self_us = 0, {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_part, cumulative, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        self_us[module] = self_us.get(module, 0) + int(self_part)
+        if not name[1:].startswith(" "):  # отступ = вложенный импорт
+            total_us += int(cumulative)
+    return total_us / 1000, {k: v / 1000 for k, v in self_us.items()}
+
+
+def run_entry(code: str, repeat: int) -> tuple:
+    env = dict(os.environ, QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # иначе каждый прогон компилирует исходники заново
+    cmd = [sys.executable, "-X", "importtime", "-c", code]
+    wall, imports, modules = [], [], {}
+    for i in range(repeat + 1):
+        t0 = time.perf_counter()
+        proc = subprocess.run(cmd, cwd=PYQT_DIR, env=env, capture_output=True, text=True)
+        elapsed = time.perf_counter() - t0
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+        if i == 0:
+            continue  # прогрев
+        total_ms, self_ms = parse_importtime(proc.stderr)
+        wall.append(elapsed)
+        imports.append(total_ms / 1000)
+        modules = self_ms
+    return wall, imports, modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Startup benchmark per entry point")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--top", type=int, default=5, help="сколько самых тяжёлых модулей показать")
+    parser.add_argument("--json", metavar="PATH", help="записать результат в JSON ('-' — stdout)")
+    args = parser.parse_args(argv)
+
+    results, params = {}, {"repeat": args.repeat, "python": sys.version.split()[0]}
+    heaviest = {}
+    for name, code in ENTRY_POINTS.items():
+        try:
+            wall, imports, modules = run_entry(code, args.repeat)
+        except RuntimeError as e:
+            print(f"[STARTUP] {name}: failed: {e}", file=sys.stderr)
+            continue
+        results[f"{name}: process"] = common.summarize(wall)
+        results[f"{name}: imports"] = common.summarize(imports)
+        top = sorted(modules.items(), key=lambda kv: kv[1], reverse=True)[:args.top]
+        heaviest[name] = {
+            "top_self_ms": {k: round(v, 2) for k, v in top},
+            "heavy_loaded": [m for m in HEAVY if m in modules],
+        }
+    params["modules"] = heaviest
+
+    if args.json:
+        common.dump_json(args.json, "startup", results, params)
+    if args.json != "-":
+        common.print_table("Startup", results, {"repeat": params["repeat"], "python": params["python"]})
+        for name, info in heaviest.items():
+            top = ", ".join(f"{k} {v}ms" for k, v in info["top_self_ms"].items())
+            print(f"   {name}: heavy={info['heavy_loaded'] or '-'}; top: {top}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Headless-бенчмарк UI сетки Space Manager v2.
+
+Запускает SpaceManager под QT_QPA_PLATFORM=offscreen с синтетическим набором
+окон и меряет rebuild_grid, refresh_apps_from_cache, set_apps одной карточки
+и полную отрисовку сетки в QImage. На Linux macOS-модули подменяются
+заглушками из benchmarks.macos_stubs.
+
+    cd pyqt && python -m benchmarks.bench_ui --spaces 16 --windows 12 --apps 8
+"""
+
+import argparse
+import contextlib
+import math
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from benchmarks import common, macos_stubs, synthetic
+
+
+def _load_app_module():
+    """Импортировать space_manager_v2 с заглушками вместо недоступных фреймворков"""
+    macos_stubs.install()
+    pyqt_dir = str(Path(__file__).resolve().parent.parent)
+    if pyqt_dir not in sys.path:
+        sys.path.insert(0, pyqt_dir)
+    import space_manager_v2
+    return space_manager_v2
+
+
+def build_manager(sm, spaces: int, config_dir: str):
+    """Создать SpaceManager с нужным числом Spaces и конфигом во временном каталоге"""
+    sm.CONFIG_DIR = Path(config_dir)
+    sm.CONFIG_PATH = sm.CONFIG_DIR / "config.json"
+    sm.SETTINGS_PATH = sm.CONFIG_DIR / "settings.json"
+    sm.STATE_PATH = sm.CONFIG_DIR / "state.log"
+    sm.NAMES_PATH = sm.CONFIG_DIR / "space_names.json"
+    sm.get_spaces_count = lambda: spaces
+
+    window = sm.SpaceManager()
+    rows, cols = window.config["rows"], window.config["cols"]
+    if rows * cols < spaces:
+        cols = math.ceil(math.sqrt(spaces))
+        rows = math.ceil(spaces / cols)
+        window.config["rows"], window.config["cols"] = rows, cols
+        window.rebuild_grid()
+    return window
+
+
+def run(spaces: int, per_space: int, apps: int, repeat: int, verbose: bool = False,
+        thumbnails: bool = False) -> dict:
+    """Прогнать все замеры, вернуть {имя: статистика}"""
+    from PyQt6.QtCore import QCoreApplication, QEvent
+    from PyQt6.QtGui import QImage, QPainter
+    from PyQt6.QtWidgets import QApplication
+
+    sm = _load_app_module()
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    # Приложение печатает лог на каждый виджет — в замеры он входит,
+    # но в консоль бенчмарка не попадает
+    sink = sys.stdout if verbose else open(os.devnull, "w")
+    results = {}
+
+    def flush_deleted():
+        QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+        app.processEvents()
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(sink):
+        from space_core import backend
+        backend._parse_hammerspoon_windows(synthetic.make_windows(spaces, per_space, apps))
+        if thumbnails:
+            from space_core.thumbnails import FakeThumbnailSource
+            sm.set_thumbnail_source(FakeThumbnailSource())
+        window = build_manager(sm, spaces, tmp)
+        window.show()
+        flush_deleted()
+
+        results["rebuild_grid"] = common.summarize(
+            common.measure(window.rebuild_grid, repeat, setup=flush_deleted))
+
+        results["refresh_apps_from_cache"] = common.summarize(
+            common.measure(window.refresh_apps_from_cache, repeat, setup=flush_deleted))
+
+        card = window.space_cards[1]
+        card_windows = sm.get_windows_by_workspace().get("1", [])
+        results["set_apps (1 card)"] = common.summarize(
+            common.measure(lambda: card.set_apps(card_windows), repeat, setup=flush_deleted))
+
+        grid = window.grid_widget
+        image = QImage(grid.size(), QImage.Format.Format_ARGB32_Premultiplied)
+
+        def paint_grid():
+            image.fill(0)
+            painter = QPainter(image)
+            grid.render(painter)
+            painter.end()
+
+        results["paint grid -> QImage"] = common.summarize(
+            common.measure(paint_grid, repeat, setup=app.processEvents))
+
+        def hide():
+            window.hide()
+            flush_deleted()
+
+        def show():
+            # Путь hotkey: показ, обновление из кэша и первая отрисовка
+            window.show_and_raise()
+            app.processEvents()
+
+        results["show (hidden -> painted)"] = common.summarize(common.measure(show, repeat, setup=hide))
+
+        if thumbnails:
+            loader = sm.get_thumbnail_loader()
+
+            def cold_thumbnails():
+                window.refresh_apps_from_cache()
+                loader.wait_idle()
+
+            def reset_thumbnails():
+                flush_deleted()
+                loader.reset()
+
+            results["thumbnails cold (grid)"] = common.summarize(
+                common.measure(cold_thumbnails, repeat, setup=reset_thumbnails))
+
+        window.hide()
+        window.flush_config()
+
+    if sink is not sys.stdout:
+        sink.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless benchmark of the Space Manager grid")
+    parser.add_argument("--spaces", type=int, default=16, help="количество Spaces")
+    parser.add_argument("--windows", type=int, default=12, help="окон на каждый Space")
+    parser.add_argument("--apps", type=int, default=8, help="различных приложений")
+    parser.add_argument("--repeat", type=int, default=20, help="повторов на замер")
+    parser.add_argument("--thumbnails", action="store_true",
+                        help="включить синтетические миниатюры и замерить их холодную загрузку")
+    parser.add_argument("--json", metavar="PATH", help="записать результат в JSON ('-' — stdout)")
+    parser.add_argument("--verbose", action="store_true", help="не глушить лог приложения")
+    args = parser.parse_args(argv)
+
+    params = {"spaces": args.spaces, "windows": args.windows, "apps": args.apps, "repeat": args.repeat}
+    results = run(args.spaces, args.windows, args.apps, args.repeat, args.verbose, args.thumbnails)
+
+    if args.json:
+        common.dump_json(args.json, "ui", results, params)
+    if args.json != "-":
+        common.print_table("Space grid (offscreen)", results, params)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Бюджеты производительности и сравнение с базовой линией.
+
+Запускает нужные наборы из benchmarks/budgets.json (каждый — отдельным
+процессом, --rounds раз), берёт медиану метрики по прогонам и сравнивает:
+
+  * с бюджетом (абсолютный потолок, "max") — превышение = ошибка;
+  * с базовой линией (benchmarks/baseline.json) — регрессия, если рост
+    больше порога. Порог учитывает шум: max(tolerance_pct, 2 × разброс
+    прогонов) — разброс берётся больший из текущего и базового.
+
+Код выхода 1 — есть регрессия или превышение бюджета.
+
+    cd pyqt && python -m benchmarks.check                    # проверка
+    python -m benchmarks.check --update-baseline             # обновить базовую линию
+    python -m benchmarks.check --suite data --rounds 5
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PYQT_DIR = BENCH_DIR.parent
+BUDGETS_PATH = BENCH_DIR / "budgets.json"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+
+
+def load_budgets(path=BUDGETS_PATH) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run_suite(spec: dict) -> dict:
+    """Один прогон набора: {бенчмарк: статистика} из его --json"""
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "result.json")
+        cmd = [sys.executable, "-m", spec["module"], *spec.get("args", []), "--json", out]
+        proc = subprocess.run(cmd, cwd=PYQT_DIR, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{spec['module']}: {(proc.stderr.strip().splitlines() or ['failed'])[-1]}")
+        with open(out, "r", encoding="utf-8") as f:
+            return json.load(f)["results"]
+
+
+def metric_value(results: dict, budget: dict):
+    stats = results.get(budget["benchmark"])
+    if stats is None or budget["metric"] not in stats:
+        return None
+    return stats[budget["metric"]] / budget.get("per", 1)
+
+
+def measure(config: dict, rounds: int, suites=None, log=print) -> dict:
+    """{имя бюджета: {"value": медиана, "noise": относительный разброс, "samples": [...]}}"""
+    budgets = [b for b in config["budgets"] if not suites or b["suite"] in suites]
+    samples = {b["name"]: [] for b in budgets}
+    for suite in sorted({b["suite"] for b in budgets}):
+        for i in range(rounds):
+            t0 = time.perf_counter()
+            results = run_suite(config["suites"][suite])
+            log(f"[CHECK] {suite}: round {i + 1}/{rounds} ({time.perf_counter() - t0:.1f}s)")
+            for budget in budgets:
+                if budget["suite"] == suite:
+                    value = metric_value(results, budget)
+                    if value is not None:
+                        samples[budget["name"]].append(value)
+    measured = {}
+    for name, values in samples.items():
+        if not values:
+            log(f"[CHECK] {name}: benchmark missing in results")
+            continue
+        median = statistics.median(values)
+        noise = (max(values) - min(values)) / median if median else 0.0
+        measured[name] = {"value": median, "noise": round(noise, 4), "samples": values}
+    return measured
+
+
+def compare(config: dict, measured: dict, baseline: dict) -> list:
+    """Строки сравнения: (имя, база, сейчас, изменение %, порог %, бюджет, статус)"""
+    tolerance = config.get("tolerance_pct", 10)
+    base_values = baseline.get("values", {}) if baseline else {}
+    rows = []
+    for budget in config["budgets"]:
+        name = budget["name"]
+        if name not in measured:
+            continue
+        current = measured[name]
+        base = base_values.get(name)
+        delta = threshold = None
+        status = "ok"
+        if base and base["value"]:
+            delta = (current["value"] - base["value"]) / base["value"] * 100
+            threshold = max(tolerance, 200 * max(current["noise"], base.get("noise", 0.0)))
+            if delta > threshold:
+                status = "REGRESSION"
+            elif delta < -threshold:
+                status = "improved"
+        elif baseline:
+            status = "new"
+        if budget.get("max") is not None and current["value"] > budget["max"]:
+            status = "OVER BUDGET" if status != "REGRESSION" else "REGRESSION, OVER BUDGET"
+        rows.append((name, base["value"] if base else None, current["value"], delta, threshold,
+                     budget.get("max"), status))
+    return rows
+
+
+def format_rows(rows: list) -> list:
+    def num(value):
+        return "-" if value is None else f"{value:.3f}"
+
+    width = max((len(r[0]) for r in rows), default=10)
+    lines = [f"   {'budget'.ljust(width)}  {'baseline':>10}  {'current':>10}  {'change':>8}  "
+             f"{'limit':>7}  {'max':>9}  status"]
+    for name, base, current, delta, threshold, limit, status in rows:
+        change = "-" if delta is None else f"{delta:+.1f}%"
+        noise = "-" if threshold is None else f"±{threshold:.0f}%"
+        marker = "✗" if status.isupper() or "REGRESSION" in status else " "
+        lines.append(f" {marker} {name.ljust(width)}  {num(base):>10}  {num(current):>10}  {change:>8}  "
+                     f"{noise:>7}  {num(limit):>9}  {status}")
+    return lines
+
+
+def write_baseline(measured: dict, path=BASELINE_PATH, previous: dict = None):
+    """Сохранить базовую линию; значения других наборов (не запускались) остаются"""
+    values = dict((previous or {}).get("values", {}))
+    values.update({name: {"value": m["value"], "noise": m["noise"]} for name, m in measured.items()})
+    payload = {"updated": time.strftime("%Y-%m-%d %H:%M:%S"), "python": sys.version.split()[0],
+               "platform": platform.platform(), "values": values}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Performance budgets and baseline comparison")
+    parser.add_argument("--budgets", default=str(BUDGETS_PATH))
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--rounds", type=int, default=3, help="прогонов каждого набора (медиана и разброс)")
+    parser.add_argument("--suite", action="append", help="только эти наборы (можно несколько раз)")
+    parser.add_argument("--update-baseline", action="store_true", help="записать результат как базовую линию")
+    parser.add_argument("--json", metavar="PATH", help="записать измерения и сравнение в JSON")
+    args = parser.parse_args(argv)
+
+    config = load_budgets(args.budgets)
+    baseline = None
+    if Path(args.baseline).exists():
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    try:
+        measured = measure(config, args.rounds, args.suite)
+    except RuntimeError as e:
+        print(f"[CHECK] Suite failed: {e}", file=sys.stderr)
+        return 2
+
+    rows = compare(config, measured, baseline)
+    print(f"\n== Performance budgets ({args.rounds} rounds, baseline: "
+          f"{baseline.get('updated') if baseline else 'none'}) ==")
+    for line in format_rows(rows):
+        print(line)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"measured": measured, "rows": rows}, f, indent=2, ensure_ascii=False)
+    if args.update_baseline:
+        write_baseline(measured, args.baseline, baseline)
+        print(f"\n[CHECK] Baseline updated: {args.baseline}")
+        return 0
+
+    failed = [r for r in rows if "REGRESSION" in r[6] or "OVER BUDGET" in r[6]]
+    if failed:
+        print(f"\n[CHECK] {len(failed)} budget(s) failed: " + ", ".join(r[0] for r in failed))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Общие помощники бенчмарков: замер, статистика, вывод.
+"""
+
+import json
+import statistics
+import time
+
+
+def measure(fn, repeat: int = 20, warmup: int = 1, setup=None) -> list:
+    """
+    Выполнить fn() repeat раз, вернуть длительности в секундах.
+
+    setup() вызывается перед каждым прогоном и в замер не входит.
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def percentile(sorted_samples: list, q: float) -> float:
+    """Перцентиль (0..100) по уже отсортированному списку"""
+    if not sorted_samples:
+        return 0.0
+    idx = min(len(sorted_samples) - 1, max(0, round(q / 100 * (len(sorted_samples) - 1))))
+    return sorted_samples[idx]
+
+
+def summarize(samples: list) -> dict:
+    """Статистика по замерам (в миллисекундах)"""
+    s = sorted(samples)
+    ms = 1000.0
+    return {
+        "n": len(s),
+        "min_ms": s[0] * ms if s else 0.0,
+        "p50_ms": percentile(s, 50) * ms,
+        "p99_ms": percentile(s, 99) * ms,
+        "max_ms": s[-1] * ms if s else 0.0,
+        "mean_ms": statistics.fmean(s) * ms if s else 0.0,
+    }
+
+
+def print_table(title: str, results: dict, params: dict = None):
+    """Человекочитаемая таблица: имя -> статистика"""
+    print(f"\n== {title} ==")
+    if params:
+        print("   " + ", ".join(f"{k}={v}" for k, v in params.items()))
+    width = max((len(name) for name in results), default=10)
+    print(f"   {'benchmark'.ljust(width)}  {'min':>9}  {'p50':>9}  {'p99':>9}  {'mean':>9}")
+    for name, st in results.items():
+        print(f"   {name.ljust(width)}  {st['min_ms']:8.3f}ms {st['p50_ms']:8.3f}ms "
+              f"{st['p99_ms']:8.3f}ms {st['mean_ms']:8.3f}ms")
+
+
+def dump_json(path: str, title: str, results: dict, params: dict = None):
+    """Машиночитаемый результат ('-' — stdout)"""
+    payload = {"suite": title, "params": params or {}, "results": results}
+    text = json.dumps(payload, indent=2, ensure_ascii=False)
+    if path == "-":
+        print(text)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
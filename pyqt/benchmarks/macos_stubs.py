@@ -0,0 +1,156 @@
+"""
+Заглушки macOS-фреймворков для запуска на Linux (бенчмарки, offscreen).
+
+install() регистрирует в sys.modules минимальные AppKit, Foundation, objc,
+Quartz и pynput — только те, что не удалось импортировать по-настоящему.
+Заглушки ничего не умеют: нет запущенных приложений, нет иконок, нет окон.
+"""
+
+import importlib
+import sys
+import types
+
+
+class _Null:
+    """Объект, который на любой вызов/атрибут отвечает пустотой"""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __call__(self, *args, **kwargs):
+        return None
+
+    def __getattr__(self, name):
+        return _Null()
+
+    def __bool__(self):
+        return False
+
+    def __iter__(self):
+        return iter(())
+
+
+class _Workspace:
+    """Стенд-ин для NSWorkspace: приложений нет, путей нет"""
+
+    @classmethod
+    def sharedWorkspace(cls):
+        return cls()
+
+    def runningApplications(self):
+        return []
+
+    def fullPathForApplication_(self, name):
+        return None
+
+    def iconForFile_(self, path):
+        return None
+
+    def frontmostApplication(self):
+        return None
+
+
+def _make_appkit():
+    mod = types.ModuleType("AppKit")
+    mod.NSWorkspace = _Workspace
+    mod.NSImage = _Null
+    mod.NSBitmapImageRep = _Null()
+    mod.NSPNGFileType = 4
+    mod.NSRunningApplication = _Null
+    return mod
+
+
+def _make_foundation():
+    mod = types.ModuleType("Foundation")
+    mod.NSURL = _Null
+    mod.NSData = _Null
+    return mod
+
+
+def _make_objc():
+    mod = types.ModuleType("objc")
+    mod.objc_object = lambda *args, **kwargs: []
+    return mod
+
+
+def _make_quartz():
+    mod = types.ModuleType("Quartz")
+    mod.CGWindowListCopyWindowInfo = lambda options, relative_to: []
+    mod.kCGWindowListOptionOnScreenOnly = 1
+    mod.kCGWindowListOptionAll = 0
+    mod.kCGWindowListExcludeDesktopElements = 16
+    mod.kCGNullWindowID = 0
+    mod.CGWindowListCreateImage = lambda *args: None
+    mod.CGRectNull = None
+    mod.kCGWindowListOptionIncludingWindow = 8
+    mod.kCGWindowImageBoundsIgnoreFraming = 1
+    mod.kCGWindowImageNominalResolution = 16
+    return mod
+
+
+def _make_pynput():
+    mod = types.ModuleType("pynput")
+    kb = types.ModuleType("pynput.keyboard")
+
+    class Key:
+        ctrl = "ctrl"
+        ctrl_l = "ctrl_l"
+        ctrl_r = "ctrl_r"
+        alt = "alt"
+        cmd = "cmd"
+        shift = "shift"
+
+    class Listener:
+        def __init__(self, on_press=None, on_release=None):
+            self.on_press = on_press
+            self.on_release = on_release
+            self.daemon = True
+
+        def start(self):
+            pass
+
+        def stop(self):
+            pass
+
+    kb.Key = Key
+    kb.Listener = Listener
+    mod.keyboard = kb
+    return {"pynput": mod, "pynput.keyboard": kb}
+
+
+_FACTORIES = {
+    "AppKit": _make_appkit,
+    "Foundation": _make_foundation,
+    "objc": _make_objc,
+    "Quartz": _make_quartz,
+}
+
+
+def install(force: bool = False) -> list:
+    """
+    Подставить заглушки для недоступных macOS-модулей.
+
+    force=True — подставить всегда (даже на Mac), чтобы замеры не зависели
+    от реальных иконок и системы. Возвращает список подменённых модулей.
+    """
+    replaced = []
+    for name, factory in _FACTORIES.items():
+        if not force:
+            try:
+                __import__(name)
+                continue
+            except Exception:
+                pass
+        sys.modules[name] = factory()
+        replaced.append(name)
+
+    need_pynput = force
+    if not force:
+        try:
+            importlib.import_module("pynput.keyboard")  # без X/Quartz бэкенда падает при импорте
+        except Exception:
+            need_pynput = True
+    if need_pynput:
+        sys.modules.update(_make_pynput())
+        replaced.append("pynput")
+    return replaced
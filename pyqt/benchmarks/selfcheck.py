@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Самопроверки ядра на фикстурах (без macOS): утверждения о поведении, а не замеры.
+
+    cd pyqt && python -m benchmarks.selfcheck              # все наборы
+    python -m benchmarks.selfcheck topology                # только один
+
+topology — SpaceTopology на plist из benchmarks.synthetic: списки Spaces по
+дисплеям, кэш по stat (попадание и промах), пустой результат без plist и без
+запуска `defaults`.
+layouts — планировщик раскладок (space_core.layouts) на снимках BackendSnapshot
+из benchmarks.synthetic: ровно неуместные окна переносятся по одному разу,
+окна на месте не трогаются, группировка по целевому Space, при совпадении
+нескольких шаблонов заголовка решает первое правило.
+
+Код выхода 1 — хотя бы одна проверка не прошла.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+class Checker:
+    """Счётчик проверок: check(условие, описание) не прерывает набор"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.passed = 0
+        self.failures = []
+
+    def check(self, condition, description: str):
+        if condition:
+            self.passed += 1
+        else:
+            self.failures.append(description)
+
+    def report(self) -> bool:
+        status = "ok" if not self.failures else f"{len(self.failures)} FAILED"
+        print(f"[SELFCHECK] {self.name}: {self.passed} passed, {status}", flush=True)
+        for failure in self.failures:
+            print(f"[SELFCHECK]   FAIL {failure}", flush=True)
+        return not self.failures
+
+
+def _bump_mtime(path: Path):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def check_topology(c: Checker):
+    from benchmarks.synthetic import write_spaces_plist
+    from space_core.topology import SpaceTopology
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "com.apple.spaces.plist"
+        write_spaces_plist(path, spaces_per_display=(4, 3, 2), fullscreen=1, seed=7)
+        topology = SpaceTopology(path)
+
+        # Списки по дисплеям
+        displays = topology.displays()
+        c.check(len(displays) == 3, f"3 displays, got {len(displays)}")
+        c.check([len(d.spaces) for d in displays] == [4, 3, 2], "spaces per display 4/3/2")
+        c.check([s.managed_id for d in displays for s in d.spaces] == list(range(101, 110)),
+                "ManagedSpaceID 101..109 in plist order")
+        c.check(displays[0].display_id == "Main", "first monitor is 'Main'")
+        c.check(displays[0].spaces[0].uuid == "", "default Space has empty uuid")
+        c.check([s.fullscreen for s in displays[0].spaces] == [False, False, False, True],
+                "last main Space is fullscreen")
+        c.check(not any(s.fullscreen for d in displays[1:] for s in d.spaces), "no fullscreen on other displays")
+        c.check(displays[1].current_id == 105, f"current Space of display 2 is 105, got {displays[1].current_id}")
+        c.check(topology.total() == 9 and topology.count(0) == 4 and topology.count(2) == 2,
+                "total()/count()")
+        c.check(topology.count(5) == 0, "count() of a missing display is 0")
+        c.check([s.managed_id for s in topology.main_spaces()] == [101, 102, 103, 104], "main_spaces()")
+
+        # Кэш: тот же stat — без разбора
+        parses = topology.parses
+        c.check(topology.displays() is displays and topology.parses == parses, "cache hit: no reparse")
+        c.check(not topology.changed(), "changed() is False on unchanged file")
+
+        # Промах по размеру (другая раскладка)
+        write_spaces_plist(path, spaces_per_display=(5,), seed=7)
+        c.check(topology.changed(), "changed() after rewrite")
+        displays = topology.displays()
+        c.check(topology.parses == parses + 1 and [len(d.spaces) for d in displays] == [5],
+                "cache miss on new content")
+
+        # Промах только по mtime (размер тот же)
+        parses = topology.parses
+        _bump_mtime(path)
+        topology.displays()
+        c.check(topology.parses == parses + 1, "cache miss on mtime change")
+
+        topology.invalidate()
+        topology.displays()
+        c.check(topology.parses == parses + 2, "invalidate() forces reparse")
+
+        # Битый plist — пустой список, без исключения
+        path.write_bytes(b"not a plist")
+        c.check(topology.displays() == [] and topology.total() == 0, "corrupt plist -> no displays")
+
+        # Нет plist: пусто и без запуска `defaults` (старого запасного пути нет)
+        path.unlink()
+        spawned = []
+        real_run, real_popen = subprocess.run, subprocess.Popen
+        subprocess.run = lambda *a, **kw: spawned.append(a) or real_run(*a, **kw)
+        subprocess.Popen = lambda *a, **kw: spawned.append(a) or real_popen(*a, **kw)
+        try:
+            missing = SpaceTopology(path)
+            c.check(missing.displays() == [] and missing.total() == 0, "missing plist -> no displays")
+            c.check(missing.parses == 0, "missing plist is not parsed")
+        finally:
+            subprocess.run, subprocess.Popen = real_run, real_popen
+        c.check(not spawned, f"no subprocess without plist, got {spawned}")
+
+
+def _snapshot(windows: list, spaces: int):
+    """BackendSnapshot из окон в формате lw() (как после разбора кэша)"""
+    from space_core.snapshot import BackendSnapshot
+    records = {f"{w['app']}|{w['title']}": w for w in windows}
+    return BackendSnapshot(windows=records, spaces_count=spaces)
+
+
+def _first_match(rules, row):
+    """Эталон без индекса: первое подошедшее правило по порядку"""
+    return next((rule.space for rule in rules if rule.matches(row)), None)
+
+
+def check_layouts(c: Checker):
+    from benchmarks.synthetic import make_desktop, make_windows
+    from space_core import layouts
+    from space_core.query import iter_windows
+
+    def window(wid, app, title, space, **fields):
+        return dict({"id": wid, "app": app, "title": title, "spaceIndex": space, "spaceId": 100 + space,
+                     "minimized": False}, **fields)
+
+    # Ручной снимок: каждая ветка планировщика
+    snapshot = _snapshot([
+        window(1, "Terminal", "build", 2),             # уже на месте
+        window(2, "Terminal", "logs", 1),              # перенос 1 -> 2
+        window(3, "Code", "README.md — docs", 1),      # оба шаблона: решает первый (3)
+        window(4, "Code", "main.py", 1),               # общее правило Code -> 4
+        window(5, "Code", "notes.md", 4),              # *.md* -> 5 (README-правило не подходит)
+        window(6, "Safari", "Docs", 3, minimized=True),  # свёрнутое — в skipped
+        window(7, "Slack", "general", 1),              # правило на Space 9 — нет такого
+        window(8, "Finder", "Home", 1),                # без правила — не трогаем
+    ], spaces=6)
+    preset = layouts.Preset("work", [
+        layouts.Rule("Terminal", 2),
+        layouts.Rule("Code", 3, "*readme*"),
+        layouts.Rule("Code", 5, "*.md*"),
+        layouts.Rule("Code", 4),
+        layouts.Rule("Safari", 2),
+        layouts.Rule("Slack", 9),
+    ])
+    plan = layouts.plan(preset, iter_windows(snapshot), snapshot.spaces_count)
+    moves = {m["window_id"]: (m["from"], m["to"]) for m in plan.moves}
+    c.check(moves == {2: (1, 2), 3: (1, 3), 4: (1, 4), 5: (4, 5)}, f"minimal move set, got {moves}")
+    c.check(len(plan.moves) == len(moves), "each window moved at most once")
+    c.check(plan.in_place == 1 and 1 not in moves, "in-place window is not moved")
+    c.check(8 not in moves and all(s["window_id"] != 8 for s in plan.skipped), "window without rule untouched")
+    skipped = {s["window_id"]: s["reason"] for s in plan.skipped}
+    c.check(skipped == {6: "minimized", 7: "no such space"}, f"skipped reasons, got {skipped}")
+    groups = plan.by_space()
+    c.check(list(groups) == [2, 3, 4, 5], f"groups in Space order, got {list(groups)}")
+    c.check(all(m["to"] == space for space, group in groups.items() for m in group), "group holds its target only")
+    c.check(plan.batch() == [(m["window_id"], m["to"]) for m in plan.moves], "batch() follows grouped order")
+
+    # Совпали оба шаблона заголовка: порядок правил решает, и индекс пресета с ним согласен
+    swapped = layouts.Preset("swapped", [preset.rules[0], preset.rules[2], preset.rules[1], *preset.rules[3:]])
+    row = next(r for r in iter_windows(snapshot) if r["window_id"] == 3)
+    c.check(preset.target(row) == 3 and swapped.target(row) == 5, "title-pattern tie: first rule wins")
+    exact_after = layouts.Preset("exact", [layouts.Rule("Code", 5, "*.md*"),
+                                           layouts.Rule("Code", 3, layouts.exact_title("README.md — docs"))])
+    c.check(exact_after.target(row) == 5, "earlier pattern beats a later exact title")
+
+    # Применили план — повторный план пуст
+    moved = _snapshot([window(r["window_id"], r["app"], r["title"], moves.get(r["window_id"], (0, r["space"]))[1],
+                              minimized=r["minimized"]) for r in iter_windows(snapshot)], spaces=6)
+    again = layouts.plan(preset, iter_windows(moved), moved.spaces_count)
+    c.check(not again.moves and again.in_place == plan.in_place + len(plan.moves), "plan is idempotent")
+
+    # Синтетические снимки: против эталона без индекса
+    for name, windows in (("uniform", make_windows(8, 25, 6, seed=3)),
+                          ("desktop", make_desktop(12, 2000, apps=30, seed=5))):
+        snapshot = _snapshot(windows, spaces=12)
+        rows = list(iter_windows(snapshot))
+        captured = layouts.capture(name, rows)
+        plan = layouts.plan(captured, rows, snapshot.spaces_count)
+        c.check(not plan.moves, f"{name}: captured layout plans no moves, got {len(plan.moves)}")
+
+        shuffled = layouts.Preset("shuffled", [layouts.Rule(r.app, r.space % 12 + 1, r.title) for r in captured.rules])
+        plan = layouts.plan(shuffled, rows, snapshot.spaces_count)
+        expected = {}
+        for r in rows:
+            target = _first_match(shuffled.rules, r)
+            if target is not None and target != r["space"] and not r["minimized"]:
+                expected[r["window_id"]] = target
+        got = {m["window_id"]: m["to"] for m in plan.moves}
+        c.check(got == expected and expected, f"{name}: moves match first-match reference ({len(got)} vs {len(expected)})")
+        c.check([m["to"] for m in plan.moves] == sorted(m["to"] for m in plan.moves), f"{name}: grouped by Space")
+
+
+CHECKS = {
+    "topology": check_topology,
+    "layouts": check_layouts,
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Space Manager self-checks on fixtures")
+    parser.add_argument("names", nargs="*", metavar="NAME", help=f"наборы: {', '.join(CHECKS)} (по умолчанию все)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.names if name not in CHECKS]
+    if unknown:
+        parser.error(f"unknown check: {', '.join(unknown)}")
+    ok = True
+    for name in args.names or CHECKS:
+        checker = Checker(name)
+        try:
+            CHECKS[name](checker)
+        except Exception as e:
+            checker.failures.append(f"crashed: {type(e).__name__}: {e}")
+        ok = checker.report() and ok
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Soak-тест UI: много циклов обновления, переносов окон, переименований и
+перестройки трея на поддельном бэкенде; перепись ресурсов (space_core.census)
+после прогрева и в конце. Каждый цикл возвращает рабочий стол в исходное
+состояние, поэтому число живых виджетов и QObject расти не должно — любой
+рост класса считается утечкой (код выхода 1). Полное обновление карточек —
+только раз в --refresh-every циклов: мгновенные правки (перенос, drop)
+должны сами убирать за собой.
+
+    cd pyqt && python -m benchmarks.soak --cycles 200
+    python -m benchmarks.soak --cycles 50 --tracemalloc --json soak.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from benchmarks.bench_ui import _load_app_module, build_manager
+
+
+def first_item(card, item_class):
+    """Первая видимая строка окна в карточке"""
+    for i in range(card.apps_layout.count()):
+        widget = card.apps_layout.itemAt(i).widget()
+        if isinstance(widget, item_class) and widget.isVisible() and widget.window_id:
+            return widget
+    return None
+
+
+def run(spaces: int, per_space: int, cycles: int, warmup: int, tracing: bool, refresh_every: int = 0,
+        verbose: bool = False) -> dict:
+    from PyQt6.QtCore import QCoreApplication, QEvent
+    from PyQt6.QtWidgets import QApplication
+
+    from space_core import backend, census
+    from space_core.fake import FakeHammerspoon
+
+    sm = _load_app_module()
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    sink = sys.stdout if verbose else open(os.devnull, "w")
+
+    def flush_deleted():
+        QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+        app.processEvents()
+
+    def settle(seconds: float = 0.5):
+        """Дождаться отложенных таймеров (вспышка карточки, анимации) — их объекты временные"""
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            app.processEvents()
+            time.sleep(0.01)
+        flush_deleted()
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(sink):
+        FakeHammerspoon.demo(spaces=spaces, per_space=per_space).install()
+        backend.refresh_windows_cache()
+        window = build_manager(sm, spaces, tmp)
+        window.names.pushers = []  # Hammerspoon/SketchyBar не трогаем
+        window.show()
+        flush_deleted()
+
+        tracker = census.Census(roots=[window, app], sources={
+            "icon_cache_bytes": sm.icon_cache_bytes,
+            "thumbnail_cache_bytes": lambda: sm.get_thumbnail_loader().cache.total_bytes,
+        })
+        if tracing:
+            census.start_tracing()
+
+        def cycle(i):
+            source = window.space_cards[1]
+            target = window.space_cards[2]
+            # Перенос из контекстного меню строки и обратно через drop-путь
+            item = first_item(source, sm.WindowItemWidget)
+            if item is not None:
+                wid, app_name, title = item.window_id, item.app_name, item.window_title
+                item._move_to_space(2)
+                app.processEvents()
+                if sm.move_window_to_space(wid, 1)[0]:
+                    source._remove_window_from_card(target, app_name, title)
+                    source._add_window_to_card(app_name, title, wid)
+            # Переименование (перестраивает трей) и возврат названия
+            window.names.set(1, f"Soak {i}")
+            window.names.set(1, "")
+            window.setup_tray()
+            # Без полного обновления мгновенные правки карточек копятся — так и в приложении
+            if refresh_every and (i + 1) % refresh_every == 0:
+                window.refresh_apps_from_cache()
+            flush_deleted()
+
+        for i in range(warmup):
+            cycle(i)
+        window.refresh_apps_from_cache()
+        settle()
+        tracker.growth()  # снимок tracemalloc — до переписи, чтобы он был в обеих
+        before = tracker.take()
+        started = time.perf_counter()
+        for i in range(cycles):
+            cycle(warmup + i)
+        elapsed = time.perf_counter() - started
+        settle()
+        growth = tracker.growth()
+        after = tracker.take()
+
+        window.hide()
+        window.flush_config()
+
+    if sink is not sys.stdout:
+        sink.close()
+    return {"cycles": cycles, "seconds": round(elapsed, 2), "before": before, "after": after,
+            "changes": census.diff(before, after), "growth": growth}
+
+
+def leaks(changes: dict, max_objects: int, max_traced_kb: int) -> list:
+    """Что из изменений считается утечкой"""
+    found = [f"{key}: {delta:+d}" for key, delta in changes.items()
+             if key.startswith(("widgets/", "objects/")) and delta > 0]
+    if changes.get("python/gc_objects", 0) > max_objects:
+        found.append(f"python/gc_objects: {changes['python/gc_objects']:+d} (limit {max_objects})")
+    if changes.get("python/traced_kb", 0) > max_traced_kb:
+        found.append(f"python/traced_kb: {changes['python/traced_kb']:+d} (limit {max_traced_kb})")
+    return found
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="UI soak test with a widget/memory census")
+    parser.add_argument("--spaces", type=int, default=8)
+    parser.add_argument("--windows", type=int, default=6, help="окон на Space")
+    parser.add_argument("--cycles", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5, help="циклов до первой переписи (кэши, ленивые объекты)")
+    parser.add_argument("--refresh-every", type=int, default=0,
+                        help="полное обновление карточек раз в N циклов (0 — никогда)")
+    parser.add_argument("--tracemalloc", action="store_true", help="мерить рост памяти Python (медленнее)")
+    parser.add_argument("--max-objects", type=int, default=2000, help="допустимый рост числа объектов gc")
+    parser.add_argument("--max-traced-kb", type=int, default=1024, help="допустимый рост памяти Python, KB")
+    parser.add_argument("--json", metavar="PATH", help="записать отчёт в JSON")
+    parser.add_argument("--verbose", action="store_true", help="не глушить лог приложения")
+    args = parser.parse_args(argv)
+
+    report = run(args.spaces, args.windows, args.cycles, args.warmup, args.tracemalloc,
+                 args.refresh_every, args.verbose)
+    found = leaks(report["changes"], args.max_objects, args.max_traced_kb)
+    report["leaks"] = found
+
+    from space_core.census import format_changes
+    print(f"[SOAK] {report['cycles']} cycles in {report['seconds']}s "
+          f"({args.spaces} Spaces x {args.windows} windows)")
+    for line in format_changes(report["changes"]) or ["no changes"]:
+        print(f"[SOAK]   {line}")
+    for line in report["growth"]:
+        print(f"[SOAK]   growth {line}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if found:
+        print(f"[SOAK] FAIL: {len(found)} growing: " + ", ".join(found))
+        return 1
+    print("[SOAK] OK: no growth")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Синтетические рабочие столы: окна в формате Hammerspoon lw() (равномерные
+и «реалистичные» — с перекосом по приложениям, длинными и юникодными заголовками),
+com.apple.spaces.plist с заданной раскладкой Spaces по дисплеям
+и поток событий клавиатуры для движка hotkeys.
+"""
+
+import plistlib
+import random
+import uuid
+
+_APP_NAMES = [
+    "Terminal", "Google Chrome", "Safari", "Code", "Finder", "Telegram",
+    "Slack", "Notes", "Preview", "Mail", "Music", "Xcode", "iTerm2",
+    "Firefox", "Figma", "Notion", "Zoom", "Calendar", "Messages", "Obsidian",
+]
+
+
+def app_names(count: int) -> list:
+    """count имён приложений (реальные, затем App-N)"""
+    names = _APP_NAMES[:count]
+    names += [f"App-{i}" for i in range(len(names), count)]
+    return names
+
+
+def make_windows(spaces: int, per_space: int, apps: int, seed: int = 0) -> list:
+    """
+    Сгенерировать spaces × per_space окон, распределённых по apps приложениям.
+
+    Заголовки уникальны (ключ кэша — "app|title"), id идут подряд с 1000.
+    """
+    rnd = random.Random(seed)
+    names = app_names(max(1, apps))
+    windows = []
+    wid = 1000
+    for space in range(1, spaces + 1):
+        for i in range(per_space):
+            app = rnd.choice(names)
+            windows.append({
+                "id": wid,
+                "app": app,
+                "title": f"{app} window {i + 1} — space {space} #{wid}",
+                "spaceId": 100 + space,
+                "spaceIndex": space,
+                "visible": True,
+                "minimized": False,
+            })
+            wid += 1
+    return windows
+
+
+# Фрагменты заголовков: кириллица, CJK, эмодзи, RTL — всё, что встречается в реальных окнах
+_UNICODE_WORDS = ["проект", "отчёт", "日本語のテキスト", "📁 Документы", "🚀 deploy", "שלום", "naïve café", "Ωmega"]
+
+
+def make_desktop(spaces: int, windows: int, apps: int = 20, skew: float = 1.2,
+                 long_titles: float = 0.1, unicode_titles: float = 0.3, seed: int = 0) -> list:
+    """
+    windows окон на spaces Spaces в формате lw(): приложения по закону Ципфа
+    (skew — показатель; 0 — равномерно), доля long_titles заголовков длиной
+    200+ символов и доля unicode_titles с не-ASCII фрагментами.
+    """
+    rnd = random.Random(seed)
+    names = app_names(max(1, apps))
+    weights = [1.0 / (rank ** skew) for rank in range(1, len(names) + 1)]
+    chosen = rnd.choices(names, weights=weights, k=windows)
+    result = []
+    for i, app in enumerate(chosen):
+        wid = 1000 + i
+        space = rnd.randint(1, spaces)
+        title = f"{app} — window {i + 1}"
+        if rnd.random() < unicode_titles:
+            title += " " + " ".join(rnd.sample(_UNICODE_WORDS, 2))
+        if rnd.random() < long_titles:
+            title += " /" + "/".join(f"segment-{rnd.randint(0, 9999)}" for _ in range(20))
+        result.append({
+            "id": wid,
+            "app": app,
+            "title": f"{title} #{wid}",  # ключ кэша "app|title" — уникальный
+            "spaceId": 100 + space,
+            "spaceIndex": space,
+            "visible": True,
+            "minimized": rnd.random() < 0.05,
+        })
+    return result
+
+
+def make_spaces_plist(spaces_per_display=(4,), fullscreen: int = 0, seed: int = 0) -> dict:
+    """
+    Содержимое com.apple.spaces.plist: spaces_per_display[i] Spaces на i-м дисплее.
+
+    ManagedSpaceID идут подряд с 101 (как spaceId в make_windows), последние
+    fullscreen Spaces главного дисплея — полноэкранные приложения (type 4).
+    """
+    rnd = random.Random(seed)
+    monitors = []
+    managed_id = 101
+    for display, count in enumerate(spaces_per_display):
+        spaces = []
+        for i in range(count):
+            is_fullscreen = display == 0 and i >= count - fullscreen
+            spaces.append({
+                "ManagedSpaceID": managed_id,
+                "id64": managed_id,
+                # У первого Space главного дисплея uuid пустой — как в macOS
+                "uuid": "" if managed_id == 101 else str(uuid.UUID(int=rnd.getrandbits(128))).upper(),
+                "type": 4 if is_fullscreen else 0,
+            })
+            managed_id += 1
+        monitors.append({
+            "Display Identifier": "Main" if display == 0 else str(uuid.UUID(int=rnd.getrandbits(128))).upper(),
+            "Current Space": dict(spaces[0]),
+            "Spaces": spaces,
+        })
+    return {"SpacesDisplayConfiguration": {"Management Data": {"Monitors": monitors}}}
+
+
+def write_spaces_plist(path, spaces_per_display=(4,), fullscreen: int = 0, seed: int = 0):
+    """Записать фикстуру plist (бинарный формат, как у системы)"""
+    with open(path, "wb") as f:
+        plistlib.dump(make_spaces_plist(spaces_per_display, fullscreen, seed), f, fmt=plistlib.FMT_BINARY)
+
+
+def key_stream(count: int, chord_every: int = 200, repeat: int = 8, seed: int = 0) -> list:
+    """
+    ~count событий [("down"|"up", key)]: набор текста, иногда с Shift,
+    и каждые chord_every клавиш — аккорд (Ctrl+` или Ctrl+Alt+N),
+    удерживаемый так, что ОС шлёт repeat автоповторов.
+    """
+    rnd = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz ,.;"
+    events = []
+    typed = 0
+    while len(events) < count:
+        typed += 1
+        if typed % chord_every == 0:
+            if rnd.random() < 0.5:
+                mods, key = ["ctrl"], "`"
+            else:
+                mods, key = ["ctrl", "alt"], str(rnd.randint(1, 9))
+            events += [("down", m) for m in mods]
+            events += [("down", key)] * (1 + repeat)
+            events.append(("up", key))
+            events += [("up", m) for m in reversed(mods)]
+            continue
+        key = rnd.choice(letters)
+        if rnd.random() < 0.05:
+            events += [("down", "shift"), ("down", key), ("up", key), ("up", "shift")]
+        else:
+            events += [("down", key), ("up", key)]
+    return events
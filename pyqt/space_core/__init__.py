@@ -0,0 +1,11 @@
+"""
+space_core — не-UI части Space Manager (кэши, источники данных, бэкенды).
+
+Модули импортируются по отдельности, чтобы не тянуть лишних зависимостей:
+    from space_core.thumbnails import ThumbnailLoader
+
+space_core.backend — ядро без Qt и macOS-фреймворков (кэш окон, клиент
+Hammerspoon, действия): его импортируют и GUI, и headless-запросы.
+space_core.daemon — резидентный процесс с API на Unix-сокете поверх backend;
+space_core.client — его клиент только на stdlib.
+"""
@@ -0,0 +1,988 @@
+"""
+Ядро Space Manager без UI: клиент Hammerspoon (канал и hs -c), кэш окон
+(снимки), топология и идентичность Spaces, поиск, действия с окнами.
+
+Модуль импортируется без Qt и без macOS-фреймворков: Quartz, objc и
+SkyLight (ctypes) подгружаются внутри функций при первом обращении,
+поэтому headless-запрос (CLI, демон, бенчмарк) не платит за их импорт.
+"""
+
+import json
+import re
+import subprocess
+import threading
+import time
+
+from space_core import metrics, trace
+from space_core.channel import CHANNEL_PATH, BackendChannel, BackendError, ChannelError, LatencyLog, ReplyError
+from space_core.identity import SpaceIdentity
+from space_core.scanner import ScanBackend
+from space_core.search import WindowSearchIndex
+from space_core.snapshot import BackendSnapshot, SnapshotStore
+from space_core.topology import SpaceTopology
+
+_search_index = WindowSearchIndex()  # Поиск окон по всем Spaces (палитра)
+_search_index_version = -1  # версия снимка, с которой синхронизирован индекс
+_space_topology = SpaceTopology()  # com.apple.spaces.plist, разбор только при изменении
+_space_identity = SpaceIdentity(_space_topology)  # индекс <-> uuid/ManagedSpaceID
+
+# SkyLight API для работы со Spaces
+_skylight = None
+_sls_connection = None
+_space_ids_cache = {}
+_space_ids_version = -1  # версия раскладки, для которой собран _space_ids_cache
+
+
+def _init_skylight():
+    """Инициализировать SkyLight framework"""
+    global _skylight, _sls_connection
+    if _skylight is not None:
+        return True
+    try:
+        import ctypes
+        _skylight = ctypes.CDLL('/System/Library/PrivateFrameworks/SkyLight.framework/SkyLight')
+
+        # SLSMainConnectionID
+        SLSMainConnectionID = _skylight.SLSMainConnectionID
+        SLSMainConnectionID.restype = ctypes.c_uint32
+        _sls_connection = SLSMainConnectionID()
+
+        return _sls_connection > 0
+    except Exception as e:
+        print(f"SkyLight init error: {e}")
+        return False
+
+
+def get_space_ids_map():
+    """Получить карту: номер Space -> ManagedSpaceID (сбрасывается при смене раскладки)"""
+    global _space_ids_cache, _space_ids_version
+    _space_identity.refresh()
+    if _space_ids_cache and _space_ids_version == _space_identity.version:
+        return _space_ids_cache
+
+    if not _init_skylight():
+        return _space_identity.managed_ids()
+
+    try:
+        import ctypes
+        import objc
+        SLSCopyManagedDisplaySpaces = _skylight.SLSCopyManagedDisplaySpaces
+        SLSCopyManagedDisplaySpaces.argtypes = [ctypes.c_uint32]
+        SLSCopyManagedDisplaySpaces.restype = ctypes.c_void_p
+
+        spaces_ref = SLSCopyManagedDisplaySpaces(_sls_connection)
+        if not spaces_ref:
+            return {}
+
+        spaces = objc.objc_object(c_void_p=spaces_ref)
+
+        # Сквозная нумерация по дисплеям (как в SpaceIdentity), начиная с 1
+        result = {}
+        index = 0
+        for display in spaces:
+            if isinstance(display, dict):
+                for s in display.get('Spaces', []):
+                    index += 1
+                    space_id = s.get('ManagedSpaceID')
+                    if space_id:
+                        result[index] = int(space_id)
+
+        _space_ids_cache = result
+        _space_ids_version = _space_identity.version
+        return result
+    except Exception as e:
+        print(f"get_space_ids error: {e}")
+        return {}
+
+
+# ============================================================================
+# HAMMERSPOON BACKEND (заменяет AeroSpace)
+# ============================================================================
+# Кэш окон, активный Space и дисплеи — неизменяемый снимок (space_core.snapshot):
+# писатели публикуют новый снимок заменой ссылки, читатели берут
+# get_snapshot() один раз и видят согласованное состояние без блокировок.
+#   windows: "app|title" -> запись окна; focused: 1-based индекс;
+#   displays: от ls() — [{uuid, index, spaces: [spaceId], current}]
+_snapshots = SnapshotStore()
+
+
+def get_snapshot() -> BackendSnapshot:
+    """Текущий снимок кэша бэкенда (только чтение)"""
+    return _snapshots.current
+
+
+_LUA_COMMAND = re.compile(r"return (\w+)")
+
+
+def _hs_call(lua_code: str, timeout: float = 2.0) -> str:
+    """Вызвать Hammerspoon CLI и получить результат"""
+    match = _LUA_COMMAND.match(lua_code)
+    command = match.group(1) if match else "lua"
+    try:
+        with metrics.histogram("backend_hs_call_seconds", "Вызовы hs -c по команде Lua", command=command).time(), \
+                trace.span("backend", "hs -c", command=command):
+            result = subprocess.run(
+                ['hs', '-c', lua_code],
+                capture_output=True, text=True, timeout=timeout,
+                stdin=subprocess.DEVNULL
+            )
+        if result.returncode == 0:
+            return result.stdout.strip()
+        metrics.counter("backend_hs_call_errors_total", "Неудачные вызовы hs -c", command=command).inc()
+    except FileNotFoundError:
+        print("[HS] Hammerspoon CLI (hs) not found. Install: brew install hammerspoon", flush=True)
+    except subprocess.TimeoutExpired:
+        print(f"[HS] Timeout calling: {lua_code[:50]}...", flush=True)
+    except Exception as e:
+        print(f"[HS] Error: {e}", flush=True)
+    return ""
+
+
+# Постоянный канал к Hammerspoon (space_core.channel): действия по window id /
+# ManagedSpaceID без форка hs -c; задержка каждого пути — в _latency.
+# Действия из GUI выполняются в одном фоновом потоке, по очереди.
+_channel = BackendChannel(CHANNEL_PATH)
+_latency = LatencyLog()
+_actions = None  # ThreadPoolExecutor на один поток, создаётся при первом действии
+
+
+def _submit_action(fn, *args):
+    global _actions
+    if _actions is None:
+        from concurrent.futures import ThreadPoolExecutor
+        _actions = ThreadPoolExecutor(max_workers=1, thread_name_prefix="backend-action")
+    return _actions.submit(fn, *args)
+
+
+def get_backend_channel() -> BackendChannel:
+    return _channel
+
+
+def install_transport(hs_call=None, channel: BackendChannel = None):
+    """
+    Подменить транспорт к Hammerspoon: hs_call(lua, timeout) -> str вместо
+    `hs -c` и/или другой канал (поддельный бэкенд на Linux, тесты).
+    """
+    global _hs_call, _channel
+    if hs_call is not None:
+        _hs_call = hs_call
+    if channel is not None:
+        _channel = channel
+
+
+def get_transport() -> tuple:
+    """Текущий транспорт (hs_call, channel) — чтобы обернуть его (запись сессии)"""
+    return _hs_call, _channel
+
+
+def get_latency_log() -> LatencyLog:
+    """Задержки действий по путям: focus/channel, focus/hs-cli, switch/applescript, ..."""
+    return _latency
+
+
+def _backend_call(kind: str, cmd: str, *args, lua: str = "", timeout: float = 2.0):
+    """
+    Команда бэкенду: через канал, без канала — hs -c с тем же смыслом (lua).
+
+    Возвращает (ok, result). Если бэкенд ответил ошибкой по каналу, hs -c
+    не пробуем — он ответит так же. Если запрос по каналу ушёл, а ответа нет,
+    тоже не пробуем: команда, возможно, выполнена (focus/goto не повторяем).
+    """
+    if _channel.available():
+        try:
+            with _latency.timed(f"{kind}/channel"), \
+                    metrics.histogram("backend_channel_seconds", "Команды канала Hammerspoon", command=cmd).time(), \
+                    trace.span("backend", "channel", command=cmd):
+                return True, _channel.call(cmd, *args, timeout=timeout)
+        except BackendError as e:
+            print(f"[CHANNEL] {e}", flush=True)
+            metrics.counter("backend_channel_errors_total", "Ошибки канала", command=cmd, kind="backend").inc()
+            return False, None
+        except ReplyError as e:
+            print(f"[CHANNEL] No reply, not resending: {e}", flush=True)
+            metrics.counter("backend_channel_errors_total", "Ошибки канала", command=cmd, kind="no-reply").inc()
+            return False, None
+        except ChannelError as e:
+            print(f"[CHANNEL] Unavailable, using hs -c: {e}", flush=True)
+            metrics.counter("backend_channel_errors_total", "Ошибки канала", command=cmd, kind="unavailable").inc()
+    if not lua:
+        return False, None
+    t0 = time.perf_counter()
+    output = _hs_call(lua, timeout=timeout)
+    try:
+        result = json.loads(output) if output else None
+    except ValueError:
+        result = None
+    ok = result is not None and not (isinstance(result, dict) and result.get('success') is False)
+    _latency.record(f"{kind}/hs-cli" if ok else f"{kind}/hs-cli/error", time.perf_counter() - t0)
+    return ok, result
+
+
+def _decode(output: str, command: str):
+    """json.loads ответа Hammerspoon (отдельный отрезок трассировки: ответы lw() бывают большими)"""
+    with trace.span("json", "decode", command=command, size=len(output)):
+        return json.loads(output)
+
+
+def get_hammerspoon_windows_sync() -> list:
+    """Синхронное получение окон через Hammerspoon (вызывать ДО Qt)"""
+    displays = _snapshots.current.displays
+    if len(displays) > 1:
+        windows = get_windows_per_display(displays)
+        if windows is not None:
+            return windows
+    try:
+        output = _hs_call('return lw()', timeout=3.0)
+        if output:
+            return _decode(output, "lw")
+    except json.JSONDecodeError as e:
+        print(f"[HS] JSON decode error: {e}", flush=True)
+    except Exception as e:
+        print(f"[HS] get_windows error: {e}", flush=True)
+    return []
+
+def get_windows_per_display(displays: list):
+    """
+    Окна всех дисплеев: по запросу на дисплей, параллельно, затем слияние.
+
+    None — если хотя бы один запрос не удался (вызывающий вернётся к lw()).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    def fetch(display):
+        output = _hs_call(f'return dw({json.dumps(display["uuid"])})', timeout=3.0)
+        return _decode(output, "dw") if output else None
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(displays), thread_name_prefix="hs-display") as pool:
+            parts = list(pool.map(fetch, displays))
+    except Exception as e:
+        print(f"[HS] per-display query error: {e}", flush=True)
+        return None
+    if any(part is None for part in parts):
+        return None
+    merged, seen = [], set()
+    for part in parts:
+        for w in part:
+            if w.get('id') not in seen:
+                seen.add(w.get('id'))
+                merged.append(w)
+    print(f"[HS] {len(merged)} windows from {len(displays)} displays", flush=True)
+    return merged
+
+
+def _global_space_index(space_id, local_index, display_index, displays=None, refresh: bool = True):
+    """
+    Сквозной индекс Space (все дисплеи подряд) для окна от Hammerspoon.
+
+    Сначала по ManagedSpaceID через plist, затем по списку дисплеев от ls(),
+    иначе локальный индекс годится только для главного дисплея. refresh=False —
+    раскладка уже обновлена вызывающим (обход многих окон).
+    """
+    index = _space_identity.index_for_managed_id(space_id, refresh) if space_id else None
+    if index:
+        return index
+    offset = 0
+    for display in (_snapshots.current.displays if displays is None else displays):
+        spaces = display.get('spaces') or []
+        if space_id in spaces:
+            return offset + spaces.index(space_id) + 1
+        offset += len(spaces)
+    if local_index and (display_index or 1) == 1:
+        return local_index
+    return None
+
+
+def get_display_focus() -> dict:
+    """Текущий Space каждого дисплея: display uuid -> сквозной индекс"""
+    result = {}
+    displays = _snapshots.current.displays
+    for display in displays:
+        index = _global_space_index(display.get('current'), None, display.get('index'), displays)
+        if index:
+            result[display.get('uuid')] = index
+    return result or _space_identity.current_indices()
+
+
+def get_display_sections() -> list:
+    """Spaces по дисплеям: [(display_id, [сквозные индексы])]; пусто — дисплей один"""
+    sections = _space_identity.sections()
+    displays = _snapshots.current.displays
+    if not sections and displays:
+        start = 1
+        for display in displays:
+            count = len(display.get('spaces') or [])
+            sections.append((display.get('uuid'), list(range(start, start + count))))
+            start += count
+    return sections if len(sections) > 1 else []
+
+
+def get_focused_workspace() -> int:
+    """Получить текущий активный space из кэша (1-based index)"""
+    return _snapshots.current.focused
+
+def get_focused_workspace_sync() -> int:
+    """Получить текущий активный space напрямую от Hammerspoon"""
+    try:
+        output = _hs_call('return fs()', timeout=1.0)
+        if output and output.isdigit():
+            return int(output)
+    except Exception as e:
+        print(f"[HS] get_focused error: {e}", flush=True)
+    return 1
+
+
+def update_focused_workspace_sync() -> int:
+    """Синхронное обновление активного space (вызывать ДО Qt!)"""
+    try:
+        output = _hs_call('return ls()', timeout=2.0)
+        if output:
+            data = _decode(output, "ls")
+            displays = data.get('displays') or []
+            # focusedIndex есть только для главного дисплея — иначе считаем по spaceId
+            focused = (_global_space_index(data.get('focused'), data.get('focusedIndex'), None, displays)
+                       or data.get('focusedIndex') or 1)
+            count = sum(len(d.get('spaces') or []) for d in displays) or data.get('count', 16)
+            snapshot = _snapshots.publish(displays=displays, focused=focused, spaces_count=count)
+            print(f"[PRE-CACHE] Focused space: {focused}, total: {count} (v{snapshot.version})", flush=True)
+            return focused
+    except Exception as e:
+        print(f"[HS] update_focused_workspace error: {e}", flush=True)
+    return _snapshots.current.focused
+
+
+# Обращения к кэшу окон: свежий (< 3 с), устарел, ждём предзагрузку
+_cache_lookups = {result: metrics.counter("windows_cache_lookups_total", "Обращения refresh_windows_cache", result=result)
+                  for result in ("hit", "miss", "prefetch")}
+
+
+def refresh_windows_cache():
+    """Обновить кэш окон через Hammerspoon"""
+    import time
+
+    try:
+        # Используем pre-cached данные если свежие (< 3 сек)
+        if _prefetch is not None and not _prefetch.done.is_set():
+            # Данные уже едут из предзагрузки — второй запрос только задержит её
+            print("[CACHE] Prefetch in flight, using cached data", flush=True)
+            _cache_lookups["prefetch"].inc()
+            return
+        snapshot = _snapshots.current
+        if snapshot.fetched_at and (time.time() - snapshot.fetched_at) < 3:
+            print(f"[CACHE] Using cached data ({len(snapshot.windows)} windows)", flush=True)
+            _cache_lookups["hit"].inc()
+            return
+
+        print("[CACHE] Refreshing windows via Hammerspoon...", flush=True)
+        _cache_lookups["miss"].inc()
+        windows = get_hammerspoon_windows_sync()
+        snapshot = _parse_hammerspoon_windows(windows)
+        print(f"[CACHE] Refreshed: {len(snapshot.windows)} windows", flush=True)
+    except Exception as e:
+        print(f"[HS] Cache refresh error: {e}", flush=True)
+
+# Алиас для совместимости
+refresh_aerospace_cache = refresh_windows_cache
+
+
+def _parse_hammerspoon_windows(windows: list) -> BackendSnapshot:
+    """Парсить список окон от Hammerspoon и опубликовать новый снимок"""
+    import time
+
+    def build(snapshot):
+        # Поколение содержимого окна (для миниатюр): растёт при смене заголовка
+        previous = {data['id']: data for data in snapshot.windows.values()}
+        _space_identity.refresh()  # один stat plist на разбор, а не на каждое окно
+        cache = {}
+        for w in windows:
+            wid = w.get('id')
+            app = w.get('app', 'Unknown')
+            title = w.get('title', '')
+            space_id = w.get('spaceId')  # ManagedSpaceID — не меняется при перестановке
+            # Сквозной 1-based индекс по всем дисплеям (spaceIndex от Hammerspoon — по дисплею окна)
+            space_idx = _global_space_index(space_id, w.get('spaceIndex'), w.get('displayIndex'),
+                                            snapshot.displays, refresh=False)
+
+            prev = previous.get(wid)
+            gen = prev.get('gen', 0) if prev else 0
+            if prev and prev.get('title') != title:
+                gen += 1
+
+            key = f"{app}|{title}"
+            cache[key] = {
+                'id': wid,
+                'workspace': str(space_idx) if space_idx else '?',
+                'app': app,
+                'title': title,
+                'spaceIndex': space_idx,
+                'spaceId': space_id,
+                'space_key': _space_identity.key_for_managed_id(space_id, refresh=False),
+                'display': w.get('display'),
+                'visible': w.get('visible', True),
+                'minimized': w.get('minimized', False),
+                'gen': gen
+            }
+        return snapshot.replace(windows=cache, fetched_at=time.time())
+
+    with metrics.histogram("windows_cache_update_seconds", "Разбор окон и публикация снимка").time(), \
+            trace.span("cache", "update windows", windows=len(windows)):
+        snapshot = _snapshots.update(build)
+    metrics.gauge("windows_cached", "Окон в кэше").set(len(snapshot.windows))
+    print(f"[CACHE] Hammerspoon cache updated: {len(snapshot.windows)} windows (v{snapshot.version})", flush=True)
+    return snapshot
+
+
+def _with_window_fields(snapshot: BackendSnapshot, changes: dict) -> BackendSnapshot:
+    """Снимок, где у записей окон (по ключу кэша) заменены поля; тот же, если менять нечего"""
+    if not changes:
+        return snapshot
+    windows = dict(snapshot.windows)
+    for key, fields in changes.items():
+        windows[key] = dict(windows[key], **fields)
+    return snapshot.replace(windows=windows)
+
+
+def reindex_windows_cache() -> int:
+    """
+    Пересчитать индексы Spaces в кэше окон по ManagedSpaceID после перестановки
+    в Mission Control (без повторного опроса Hammerspoon); вернуть число сдвинутых окон.
+    """
+    moved = {}
+
+    def build(snapshot):
+        moved.clear()
+        _space_identity.refresh()
+        for cache_key, data in snapshot.windows.items():
+            key = _space_identity.key_for_managed_id(data.get('spaceId'), refresh=False)
+            index = _space_identity.index(key, refresh=False) if key else None
+            if index is None or index == data.get('spaceIndex'):
+                continue
+            moved[cache_key] = {'workspace': str(index), 'spaceIndex': index, 'space_key': key}
+        return _with_window_fields(snapshot, moved)
+
+    _snapshots.update(build)
+    return len(moved)
+
+
+def get_windows_by_workspace():
+    """Получить окна сгруппированные по space index"""
+    result = {}
+    for key, data in _snapshots.current.windows.items():
+        ws = data['workspace']
+        if ws not in result:
+            result[ws] = []
+        result[ws].append({
+            'app': data['app'],
+            'title': data['title'],
+            'window_id': data['id'],
+            'gen': data.get('gen', 0)
+        })
+    return result
+
+
+def get_window_id_by_title(app_name: str, window_title: str) -> int:
+    """Найти Window ID по имени приложения и заголовку окна."""
+    windows = _snapshots.current.windows
+    if not windows:
+        print("[GET_ID] Cache empty!", flush=True)
+        return 0
+
+    # Точное совпадение
+    key = f"{app_name}|{window_title}"
+    if key in windows:
+        wid = windows[key]['id']
+        print(f"[GET_ID] Exact match: {app_name} -> {wid}", flush=True)
+        return wid
+
+    # Частичное совпадение (title может быть обрезан)
+    for cached_key, data in windows.items():
+        cached_app = data['app']
+        cached_title = data['title']
+        if cached_app == app_name:
+            # Проверяем совпадение начала title (первые 30 символов)
+            if (cached_title[:30] == window_title[:30] or
+                window_title.startswith(cached_title[:30]) or
+                cached_title.startswith(window_title[:30])):
+                wid = data['id']
+                print(f"[GET_ID] Partial match: {app_name} -> {wid}", flush=True)
+                return wid
+
+    print(f"[GET_ID] Not found: {app_name} | {window_title[:40]}", flush=True)
+    return 0
+
+
+def update_window_workspace_in_cache(window_id: int, new_workspace: int):
+    """Обновить workspace окна в кэше (новым снимком)"""
+    found = []
+
+    def build(snapshot):
+        found.clear()
+        for key, data in snapshot.windows.items():
+            if data.get('id') == window_id:
+                found.append(data.get('workspace'))
+                space_id = _space_id_for_index(new_workspace)
+                return _with_window_fields(snapshot, {key: {
+                    'workspace': str(new_workspace),
+                    'spaceIndex': new_workspace,
+                    'spaceId': space_id or data.get('spaceId'),
+                    'space_key': _space_identity.key_for_managed_id(space_id) if space_id else None,
+                }})
+        return snapshot
+
+    _snapshots.update(build)
+    if found:
+        print(f"[CACHE] Updated window {window_id} space: {found[0]} -> {new_workspace}", flush=True)
+    return bool(found)
+
+
+def update_windows_workspace_in_cache(moves: dict) -> int:
+    """Обновить Space нескольких окон одним снимком: {window_id: space}; возвращает, сколько нашлось"""
+    found = []
+
+    def build(snapshot):
+        found.clear()
+        changes = {}
+        space_ids = {space: _space_id_for_index(space) for space in set(moves.values())}
+        for key, data in snapshot.windows.items():
+            space = moves.get(data.get('id'))
+            if space is not None:
+                space_id = space_ids[space]
+                changes[key] = {
+                    'workspace': str(space),
+                    'spaceIndex': space,
+                    'spaceId': space_id or data.get('spaceId'),
+                    'space_key': _space_identity.key_for_managed_id(space_id) if space_id else None,
+                }
+        found.extend(changes)
+        return _with_window_fields(snapshot, changes)
+
+    if moves:
+        _snapshots.update(build)
+        print(f"[CACHE] Updated space of {len(found)} windows", flush=True)
+    return len(found)
+
+
+_window_moves = {outcome: metrics.counter("window_moves_total", "Переносы окон по исходу", outcome=outcome)
+                 for outcome in ("success", "error", "unavailable")}
+
+
+def move_window_to_space(window_id: int, target_space_num: int) -> tuple:
+    """
+    Переместить окно на указанный Space.
+
+    Returns: (success: bool, message: str)
+
+    Использует Hammerspoon + PaperWM Mission Control simulation. Индекс
+    сквозной по всем дисплеям — в Hammerspoon уходит ManagedSpaceID (mwi),
+    а сквозной индекс (mw) — только если id неизвестен.
+    """
+    print(f"[MOVE] Moving window {window_id} to space {target_space_num}...", flush=True)
+
+    space_id = _space_id_for_index(target_space_num)
+    if space_id:
+        lua = f'return mwi({window_id}, {space_id})'
+    else:
+        lua = f'return mw({window_id}, {target_space_num})'
+    # Hammerspoon через Mission Control (основной метод)
+    try:
+        with trace.span("backend", "move window", window_id=window_id, space=target_space_num):
+            output = _hs_call(lua, timeout=10.0)
+        if output:
+            result = json.loads(output)
+            if result.get('success'):
+                update_window_workspace_in_cache(window_id, target_space_num)
+                print("[MOVE] Success via Hammerspoon", flush=True)
+                _window_moves["success"].inc()
+                return True, "Перемещено через Hammerspoon"
+            else:
+                error = result.get('error', 'unknown error')
+                print(f"[MOVE] Hammerspoon error: {error}", flush=True)
+                _window_moves["error"].inc()
+                return False, f"Ошибка: {error}"
+    except json.JSONDecodeError as e:
+        print(f"[MOVE] JSON error: {e}", flush=True)
+    except Exception as e:
+        print(f"[MOVE] Hammerspoon error: {e}", flush=True)
+
+    _window_moves["unavailable"].inc()
+    return False, "Hammerspoon не доступен. Установите: brew install hammerspoon"
+
+
+def move_windows_to_spaces(moves: list) -> dict:
+    """
+    Переместить несколько окон одним вызовом Hammerspoon (mwb), по порядку moves.
+
+    moves: [(window_id, space)] — обычно LayoutPlan.batch(), сгруппированный
+    по целевому Space. Сквозные индексы переводятся в ManagedSpaceID — так
+    переносы на любой дисплей; окна, для Space которых id неизвестен, и
+    init.lua без mwb — переносы по одному. Returns: {window_id: (success,
+    message)}. Кэш обновляется одним снимком.
+    """
+    if not moves:
+        return {}
+    batch, single = [], []
+    for window_id, space in moves:
+        space_id = _space_id_for_index(space)
+        (batch if space_id else single).append((window_id, space, space_id))
+    results = {window_id: move_window_to_space(window_id, space) for window_id, space, _ in single}
+    if not batch:
+        return results
+    pairs = ", ".join(f"{{{int(window_id)}, {int(space_id)}}}" for window_id, _, space_id in batch)
+    print(f"[MOVE] Moving {len(batch)} windows in one batch...", flush=True)
+    data = None
+    try:
+        with trace.span("backend", "move windows", count=len(batch)):
+            output = _hs_call(f'return mwb({{{pairs}}})', timeout=10.0 + 2.0 * len(batch))
+        data = json.loads(output) if output else None
+    except json.JSONDecodeError as e:
+        print(f"[MOVE] JSON error: {e}", flush=True)
+    except Exception as e:
+        print(f"[MOVE] Hammerspoon error: {e}", flush=True)
+
+    if not isinstance(data, dict) or not isinstance(data.get('results'), list):
+        print("[MOVE] Batch move unavailable, moving one by one", flush=True)
+        results.update((window_id, move_window_to_space(window_id, space)) for window_id, space, _ in batch)
+        return results
+
+    targets = {window_id: space for window_id, space, _ in batch}
+    moved = {}
+    for result in data['results']:
+        window_id = result.get('id')
+        if result.get('success'):
+            moved[window_id] = targets.get(window_id)
+            results[window_id] = (True, "Перемещено через Hammerspoon")
+            _window_moves["success"].inc()
+        else:
+            results[window_id] = (False, f"Ошибка: {result.get('error') or 'unknown error'}")
+            _window_moves["error"].inc()
+    update_windows_workspace_in_cache(moved)
+    print(f"[MOVE] Batch: {len(moved)}/{len(batch)} moved", flush=True)
+    return results
+
+
+def submit_window_moves(moves: list):
+    """move_windows_to_spaces в фоновом потоке действий (не блокирует, -> Future с результатами)"""
+    return _submit_action(move_windows_to_spaces, moves)
+
+
+def get_search_index() -> WindowSearchIndex:
+    """
+    Индекс поиска окон, синхронизированный с текущим снимком кэша.
+
+    Индекс принадлежит GUI-потоку: писатели кэша его не трогают, а sync()
+    (только отличия) выполняется здесь, когда версия снимка сменилась.
+    """
+    global _search_index_version
+    snapshot = _snapshots.current
+    if snapshot.version != _search_index_version:
+        _search_index.sync(snapshot.windows.values())
+        _search_index_version = snapshot.version
+    return _search_index
+
+
+def activate_window(app_name: str, window_title: str):
+    """Активировать конкретное окно приложения"""
+    # Экранируем кавычки в названии
+    escaped_title = window_title.replace('"', '\\"').replace("'", "'\"'\"'")
+    escaped_app = app_name.replace('"', '\\"')
+
+    script = f'''
+    tell application "{escaped_app}"
+        activate
+    end tell
+    delay 0.1
+    tell application "System Events"
+        tell process "{escaped_app}"
+            set frontmost to true
+            try
+                set targetWindow to first window whose name contains "{escaped_title}"
+                perform action "AXRaise" of targetWindow
+            end try
+        end tell
+    end tell
+    '''
+
+    return subprocess.Popen(
+        ["osascript", "-e", script],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+
+def focus_window_by_id(window_id: int, app_name: str = "", window_title: str = ""):
+    """Активировать окно по id через бэкенд (fallback — AppleScript по заголовку); не блокирует, -> Future"""
+    if window_id:
+        get_search_index().touch(window_id)
+    return _submit_action(_focus_window_job, int(window_id or 0), app_name, window_title)
+
+
+def _focus_window_job(window_id: int, app_name: str, window_title: str):
+    if window_id:
+        ok, _ = _backend_call("focus", "focus", window_id,
+                              lua=f'return smFocusWindow({window_id})', timeout=1.0)
+        if ok:
+            return
+    if not app_name:
+        print(f"[FOCUS] Window {window_id} not focused, no title for AppleScript", flush=True)
+        return
+    try:
+        with _latency.timed("focus/applescript"):
+            activate_window(app_name, window_title).wait(timeout=5.0)
+    except Exception as e:
+        print(f"[FOCUS] AppleScript error: {e}", flush=True)
+
+
+# Системные процессы, чьи окна не показываем
+_SKIP_APPS = {'Window Server', 'Dock', 'Control Center', 'Spotlight',
+              'SystemUIServer', 'NotificationCenter', 'CursorUIViewService',
+              'Notification Center', 'com.apple.WebKit', 'universalAccessAuthWarn',
+              'TextInputMenuAgent', 'Пункт управления'}
+
+
+def get_windows_on_current_space(include_minimized: bool = False):
+    """Получить список окон на ТЕКУЩЕМ Space (опционально со свёрнутыми)"""
+    try:
+        from Quartz import (
+            CGWindowListCopyWindowInfo, kCGNullWindowID, kCGWindowListExcludeDesktopElements,
+            kCGWindowListOptionAll, kCGWindowListOptionOnScreenOnly
+        )
+
+        if include_minimized:
+            options = kCGWindowListOptionAll | kCGWindowListExcludeDesktopElements
+        else:
+            options = kCGWindowListOptionOnScreenOnly | kCGWindowListExcludeDesktopElements
+
+        windows = CGWindowListCopyWindowInfo(options, kCGNullWindowID)
+
+        skip_apps = _SKIP_APPS
+
+        result = []
+        for w in windows:
+            owner = w.get('kCGWindowOwnerName', '')
+            layer = w.get('kCGWindowLayer', 0)
+            title = w.get('kCGWindowName', '')
+            on_screen = w.get('kCGWindowIsOnscreen', True)
+
+            # Только обычные окна (layer=0), пропускаем системные
+            if layer == 0 and owner and owner not in skip_apps and title:
+                result.append({
+                    "app": owner,
+                    "title": title,
+                    "minimized": not on_screen
+                })
+
+        return result
+    except Exception as e:
+        print(f"Quartz error: {e}")
+        return []
+
+
+def _space_id_for_index(index: int):
+    """ManagedSpaceID по сквозному индексу (plist, иначе список дисплеев от ls())"""
+    space_id = _space_identity.managed_ids().get(index)
+    if space_id:
+        return space_id
+    flat = [sid for d in _snapshots.current.displays for sid in (d.get('spaces') or [])]
+    return flat[index - 1] if 0 < index <= len(flat) else None
+
+
+# macOS key codes цифрового ряда (идут не подряд: 5 — 23, 6 — 22, ...)
+_DIGIT_KEY_CODES = {1: 18, 2: 19, 3: 20, 4: 21, 5: 23, 6: 22, 7: 26, 8: 28, 9: 25}
+
+
+def _switch_space_job(space_num: int):
+    """Переключить Space: по ManagedSpaceID через бэкенд, иначе Ctrl+N через AppleScript"""
+    space_id = _space_id_for_index(space_num)
+    if space_id:
+        ok, _ = _backend_call("switch", "gotoId", space_id, lua=f'return smGotoSpaceId({space_id})')
+        if ok:
+            return
+    key_code = _DIGIT_KEY_CODES.get(space_num)
+    if key_code is None:
+        print(f"[SWITCH] Space {space_num}: no backend and no Ctrl+N shortcut", flush=True)
+        return
+    script = f'tell application "System Events" to key code {key_code} using control down'
+    try:
+        with _latency.timed("switch/applescript"):
+            subprocess.run(["osascript", "-e", script], stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, timeout=5.0)
+    except Exception as e:
+        print(f"[SWITCH] AppleScript error: {e}", flush=True)
+
+
+def switch_space(space_num: int):
+    """Переключить Space в фоновом потоке действий (не блокирует, -> Future)"""
+    return _submit_action(_switch_space_job, space_num)
+
+
+def get_focused_window_id() -> int:
+    """ID активного окна от Hammerspoon (0 — нет окна или бэкенд недоступен)"""
+    ok, window_id = _backend_call(
+        "focused-window", "focusedWindow",
+        lua='local w = hs.window.focusedWindow(); return w and w:id() or 0', timeout=1.0)
+    return window_id if ok and isinstance(window_id, int) else 0
+
+
+class HammerspoonScanBackend(ScanBackend):
+    """Бэкенд сканера: Hammerspoon (Spaces) + Quartz (заголовки окон)"""
+
+    def enumerate_all(self):
+        # hs.spaces.windowsForSpace знает окна каждого Space без переключения,
+        # а app/title всех окон (включая другие Spaces) отдаёт Quartz
+        output = _hs_call('return sw()', timeout=3.0)
+        try:
+            data = json.loads(output) if output else None
+        except ValueError:
+            return None
+        if not data or not data.get('success'):
+            return None
+        info = {}
+        try:
+            from Quartz import (
+                CGWindowListCopyWindowInfo, kCGNullWindowID, kCGWindowListExcludeDesktopElements,
+                kCGWindowListOptionAll
+            )
+            for w in CGWindowListCopyWindowInfo(
+                    kCGWindowListOptionAll | kCGWindowListExcludeDesktopElements, kCGNullWindowID) or []:
+                owner = w.get('kCGWindowOwnerName', '')
+                title = w.get('kCGWindowName', '')
+                if w.get('kCGWindowLayer', 0) == 0 and owner and title and owner not in _SKIP_APPS:
+                    info[int(w.get('kCGWindowNumber', 0))] = (owner, title)
+        except Exception as e:
+            print(f"[SCAN] Quartz error: {e}", flush=True)
+        if not info:
+            return None  # без заголовков (нет доступа к записи экрана) — только переключением
+        result = {}
+        for space in data.get('spaces', []):
+            index = _global_space_index(space.get('id'), None, None)
+            if not index:
+                continue
+            result[index] = [
+                {"app": info[wid][0], "title": info[wid][1], "window_id": wid}
+                for wid in space.get('windows') or [] if wid in info
+            ]
+        return result
+
+    def focused(self) -> int:
+        ok, space_id = _backend_call("focused", "focused", lua='return smFocusedSpaceId()', timeout=1.0)
+        if ok and isinstance(space_id, int):
+            index = _global_space_index(space_id, None, None)
+            if index:
+                return index
+        return get_focused_workspace_sync()
+
+    def goto(self, index: int):
+        space_id = _space_id_for_index(index)
+        if space_id:
+            _backend_call("switch", "gotoId", space_id, lua=f'return smGotoSpaceId({space_id})')
+        else:
+            _backend_call("switch", "goto", index, lua=f'return smGotoSpace({index})')
+
+    def current_windows(self) -> list:
+        return get_windows_on_current_space(include_minimized=False)
+
+
+def get_space_identity() -> SpaceIdentity:
+    """Стабильные ключи Spaces всех дисплеев (uuid/ManagedSpaceID)"""
+    return _space_identity
+
+
+def get_space_topology() -> SpaceTopology:
+    """Топология Spaces (по дисплеям), plist перечитывается только при изменении"""
+    return _space_topology
+
+
+def get_spaces_count():
+    """Получить количество Spaces (все дисплеи) из системных настроек"""
+    count = _space_topology.total()
+    return count if count > 0 else 4  # По умолчанию
+
+
+def get_frontmost_app():
+    """Получить активное приложение"""
+    script = '''
+    tell application "System Events"
+        return name of first process whose frontmost is true
+    end tell
+    '''
+    try:
+        result = subprocess.run(
+            ["osascript", "-e", script],
+            capture_output=True, text=True, timeout=2
+        )
+        return result.stdout.strip()
+    except:
+        return ""
+
+
+def precache_windows(timeline=None):
+    """
+    Предварительное кэширование окон через Hammerspoon.
+
+    timeline (space_core.startup.StartupTimeline) — записать фазы в дорожку backend.
+    """
+    import contextlib
+
+    def phase(name):
+        return timeline.span("backend", name) if timeline is not None else contextlib.nullcontext()
+
+    print("[PRE-CACHE] Loading windows via Hammerspoon...", flush=True)
+    try:
+        # Сначала Spaces и дисплеи: по ним окна запрашиваются параллельно
+        with phase("spaces"):
+            update_focused_workspace_sync()
+
+        # Кэшируем список окон
+        with phase("windows"):
+            windows = get_hammerspoon_windows_sync()
+            if windows:
+                print(f"[PRE-CACHE] Got {len(windows)} windows", flush=True)
+                _parse_hammerspoon_windows(windows)
+    except Exception as e:
+        print(f"[PRE-CACHE] Error: {e}", flush=True)
+
+
+class Prefetch:
+    """
+    precache_windows() в фоновом потоке, параллельно с созданием UI.
+
+    Данные попадают в кэш (снимок) по мере получения; on_done() вызывается
+    из фонового потока, когда предзагрузка закончилась (успешно или нет).
+    """
+
+    def __init__(self, timeline=None, on_done=None):
+        self.timeline = timeline
+        self.on_done = on_done
+        self.done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="backend-prefetch", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def wait(self, timeout=None) -> bool:
+        return self.done.wait(timeout)
+
+    def _run(self):
+        try:
+            precache_windows(self.timeline)
+        finally:
+            self.done.set()
+            if self.on_done is not None:
+                try:
+                    self.on_done()
+                except Exception as e:
+                    print(f"[PRE-CACHE] on_done error: {e}", flush=True)
+
+
+_prefetch = None  # текущая Prefetch (пока идёт — refresh_windows_cache её не дублирует)
+
+
+def start_prefetch(timeline=None, on_done=None) -> Prefetch:
+    """Запустить предзагрузку окон в фоне (вместо блокирующей precache_windows перед Qt)"""
+    global _prefetch
+    _prefetch = Prefetch(timeline, on_done).start()
+    return _prefetch
+
+# Алиас для совместимости
+precache_aerospace_windows = precache_windows
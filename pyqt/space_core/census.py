@@ -0,0 +1,138 @@
+"""
+Перепись ресурсов UI: живые виджеты и QObject по классам, байты картинок,
+память Python (tracemalloc) — чтобы утечки долгой сессии были видны числами.
+
+    census = Census(roots=[window], sources={"icon_cache_bytes": icon_bytes})
+    before = census.take()
+    ...
+    changes = diff(before, census.take())   # {"widgets/QLabel": +12, ...}
+
+Снимок — плоский словарь счётчиков по разделам (widgets/, objects/,
+memory/, python/), его можно сохранить в JSON и сравнить с любым другим.
+tracemalloc включается только по требованию (start_tracing) — он замедляет
+каждое выделение памяти; без него раздел python/ — только число объектов gc.
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+from collections import Counter
+
+from space_core.persist import atomic_write_bytes
+
+_TRACE_FRAMES = 8
+
+
+def start_tracing():
+    """Включить tracemalloc (с цепочкой кадров для мест роста)"""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(_TRACE_FRAMES)
+
+
+def widget_counts() -> Counter:
+    """Живые виджеты приложения по классам (включая скрытые и ждущие deleteLater)"""
+    from PyQt6.QtWidgets import QApplication
+    return Counter(type(w).__name__ for w in QApplication.allWidgets())
+
+
+def object_counts(roots) -> Counter:
+    """Не-виджетные QObject (QAction, QSystemTrayIcon, таймеры, анимации) под roots"""
+    from PyQt6.QtCore import QObject
+    from PyQt6.QtWidgets import QWidget
+    counts = Counter()
+    for root in roots:
+        for obj in root.findChildren(QObject):
+            if not isinstance(obj, QWidget):
+                counts[type(obj).__name__] += 1
+    return counts
+
+
+def label_pixmap_bytes() -> int:
+    """Байты картинок, которые держат живые QLabel (иконки, миниатюры)"""
+    from PyQt6.QtWidgets import QApplication, QLabel
+    total = 0
+    for w in QApplication.allWidgets():
+        if isinstance(w, QLabel):
+            pixmap = w.pixmap()
+            if pixmap is not None and not pixmap.isNull():
+                total += pixmap.width() * pixmap.height() * pixmap.depth() // 8
+    return total
+
+
+class Census:
+    """Снимки ресурсов; sources — {имя: функция} с дополнительными числами (кэши)"""
+
+    def __init__(self, roots=(), sources=None):
+        self.roots = list(roots)
+        self.sources = dict(sources or {})
+        self.previous = None
+        self._trace_snapshot = None
+
+    def take(self) -> dict:
+        from PyQt6.QtGui import QPixmapCache
+        counts = {}
+        for name, count in widget_counts().items():
+            counts[f"widgets/{name}"] = count
+        for name, count in object_counts(self.roots).items():
+            counts[f"objects/{name}"] = count
+        counts["memory/label_pixmap_bytes"] = label_pixmap_bytes()
+        counts["memory/pixmap_cache_limit_kb"] = QPixmapCache.cacheLimit()
+        for name, source in self.sources.items():
+            counts[f"memory/{name}"] = int(source())
+        counts["python/gc_objects"] = len(gc.get_objects())
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            counts["python/traced_kb"] = current // 1024
+            counts["python/traced_peak_kb"] = peak // 1024
+        return counts
+
+    def growth(self, limit: int = 10) -> list:
+        """Места наибольшего роста памяти Python с прошлого вызова (нужен start_tracing)"""
+        if not tracemalloc.is_tracing():
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        previous, self._trace_snapshot = self._trace_snapshot, snapshot
+        if previous is None:
+            return []
+        stats = snapshot.compare_to(previous, "lineno")
+        return [f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}: "
+                f"{stat.size_diff / 1024:+.1f} KB ({stat.count_diff:+d} blocks)"
+                for stat in stats[:limit] if stat.size_diff > 0]
+
+    def dump(self, path) -> dict:
+        """Снять перепись, сравнить с прошлой и записать в path: {"counts", "changes", "growth"}"""
+        growth = self.growth()  # до переписи: снимок tracemalloc сам занимает объекты
+        counts = self.take()
+        report = {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "counts": counts,
+            "changes": diff(self.previous, counts) if self.previous else {},
+            "growth": growth,
+        }
+        self.previous = counts
+        atomic_write_bytes(path, json.dumps(report, indent=2, ensure_ascii=False).encode("utf-8"))
+        return report
+
+
+def diff(before: dict, after: dict) -> dict:
+    """Ненулевые изменения счётчиков: {ключ: after - before}"""
+    changes = {}
+    for key in sorted(set(before) | set(after)):
+        delta = after.get(key, 0) - before.get(key, 0)
+        if delta:
+            changes[key] = delta
+    return changes
+
+
+def format_changes(changes: dict, prefixes=("widgets/", "objects/", "memory/", "python/")) -> list:
+    """Строки для лога: сначала самые большие изменения в каждом разделе"""
+    lines = []
+    for prefix in prefixes:
+        part = {k: v for k, v in changes.items() if k.startswith(prefix)}
+        for key, delta in sorted(part.items(), key=lambda kv: -abs(kv[1])):
+            lines.append(f"{key}: {delta:+d}")
+    return lines
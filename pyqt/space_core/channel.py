@@ -0,0 +1,264 @@
+"""
+Постоянный канал к бэкенду: Unix-сокет, строки JSON.
+
+Запрос:  {"id": "1f2e-9a0b3c4d-1", "cmd": "focus", "args": [12345]}\\n
+Ответ:   {"id": "1f2e-9a0b3c4d-1", "ok": true, "result": ...}\\n   (или "ok": false, "error": "...")
+
+Сервер в init.lua отвечает всем подключённым клиентам сразу (hs.socket не
+адресует клиента), поэтому id уникален на клиента: pid + случайная метка
++ номер запроса — GUI и демон не примут чужой ответ за свой.
+
+BackendChannel держит одно соединение (ленивое подключение, одна попытка
+переподключения), поэтому вызов стоит один round-trip по сокету, а не форк
+`hs -c` на каждое действие. ChannelServer — та же протокольная сторона
+на Python: поддельный бэкенд для тестов на Linux и основа для демона.
+
+LatencyLog хранит время каждого пути (channel / hs-cli / applescript),
+чтобы было видно, что даёт канал по сравнению с запасными путями.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+
+# Сокет сервера канала в init.lua Hammerspoon
+CHANNEL_PATH = Path.home() / ".config" / "space-manager" / "hs.sock"
+
+
+class ChannelError(Exception):
+    """Канал недоступен или бэкенд вернул ошибку"""
+
+
+class BackendError(ChannelError):
+    """Бэкенд получил команду и ответил ошибкой (канал при этом исправен)"""
+
+
+class ReplyError(ChannelError):
+    """Запрос ушёл целиком, но ответа нет (таймаут, битый ответ): команду не повторять"""
+
+
+class BackendChannel:
+    """Клиент канала: call(cmd, *args) — синхронный, потокобезопасный; path=None — канал выключен"""
+
+    def __init__(self, path, timeout: float = 2.0, connect_timeout: float = 0.2):
+        self.path = str(path) if path is not None else None
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.connects = 0
+        self._sock = None
+        self._file = None
+        self._seq = 0
+        self._client_id = f"{os.getpid():x}-{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return self.path is not None and os.path.exists(self.path)
+
+    def call(self, cmd: str, *args, timeout: float = None):
+        """
+        Выполнить команду; ChannelError — канал недоступен (запрос не ушёл),
+        ReplyError — запрос ушёл, ответа нет, BackendError — команда не удалась
+        """
+        with self._lock:
+            for attempt in (1, 2):
+                sent = False
+                try:
+                    self._ensure_connected()
+                    self._sock.settimeout(timeout or self.timeout)
+                    self._seq += 1
+                    request_id = f"{self._client_id}-{self._seq}"
+                    request = {"id": request_id, "cmd": cmd, "args": list(args)}
+                    self._sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+                    sent = True
+                    reply = self._read_reply(request_id)
+                    break
+                except (OSError, ValueError) as e:
+                    # Бэкенд перезапускался — одно переподключение, потом сдаёмся.
+                    # Отправленный запрос не повторяем: move/goto не идемпотентны
+                    self._close_locked()
+                    if sent:
+                        raise ReplyError(f"{cmd}: {e}") from e
+                    if attempt == 2 or isinstance(e, socket.timeout):
+                        raise ChannelError(f"{cmd}: {e}") from e
+        if not reply.get("ok", False):
+            raise BackendError(f"{cmd}: {reply.get('error', 'failed')}")
+        return reply.get("result")
+
+    def _ensure_connected(self):
+        if self._sock is not None:
+            return
+        if not self.available():
+            raise FileNotFoundError(self.path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.connect_timeout)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+        self._file = sock.makefile("rb")
+        self.connects += 1
+
+    def _read_reply(self, request_id: str) -> dict:
+        while True:
+            line = self._file.readline()
+            if not line:
+                raise ConnectionResetError("channel closed")
+            reply = json.loads(line)
+            # Ответы другим клиентам и на запросы с истёкшим таймаутом пропускаем
+            if reply.get("id") == request_id:
+                return reply
+
+    def close(self):
+        with self._lock:
+            self._close_locked()
+
+    def _close_locked(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._file = None
+
+
+class ChannelServer:
+    """
+    Сервер протокола канала в фоновом потоке.
+
+    handlers: {cmd: fn(*args) -> result}; исключение в обработчике уходит
+    клиенту как {"ok": false, "error": ...}. Каждое соединение — свой поток.
+    """
+
+    def __init__(self, path, handlers: dict):
+        self.path = str(path)
+        self.handlers = dict(handlers)
+        self.requests = 0
+        self._sock = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # сокет от упавшего процесса
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.path)
+        os.chmod(self.path, 0o600)
+        self._sock.listen(8)
+        self._sock.settimeout(0.2)
+        self._thread = threading.Thread(target=self._accept_loop, name="channel-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        if self._sock is not None:
+            self._sock.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), name="channel-conn", daemon=True).start()
+
+    def _serve(self, conn):
+        conn.settimeout(None)
+        with conn, conn.makefile("rb") as reader:
+            for line in reader:
+                if self._stop.is_set():
+                    return
+                try:
+                    conn.sendall(json.dumps(self.handle_line(line), ensure_ascii=False).encode("utf-8") + b"\n")
+                except OSError:
+                    return
+
+    def handle_line(self, line: bytes) -> dict:
+        self.requests += 1
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {"id": None, "ok": False, "error": "bad json"}
+        handler = self.handlers.get(request.get("cmd"))
+        if handler is None:
+            return {"id": request.get("id"), "ok": False, "error": f"unknown command {request.get('cmd')!r}"}
+        try:
+            result = handler(*request.get("args", []))
+        except Exception as e:
+            return {"id": request.get("id"), "ok": False, "error": str(e)}
+        return {"id": request.get("id"), "ok": True, "result": result}
+
+
+class LatencyLog:
+    """Задержки по путям выполнения: record("focus/channel", секунды)"""
+
+    def __init__(self, window: int = 256):
+        self.window = window
+        self._samples = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, path: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(path)
+            if samples is None:
+                samples = self._samples[path] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._counts[path] = self._counts.get(path, 0) + 1
+
+    def timed(self, path: str):
+        """with latency.timed("switch/channel"): ..."""
+        return _Timer(self, path)
+
+    def summary(self) -> dict:
+        """{path: {count, p50_ms, p99_ms, max_ms}} по последним window замерам"""
+        result = {}
+        with self._lock:
+            items = [(path, sorted(samples), self._counts[path]) for path, samples in self._samples.items()]
+        for path, samples, count in items:
+            result[path] = {
+                "count": count,
+                "p50_ms": round(samples[len(samples) // 2] * 1000, 2),
+                "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 2),
+                "max_ms": round(samples[-1] * 1000, 2),
+            }
+        return result
+
+
+class _Timer:
+    __slots__ = ("log", "path", "t0")
+
+    def __init__(self, log: LatencyLog, path: str):
+        self.log = log
+        self.path = path
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Неудачные попытки не смешиваем с успешными: путь с суффиксом /error
+        path = self.path if exc_type is None else f"{self.path}/error"
+        self.log.record(path, time.perf_counter() - self.t0)
+        return False
@@ -0,0 +1,295 @@
+"""
+Headless-запросы из скриптов: окна, Spaces, активный Space, поиск — без Qt.
+
+    python space_manager_v2.py list-windows --app Terminal,Терминал --space current
+    python space_manager_v2.py list-spaces --format ndjson
+    python space_manager_v2.py focused
+    python space_manager_v2.py find "readme" --limit 5
+    python space_manager_v2.py terminals --all --sink stickies
+    python space_manager_v2.py layout-save work && python space_manager_v2.py layout-apply work
+
+Источник данных: запущенный демон (space_core.daemon), иначе backend
+напрямую (один проход Hammerspoon). --fake — поддельный бэкенд для Linux.
+Вывод: JSON-массив или NDJSON (строка на запись); строки пишутся по мере
+обхода снимка. Демон отвечает на команду одним JSON целиком, так что на этом
+пути ответ сначала собирается в памяти клиента. Логи backend уходят в stderr,
+stdout остаётся чистым JSON.
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+
+from space_core import client
+
+COMMANDS = ("list-windows", "list-spaces", "focused", "find", "terminals",
+            "layouts", "layout-save", "layout-apply", "layout-delete")
+
+
+class DaemonSource:
+    """Данные от демона: один round-trip на команду"""
+
+    def __init__(self, path: str = None):
+        self.path = path
+
+    def _call(self, cmd: str, *args, timeout: float = 5.0):
+        return client.call(cmd, *args, path=self.path, timeout=timeout)
+
+    def available(self) -> bool:
+        try:
+            self._call("ping")
+        except OSError:
+            return False
+        return True
+
+    def focused(self) -> dict:
+        return self._call("focused")
+
+    def windows(self, app=None, space=None, title=None):
+        filters = {"app": app, "space": space, "title": title}
+        return self._call("list", {k: v for k, v in filters.items() if v is not None})
+
+    def spaces(self) -> list:
+        return self._call("spaces")
+
+    def find(self, query: str, limit: int) -> list:
+        return self._call("search", query, limit)
+
+    def move_many(self, moves: list) -> list:
+        # Переносы идут через Mission Control — до пары секунд на окно
+        return self._call("move_many", [list(m) for m in moves], timeout=10.0 + 2.0 * len(moves))
+
+
+class BackendSource:
+    """Данные напрямую из backend: кэш заполняется одним проходом при первом запросе"""
+
+    def __init__(self, names_path=None):
+        from space_core import backend
+        self.backend = backend
+        self.names_path = names_path
+        self._loaded = False
+
+    def _snapshot(self):
+        if not self._loaded:
+            # [PRE-CACHE]-логи backend — в stderr, stdout только под JSON
+            with contextlib.redirect_stdout(sys.stderr):
+                self.backend.precache_windows()
+            self._loaded = True
+        return self.backend.get_snapshot()
+
+    def focused(self) -> dict:
+        snapshot = self._snapshot()
+        with contextlib.redirect_stdout(sys.stderr):
+            window_id = self.backend.get_focused_window_id()
+        return {"space": snapshot.focused, "window_id": window_id}
+
+    def windows(self, app=None, space=None, title=None):
+        from space_core.query import iter_windows
+        return iter_windows(self._snapshot(), app=app, space=space, title=title)
+
+    def spaces(self) -> list:
+        from space_core.names import NAMES_PATH, read_names_file
+        from space_core.query import space_rows
+        snapshot = self._snapshot()
+        names = read_names_file(self.names_path or NAMES_PATH)
+        return space_rows(snapshot, names, self.backend.get_space_identity().key)
+
+    def find(self, query: str, limit: int) -> list:
+        self._snapshot()
+        return self.backend.get_search_index().search(query, limit)
+
+    def move_many(self, moves: list) -> list:
+        self._snapshot()
+        with contextlib.redirect_stdout(sys.stderr):
+            results = self.backend.move_windows_to_spaces(moves)
+        return [{"window_id": window_id, "success": ok, "message": message}
+                for window_id, (ok, message) in results.items()]
+
+
+def open_source(kind: str = "auto", fake: bool = False, socket_path: str = None, replay: str = None):
+    """auto — демон, если отвечает, иначе backend; fake/replay — backend на поддельном бэкенде или записи"""
+    if replay:
+        from space_core.recording import ReplayBackend
+        ReplayBackend.from_file(replay, speed=0).install()
+        return BackendSource()
+    if fake:
+        from space_core.fake import FakeHammerspoon
+        FakeHammerspoon.demo().install()
+        return BackendSource()
+    if kind in ("auto", "daemon"):
+        source = DaemonSource(socket_path)
+        if kind == "daemon" or source.available():
+            return source
+    return BackendSource()
+
+
+def resolve_space(source, space):
+    """--space: номер или "current" (активный Space)"""
+    if space is None:
+        return None
+    if str(space).lower() == "current":
+        return source.focused()["space"]
+    return int(space)
+
+
+def write_rows(rows, fmt: str = "json", out=None):
+    """Записи по одной по мере итерации: NDJSON или JSON-массив"""
+    out = out or sys.stdout
+    count = 0
+    if fmt == "ndjson":
+        for row in rows:
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            out.flush()
+            count += 1
+        return count
+    out.write("[")
+    for row in rows:
+        out.write(("," if count else "") + "\n  " + json.dumps(row, ensure_ascii=False))
+        out.flush()
+        count += 1
+    out.write("\n]\n" if count else "]\n")
+    out.flush()
+    return count
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="space_manager_v2.py", description="Space Manager headless queries")
+    parser.add_argument("--source", choices=("auto", "daemon", "backend"), default="auto")
+    parser.add_argument("--socket", help="сокет демона (по умолчанию как у space_core.client)")
+    parser.add_argument("--fake", action="store_true", help="поддельный бэкенд (Linux, тесты)")
+    parser.add_argument("--replay", metavar="PATH", help="ответы из записи сессии (space_core.recording)")
+    parser.add_argument("--format", choices=("json", "ndjson"), default="json")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    windows = sub.add_parser("list-windows", help="окна с фильтрами")
+    windows.add_argument("--app", help="приложение или псевдонимы через запятую")
+    windows.add_argument("--space", help='номер Space или "current"')
+    windows.add_argument("--title", help="подстрока заголовка")
+
+    sub.add_parser("list-spaces", help="Spaces: номер, название, окна, активный")
+    sub.add_parser("focused", help="активный Space и окно")
+
+    find = sub.add_parser("find", help="поиск окон по приложению и заголовку")
+    find.add_argument("query", nargs="+")
+    find.add_argument("--limit", type=int, default=20)
+
+    terminals = sub.add_parser("terminals", help="текстовый список окон терминала (space_core.terminals)")
+    terminals.add_argument("--all", action="store_true", help="со всех Spaces, а не только с текущего")
+    terminals.add_argument("--apps", help="псевдонимы приложения через запятую (по умолчанию Terminal,Терминал)")
+    terminals.add_argument("--sink", choices=("stdout", "file", "stickies"), default="stdout")
+    terminals.add_argument("--output", help="файл для --sink file")
+
+    store = argparse.ArgumentParser(add_help=False)
+    store.add_argument("--layouts", metavar="PATH", help="файл пресетов (по умолчанию CONFIG_DIR/layouts.json)")
+    sub.add_parser("layouts", parents=[store], help="сохранённые раскладки окон")
+    save = sub.add_parser("layout-save", parents=[store], help="сохранить текущую раскладку окон по Spaces")
+    save.add_argument("name")
+    apply = sub.add_parser("layout-apply", parents=[store], help="перенести окна по раскладке (одним пакетом)")
+    apply.add_argument("name")
+    apply.add_argument("--dry-run", action="store_true", help="только показать план переносов")
+    delete = sub.add_parser("layout-delete", parents=[store], help="удалить раскладку")
+    delete.add_argument("name")
+    return parser
+
+
+_GLOBAL_OPTIONS = {"--source": 1, "--socket": 1, "--fake": 0, "--replay": 1, "--format": 1}
+
+
+def _hoist_global_options(argv: list) -> list:
+    """Общие опции — в начало: argparse принимает их только до подкоманды"""
+    hoisted, rest = [], []
+    i = 0
+    while i < len(argv):
+        width = _GLOBAL_OPTIONS.get(argv[i].split("=", 1)[0])
+        if width is None:
+            rest.append(argv[i])
+            i += 1
+            continue
+        width = 0 if "=" in argv[i] else width
+        hoisted.extend(argv[i:i + 1 + width])
+        i += 1 + width
+    return hoisted + rest
+
+
+def run_layout(args, source) -> int:
+    """Команды layouts/layout-*: пресеты space_core.layouts"""
+    from space_core import layouts
+    store = layouts.LayoutStore(args.layouts) if args.layouts else layouts.LayoutStore()
+    if args.command == "layouts":
+        rows = [{"name": name, "rules": len(preset.rules), "spaces": preset.spaces()}
+                for name, preset in sorted(store.load().items())]
+        write_rows(rows, args.format)
+        return 0
+    if args.command == "layout-delete":
+        if not store.delete(args.name):
+            print(f"error: no layout {args.name!r}", file=sys.stderr)
+            return 1
+        return 0
+    if args.command == "layout-save":
+        preset = layouts.capture(args.name, source.windows())
+        store.save(preset)
+        print(f"[LAYOUT] Saved {args.name!r}: {len(preset.rules)} rules, spaces {preset.spaces()}", file=sys.stderr)
+        write_rows((rule.to_dict() for rule in preset.rules), args.format)
+        return 0
+
+    try:
+        preset = store.get(args.name)
+    except KeyError as e:
+        print(f"error: {e.args[0]}", file=sys.stderr)
+        return 1
+    layout = layouts.plan(preset, list(source.windows()), len(source.spaces()))
+    print(f"[LAYOUT] {layout.summary()}", file=sys.stderr)
+    if args.dry_run or not layout.moves:
+        write_rows(layout.moves + layout.skipped, args.format)
+        return 0
+    results = {r["window_id"]: r for r in source.move_many(layout.batch())}
+    rows = [dict(move, success=results.get(move["window_id"], {}).get("success", False),
+                 message=results.get(move["window_id"], {}).get("message", "no result"))
+            for move in layout.moves]
+    write_rows(rows + layout.skipped, args.format)
+    return 0 if all(row["success"] for row in rows) else 1
+
+
+def run(args) -> int:
+    source = open_source(args.source, args.fake, args.socket, args.replay)
+    if args.command.startswith("layout"):
+        return run_layout(args, source)
+    if args.command == "terminals":
+        from space_core import terminals
+        scope = "all" if args.all else "here"
+        rows = terminals.terminal_rows(source, scope, args.apps or terminals.TERMINAL_APPS)
+        terminals.make_sink(args.sink, args.output).deliver(terminals.format_listing(rows, scope))
+        return 0
+    if args.command == "focused":
+        focused = source.focused()
+        if args.format == "json":
+            print(json.dumps(focused, ensure_ascii=False), flush=True)
+            return 0
+        rows = [focused]
+    elif args.command == "list-windows":
+        rows = source.windows(app=args.app, space=resolve_space(source, args.space), title=args.title)
+    elif args.command == "list-spaces":
+        rows = source.spaces()
+    else:
+        rows = source.find(" ".join(args.query), args.limit)
+    write_rows(rows, args.format)
+    return 0
+
+
+def main(argv=None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # Общие опции можно ставить и после команды: list-windows --format ndjson
+    args = build_parser().parse_args(_hoist_global_options(argv))
+    try:
+        return run(args)
+    except client.DaemonError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"daemon unavailable: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Тонкий клиент демона (space_core.daemon): одна команда — один round-trip.
+
+Намеренно импортирует только stdlib-минимум (без Qt, PyObjC, argparse и
+остального space_core), чтобы запуск стоил миллисекунды:
+
+    python -m space_core.client list --app Terminal --space 2
+    python -m space_core.client search "readme"
+    python -m space_core.client switch 3
+    python -m space_core.client move 1234 2
+
+Путь сокета — SPACE_MANAGER_DAEMON или ~/.config/space-manager/daemon.sock
+(тот же, что config.DAEMON_PATH). Ответ печатается как JSON; код выхода 1 —
+демон вернул ошибку, 2 — демон недоступен.
+"""
+
+import json
+import os
+import socket
+import sys
+
+# Тот же путь, что space_core.config.DAEMON_PATH (не импортируем config ради pathlib)
+DEFAULT_PATH = "~/.config/space-manager/daemon.sock"
+
+USAGE = """usage: space_core.client COMMAND [ARGS]
+  ping | spaces | focused | names | refresh | metrics
+  list [--app A[,B]] [--space N] [--title TEXT]
+  search QUERY [--limit N]
+  switch N | move WINDOW_ID N | focus WINDOW_ID | rename N NAME"""
+
+
+class DaemonError(Exception):
+    """Демон получил команду и ответил ошибкой"""
+
+
+def socket_path() -> str:
+    return os.environ.get("SPACE_MANAGER_DAEMON") or os.path.expanduser(DEFAULT_PATH)
+
+
+def call(cmd: str, *args, path: str = None, timeout: float = 5.0):
+    """Один запрос к демону; OSError — демон недоступен, DaemonError — ошибка команды"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path or socket_path())
+        sock.sendall(json.dumps({"id": 1, "cmd": cmd, "args": list(args)}).encode("utf-8") + b"\n")
+        buf = b""
+        while not buf.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                raise ConnectionResetError("daemon closed connection")
+            buf += chunk
+    finally:
+        sock.close()
+    reply = json.loads(buf)
+    if not reply.get("ok", False):
+        raise DaemonError(reply.get("error", "failed"))
+    return reply.get("result")
+
+
+def _split_options(argv: list) -> tuple:
+    """["a", "--app", "X", "b"] -> (["a", "b"], {"app": "X"})"""
+    positional, options = [], {}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg.startswith("--") and i + 1 < len(argv):
+            options[arg[2:]] = argv[i + 1]
+            i += 2
+        else:
+            positional.append(arg)
+            i += 1
+    return positional, options
+
+
+def build_request(argv: list) -> tuple:
+    """Аргументы командной строки -> (cmd, args) протокола; ValueError — неверный вызов"""
+    if not argv or argv[0] in ("-h", "--help"):
+        raise ValueError(USAGE)
+    cmd, (positional, options) = argv[0], _split_options(argv[1:])
+    if cmd == "list":
+        filters = dict(options)
+        if "space" in filters:
+            filters["space"] = int(filters["space"])
+        return cmd, [filters]
+    if cmd == "search":
+        return cmd, [" ".join(positional), int(options.get("limit", 20))]
+    if cmd in ("switch", "focus"):
+        return cmd, [int(positional[0])]
+    if cmd == "move":
+        return cmd, [int(positional[0]), int(positional[1])]
+    if cmd == "rename":
+        return cmd, [int(positional[0]), " ".join(positional[1:])]
+    return cmd, positional
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    try:
+        cmd, args = build_request(argv)
+    except (ValueError, IndexError) as e:
+        message = str(e)
+        print(message if message == USAGE else f"error: {message}\n{USAGE}", file=sys.stderr)
+        return 2
+    try:
+        result = call(cmd, *args)
+    except DaemonError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"daemon unavailable ({socket_path()}): {e}", file=sys.stderr)
+        return 2
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,24 @@
+"""
+Пути к настройкам и состоянию Space Manager.
+"""
+
+from pathlib import Path
+
+CONFIG_DIR = Path.home() / "Клэр" / "apps" / "space-manager"
+CONFIG_PATH = CONFIG_DIR / "config.json"      # Старый единый файл (мигрируется)
+SETTINGS_PATH = CONFIG_DIR / "settings.json"  # Холодные настройки: читаются при старте
+STATE_PATH = CONFIG_DIR / "state.log"         # Горячее состояние: append-журнал
+
+# Что живёт в settings.json; горячее (active_space, space_windows/N,
+# minimized_windows) — в журнале состояния, названия — в общем NAMES_PATH
+SETTINGS_KEYS = ("rows", "cols", "total_spaces", "show_apps")
+
+# Сокет резидентного демона (space_core.daemon); тот же путь зашит в space_core.client
+DAEMON_PATH = Path.home() / ".config" / "space-manager" / "daemon.sock"
+
+# Экспорт метрик (space_core.metrics) из трея: JSON и Prometheus text format
+METRICS_JSON_PATH = CONFIG_DIR / "metrics.json"
+METRICS_PROM_PATH = CONFIG_DIR / "metrics.prom"
+
+# Именованные раскладки окон по Spaces (space_core.layouts)
+LAYOUTS_PATH = CONFIG_DIR / "layouts.json"
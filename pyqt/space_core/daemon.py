@@ -0,0 +1,197 @@
+"""
+Резидентный демон Space Manager: тёплый кэш окон и соединения с бэкендом,
+локальный API на Unix-сокете (протокол space_core.channel).
+
+    python -m space_core.daemon            # настоящий Hammerspoon
+    python -m space_core.daemon --fake     # поддельный бэкенд (Linux)
+
+Команды: ping, list, spaces, focused, search, switch, move, move_many, focus,
+names, rename, refresh, metrics. Клиент — space_core.client (без Qt и PyObjC).
+
+Кэш обновляется в фоне каждые refresh секунд; запросы читают готовый снимок,
+поэтому ответ на list/search — доли миллисекунды плюс round-trip по сокету.
+"""
+
+import argparse
+import os
+import signal
+import tempfile
+import threading
+from pathlib import Path
+
+from space_core import backend, metrics
+from space_core.channel import BackendChannel, ChannelServer
+from space_core.config import DAEMON_PATH
+from space_core.names import NAMES_PATH, SpaceNameStore
+from space_core.query import iter_windows, space_rows
+
+
+class SpaceDaemon:
+    """Сервер команд поверх backend; start()/stop() или serve_forever()"""
+
+    def __init__(self, path=DAEMON_PATH, names: SpaceNameStore = None, refresh: float = 5.0):
+        self.path = Path(path)
+        self.names = names if names is not None else SpaceNameStore(NAMES_PATH)
+        self.refresh_interval = refresh
+        self.server = ChannelServer(self.path, self.handlers())
+        self._stop = threading.Event()
+        self._refresher = None
+        # Индекс поиска не потокобезопасен, а соединения обслуживаются в своих потоках
+        self._search_lock = threading.Lock()
+
+    def handlers(self) -> dict:
+        return {
+            "ping": self.ping,
+            "list": self.list_windows,
+            "spaces": self.list_spaces,
+            "focused": self.focused,
+            "search": self.search,
+            "switch": self.switch,
+            "move": self.move,
+            "move_many": self.move_many,
+            "focus": self.focus,
+            "names": self.names.all,
+            "rename": self.rename,
+            "refresh": self.refresh,
+            "metrics": metrics.REGISTRY.snapshot,
+        }
+
+    # === Команды ===
+
+    def ping(self) -> dict:
+        snapshot = backend.get_snapshot()
+        return {"pid": os.getpid(), "version": snapshot.version, "windows": len(snapshot.windows),
+                "fetched_at": snapshot.fetched_at}
+
+    def list_windows(self, filters: dict = None) -> list:
+        """filters: {"app": "Terminal,Терминал", "space": 2, "title": "..."}"""
+        filters = filters or {}
+        return list(iter_windows(backend.get_snapshot(), app=filters.get("app"),
+                                 space=filters.get("space"), title=filters.get("title")))
+
+    def list_spaces(self) -> list:
+        return space_rows(backend.get_snapshot(), self.names.all(), backend.get_space_identity().key)
+
+    def focused(self) -> dict:
+        return {"space": backend.get_snapshot().focused, "window_id": backend.get_focused_window_id()}
+
+    def search(self, query: str, limit: int = 20) -> list:
+        with self._search_lock:
+            return backend.get_search_index().search(query, int(limit))
+
+    def switch(self, space: int) -> int:
+        # Клиенту важен результат: ждём действие и перечитываем активный Space
+        backend.switch_space(int(space)).result(timeout=5.0)
+        return backend.update_focused_workspace_sync()
+
+    def move(self, window_id: int, space: int) -> str:
+        ok, message = backend.move_window_to_space(int(window_id), int(space))
+        if not ok:
+            raise RuntimeError(message)
+        return message
+
+    def move_many(self, moves: list) -> list:
+        """moves: [[window_id, space], ...] одним вызовом бэкенда -> результат на каждое окно"""
+        results = backend.move_windows_to_spaces([(int(w), int(s)) for w, s in moves])
+        return [{"window_id": window_id, "success": ok, "message": message}
+                for window_id, (ok, message) in results.items()]
+
+    def focus(self, window_id: int) -> bool:
+        window_id = int(window_id)
+        record = next((w for w in backend.get_snapshot().windows.values() if w.get("id") == window_id), {})
+        with self._search_lock:
+            action = backend.focus_window_by_id(window_id, record.get("app", ""), record.get("title", ""))
+        action.result(timeout=5.0)
+        return True
+
+    def rename(self, space: int, name: str) -> dict:
+        self.names.set(int(space), name)
+        return self.names.all()
+
+    def refresh(self) -> dict:
+        backend.precache_windows()
+        return self.ping()
+
+    # === Жизненный цикл ===
+
+    def start(self):
+        if self.names.exists():
+            self.names.load()
+        backend.precache_windows()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.server.start()
+        self._refresher = threading.Thread(target=self._refresh_loop, name="daemon-refresh", daemon=True)
+        self._refresher.start()
+        print(f"[DAEMON] Listening on {self.path} (pid {os.getpid()})", flush=True)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.server.stop()
+        print("[DAEMON] Stopped", flush=True)
+
+    def serve_forever(self):
+        self.start()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: self._stop.set())
+        while not self._stop.wait(0.5):
+            pass
+        self.stop()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.names.reload_if_changed()
+                backend.precache_windows()
+            except Exception as e:
+                print(f"[DAEMON] Refresh error: {e}", flush=True)
+
+
+def install_fake_backend(tmpdir: str, spaces: int = 4, per_space: int = 5):
+    """Поддельный Hammerspoon с собственным сервером канала (для запуска на Linux)"""
+    from space_core.fake import FakeHammerspoon
+    fake = FakeHammerspoon.demo(spaces=spaces, per_space=per_space)
+    server = ChannelServer(os.path.join(tmpdir, "hs.sock"), fake.handlers()).start()
+    fake.install(channel=BackendChannel(server.path))
+    return fake, server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Space Manager daemon")
+    parser.add_argument("--socket", default=str(DAEMON_PATH), help="путь Unix-сокета API")
+    parser.add_argument("--refresh", type=float, default=5.0, help="период обновления кэша, с")
+    parser.add_argument("--names", help="файл названий Spaces (по умолчанию общий)")
+    parser.add_argument("--fake", action="store_true", help="поддельный бэкенд вместо Hammerspoon")
+    parser.add_argument("--fake-spaces", type=int, default=4)
+    parser.add_argument("--fake-windows", type=int, default=5, help="окон на Space")
+    parser.add_argument("--record", metavar="PATH", help="записывать трафик к бэкенду (space_core.recording)")
+    parser.add_argument("--replay", metavar="PATH", help="отвечать из записи вместо Hammerspoon")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="1 — исходные задержки, 0 — без задержек")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="space-manager-") as tmp:
+        fake_server = None
+        if args.fake:
+            _, fake_server = install_fake_backend(tmp, args.fake_spaces, args.fake_windows)
+            # Названия поддельного стола не должны попасть в Hammerspoon/SketchyBar
+            names = SpaceNameStore(args.names or os.path.join(tmp, "space_names.json"), pushers=())
+        else:
+            names = SpaceNameStore(args.names) if args.names else None
+        if args.replay:
+            from space_core.recording import ReplayBackend
+            ReplayBackend.from_file(args.replay, args.replay_speed).install()
+        recorder = None
+        if args.record:
+            from space_core.recording import install_recorder
+            recorder = install_recorder(args.record)
+        try:
+            SpaceDaemon(args.socket, names, args.refresh).serve_forever()
+        finally:
+            if recorder is not None:
+                recorder.close()
+            if fake_server is not None:
+                fake_server.stop()
+
+
+if __name__ == "__main__":
+    main()
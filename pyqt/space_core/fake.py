@@ -0,0 +1,170 @@
+"""
+Поддельный Hammerspoon: окна и Spaces в памяти, ответы в формате init.lua.
+
+Нужен, чтобы гонять демон, CLI и запросы на Linux без macOS:
+
+    fake = FakeHammerspoon.demo()
+    fake.install()          # backend ходит в fake вместо `hs -c`
+
+hs_call() понимает те же строки Lua, что шлёт backend (return ls(), lw(),
+mw(id, n), mwi(id, spaceId), smFocusWindow(id), ...); handlers() — команды
+постоянного канала для ChannelServer.
+"""
+
+import json
+import re
+import threading
+import time
+
+FAKE_DISPLAY = "FAKE-DISPLAY"
+
+# Приложения демо-набора: есть и терминалы под разными именами
+_DEMO_APPS = ("Terminal", "Safari", "Code", "Терминал", "Telegram", "iTerm2")
+
+
+class FakeHammerspoon:
+    """Состояние «рабочего стола»: окна (записи как у lw()), число Spaces, активный Space"""
+
+    def __init__(self, windows=(), spaces: int = 4, focused: int = 1, latency: float = 0.0):
+        self.spaces = spaces
+        self.focused = focused
+        self.latency = latency  # имитация задержки hs -c, секунды
+        self.focused_window = 0
+        self.calls = []
+        self._lock = threading.Lock()
+        self._windows = {}
+        for w in windows:
+            self._windows[w["id"]] = self._record(dict(w))
+
+    @classmethod
+    def demo(cls, spaces: int = 4, per_space: int = 5, **kwargs) -> "FakeHammerspoon":
+        """Детерминированный набор: per_space окон на каждом Space, приложения по кругу"""
+        windows, wid = [], 1000
+        for space in range(1, spaces + 1):
+            for i in range(per_space):
+                app = _DEMO_APPS[(space + i) % len(_DEMO_APPS)]
+                windows.append({"id": wid, "app": app, "title": f"{app} {space}.{i + 1}",
+                                "spaceIndex": space})
+                wid += 1
+        return cls(windows, spaces=spaces, **kwargs)
+
+    def space_id(self, index: int) -> int:
+        return 100 + index
+
+    def _record(self, w: dict) -> dict:
+        index = w.get("spaceIndex") or 1
+        w.setdefault("spaceId", self.space_id(index))
+        w.setdefault("display", FAKE_DISPLAY)
+        w.setdefault("displayIndex", 1)
+        w.setdefault("visible", True)
+        w.setdefault("minimized", False)
+        return w
+
+    # === Состояние ===
+
+    def add_window(self, window_id: int, app: str, title: str, space: int = 1, **fields):
+        with self._lock:
+            self._windows[window_id] = self._record(dict(fields, id=window_id, app=app, title=title,
+                                                         spaceIndex=space))
+
+    def remove_window(self, window_id: int):
+        with self._lock:
+            self._windows.pop(window_id, None)
+
+    def windows(self) -> list:
+        with self._lock:
+            return [dict(w) for w in self._windows.values()]
+
+    def _move(self, window_id: int, index: int) -> dict:
+        with self._lock:
+            w = self._windows.get(window_id)
+            if w is None:
+                return {"success": False, "error": "window not found"}
+            if not 1 <= index <= self.spaces:
+                return {"success": False, "error": "invalid space index"}
+            w["spaceIndex"], w["spaceId"] = index, self.space_id(index)
+        return {"success": True}
+
+    def _move_many(self, pairs: str) -> dict:
+        """mwb({{id, spaceId}, ...}): переносы по порядку, результат на каждое окно"""
+        results = []
+        for window_id, space_id in re.findall(r"\{(\d+), (\d+)\}", pairs):
+            result = self._move(int(window_id), int(space_id) - 100)
+            results.append({"id": int(window_id), "success": result["success"], "error": result.get("error")})
+        return {"success": True, "results": results}
+
+    def _focus(self, window_id: int) -> dict:
+        with self._lock:
+            w = self._windows.get(window_id)
+            if w is None:
+                return {"success": False, "error": "window not found"}
+            self.focused_window = window_id
+            self.focused = w["spaceIndex"]
+        return {"success": True}
+
+    def _goto(self, index: int) -> dict:
+        if not 1 <= index <= self.spaces:
+            return {"success": False, "error": "invalid space index"}
+        self.focused = index
+        return {"success": True}
+
+    def _spaces(self) -> dict:
+        ids = [self.space_id(i) for i in range(1, self.spaces + 1)]
+        return {
+            "spaces": ids,
+            "focused": self.space_id(self.focused),
+            "focusedIndex": self.focused,
+            "count": self.spaces,
+            "displays": [{"uuid": FAKE_DISPLAY, "name": "Fake", "index": 1, "spaces": ids,
+                          "current": self.space_id(self.focused)}],
+        }
+
+    # === Транспорт hs -c ===
+
+    _PATTERNS = (
+        (re.compile(r"return ls\(\)"), lambda self: self._spaces()),
+        (re.compile(r"return lw\(\)"), lambda self: self.windows()),
+        (re.compile(r"return fs\(\)"), lambda self: self.focused),
+        (re.compile(r"return mw\((\d+), (\d+)\)"), lambda self, w, n: self._move(int(w), int(n))),
+        (re.compile(r"return mwi\((\d+), (\d+)\)"), lambda self, w, s: self._move(int(w), int(s) - 100)),
+        (re.compile(r"return mwb\(\{(.*)\}\)"), lambda self, pairs: self._move_many(pairs)),
+        (re.compile(r"return smFocusWindow\((\d+)\)"), lambda self, w: self._focus(int(w))),
+        (re.compile(r"return smGotoSpaceId\((\d+)\)"), lambda self, s: self._goto(int(s) - 100)),
+        (re.compile(r"return smGotoSpace\((\d+)\)"), lambda self, n: self._goto(int(n))),
+        (re.compile(r"return smFocusedSpaceId\(\)"), lambda self: self.space_id(self.focused)),
+        (re.compile(r"focusedWindow\(\)"), lambda self: self.focused_window),
+    )
+
+    def hs_call(self, lua_code: str, timeout: float = 2.0) -> str:
+        """Ответ как у `hs -c` (строка JSON или число); пустая строка — команда неизвестна"""
+        self.calls.append(lua_code)
+        if self.latency:
+            time.sleep(self.latency)
+        for pattern, handler in self._PATTERNS:
+            match = pattern.search(lua_code)
+            if match:
+                return json.dumps(handler(self, *match.groups()), ensure_ascii=False)
+        return ""
+
+    # === Постоянный канал (ChannelServer) ===
+
+    def handlers(self) -> dict:
+        def checked(result):
+            if not result.get("success"):
+                raise RuntimeError(result.get("error", "failed"))
+            return result
+        return {
+            "focus": lambda wid: checked(self._focus(int(wid))),
+            "goto": lambda index: checked(self._goto(int(index))),
+            "gotoId": lambda sid: checked(self._goto(int(sid) - 100)),
+            "focused": lambda: self.space_id(self.focused),
+            "focusedWindow": lambda: self.focused_window,
+        }
+
+    def install(self, channel=None):
+        """Направить backend в этот поддельный Hammerspoon (channel — BackendChannel к его серверу)"""
+        from space_core import backend
+        from space_core.channel import BackendChannel
+        # Без своего канала — выключенный: настоящий сокет Hammerspoon не трогаем
+        backend.install_transport(hs_call=self.hs_call, channel=channel or BackendChannel(None))
+        return self
@@ -0,0 +1,182 @@
+"""
+Движок глобальных hotkeys: таблица аккордов, подавление автоповтора и
+«дребезга», учёт времени Python на каждое событие клавиатуры.
+
+Движок не зависит от pynput: на вход — имена клавиш ("ctrl", "alt", "a",
+"`", "1"), поэтому его можно гонять синтетическим потоком событий на Linux.
+key_name() переводит объекты клавиш pynput в эти имена.
+
+Нажатые клавиши хранятся только для модификаторов: обычные клавиши не
+копятся (раньше current_keys рос на каждой клавише, отпущенной вместе с
+модификатором). Пока модификаторы не зажаты, событие отбрасывается за
+одну проверку — почти весь обычный набор текста идёт по этому пути.
+"""
+
+import time
+from collections import deque
+
+MODIFIERS = frozenset({"ctrl", "alt", "shift", "cmd"})
+
+# pynput: ctrl_l/ctrl_r -> ctrl и т.п.
+_MODIFIER_ALIASES = {
+    "ctrl_l": "ctrl", "ctrl_r": "ctrl",
+    "alt_l": "alt", "alt_r": "alt", "alt_gr": "alt",
+    "shift_l": "shift", "shift_r": "shift",
+    "cmd_l": "cmd", "cmd_r": "cmd",
+}
+
+# macOS virtual key codes цифрового ряда: с зажатым Ctrl/Alt pynput часто
+# отдаёт управляющий символ вместо цифры, а vk — всегда
+_DIGIT_VK = {18: "1", 19: "2", 20: "3", 21: "4", 23: "5", 22: "6", 26: "7", 28: "8", 25: "9", 29: "0"}
+
+
+def key_name(key) -> str:
+    """Имя клавиши pynput (Key.ctrl_l, KeyCode(char='a'), KeyCode(vk=18)) для движка"""
+    name = getattr(key, "name", None)
+    if name:
+        return _MODIFIER_ALIASES.get(name, name)
+    vk = getattr(key, "vk", None)
+    if vk in _DIGIT_VK:
+        return _DIGIT_VK[vk]
+    char = getattr(key, "char", None)
+    if char:
+        return char.lower()
+    return f"vk{vk}" if vk is not None else "?"
+
+
+class Chord:
+    """Аккорд: набор модификаторов + одна из альтернативных клавиш"""
+
+    __slots__ = ("modifiers", "keys", "action", "arg")
+
+    def __init__(self, spec: str, action: str, arg: int = 0):
+        # "ctrl+alt+1", "ctrl+`|~|§|±" — альтернативы клавиши через |
+        *mods, keys = spec.split("+")
+        unknown = set(mods) - MODIFIERS
+        if unknown:
+            raise ValueError(f"unknown modifiers in {spec!r}: {sorted(unknown)}")
+        self.modifiers = frozenset(mods)
+        self.keys = frozenset(keys.split("|"))
+        self.action = action
+        self.arg = arg
+
+    def __repr__(self):
+        return f"Chord({'+'.join(sorted(self.modifiers))}+{'|'.join(sorted(self.keys))} -> {self.action} {self.arg})"
+
+
+# Ctrl+` — показать оверлей; Ctrl+Alt+N — перейти на Space N;
+# Ctrl+Alt+Shift+N — перенести активное окно на Space N
+DEFAULT_CHORDS = (
+    ("ctrl+`|~|§|±", "toggle", 0),
+    *((f"ctrl+alt+{n}", "switch", n) for n in range(1, 10)),
+    *((f"ctrl+alt+shift+{n}", "move", n) for n in range(1, 10)),
+)
+
+
+class HotkeyEngine:
+    """
+    press()/release() из потока слушателя клавиатуры; при срабатывании аккорда
+    вызывается dispatch(action, arg) — быстрый и неблокирующий (emit сигнала).
+
+    Автоповтор (повторное press без release) не срабатывает вовсе; повторное
+    срабатывание того же аккорда быстрее burst_interval тоже подавляется.
+    """
+
+    def __init__(self, chords=DEFAULT_CHORDS, dispatch=None, burst_interval: float = 0.25,
+                 clock=time.monotonic, cost_window: int = 1024):
+        self.dispatch = dispatch
+        self.burst_interval = burst_interval
+        self.clock = clock
+        # (модификаторы, клавиша) -> Chord: поиск за один dict lookup
+        self._table = {}
+        for spec in chords:
+            chord = spec if isinstance(spec, Chord) else Chord(*spec)
+            for key in chord.keys:
+                self._table[(chord.modifiers, key)] = chord
+        self._mods = set()       # зажатые модификаторы
+        self._down = None        # последняя зажатая обычная клавиша (для автоповтора)
+        self._last_fire = {}     # Chord -> время последнего срабатывания
+        self.events = 0
+        self.fired = 0
+        self.repeats_suppressed = 0
+        self.bursts_suppressed = 0
+        self.cost_ns = 0
+        self.max_cost_ns = 0
+        self._costs = deque(maxlen=cost_window)
+
+    @property
+    def chords(self) -> list:
+        return sorted(set(self._table.values()), key=repr)
+
+    def press(self, key: str):
+        t0 = time.perf_counter_ns()
+        try:
+            self._press(key)
+        finally:
+            self._account(time.perf_counter_ns() - t0)
+
+    def release(self, key: str):
+        t0 = time.perf_counter_ns()
+        if key in MODIFIERS:
+            self._mods.discard(key)
+        elif key == self._down:
+            self._down = None
+        self._account(time.perf_counter_ns() - t0)
+
+    def reset(self):
+        """Забыть зажатые клавиши (например, после потери событий release)"""
+        self._mods.clear()
+        self._down = None
+
+    def _press(self, key: str):
+        if key in MODIFIERS:
+            self._mods.add(key)
+            return
+        if not self._mods:
+            return  # обычный набор текста
+        if key == self._down:
+            self.repeats_suppressed += 1
+            return
+        self._down = key
+        chord = self._table.get((frozenset(self._mods), key))
+        if chord is None:
+            return
+        now = self.clock()
+        last = self._last_fire.get(chord)
+        if last is not None and now - last < self.burst_interval:
+            self.bursts_suppressed += 1
+            return
+        self._last_fire[chord] = now
+        self.fired += 1
+        if self.dispatch is not None:
+            self.dispatch(chord.action, chord.arg)
+
+    def _account(self, cost: int):
+        self.events += 1
+        self.cost_ns += cost
+        if cost > self.max_cost_ns:
+            self.max_cost_ns = cost
+        self._costs.append(cost)
+
+    def stats(self) -> dict:
+        """Счётчики и время Python на событие (мкс; p99 — по последним событиям)"""
+        costs = sorted(self._costs)
+        p99 = costs[min(len(costs) - 1, int(len(costs) * 0.99))] if costs else 0
+        return {
+            "events": self.events,
+            "fired": self.fired,
+            "repeats_suppressed": self.repeats_suppressed,
+            "bursts_suppressed": self.bursts_suppressed,
+            "mean_us": round(self.cost_ns / self.events / 1000, 2) if self.events else 0.0,
+            "p99_us": round(p99 / 1000, 2),
+            "max_us": round(self.max_cost_ns / 1000, 2),
+        }
+
+
+def replay(engine: HotkeyEngine, events):
+    """Прогнать поток событий [("down"|"up", key), ...] через движок"""
+    for kind, key in events:
+        if kind == "down":
+            engine.press(key)
+        else:
+            engine.release(key)
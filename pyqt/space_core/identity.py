@@ -0,0 +1,126 @@
+"""
+Стабильная идентичность Spaces: ключ по uuid/ManagedSpaceID вместо позиции.
+
+Позиция Space (1-based индекс в Mission Control) меняется при перестановке,
+добавлении и удалении рабочих столов, а uuid и ManagedSpaceID — нет. Данные,
+привязанные к Space (сохранённые окна), хранятся по ключу; данные, которые
+другие фронтенды читают по индексу (названия), переносятся по плану
+перестановки из plan_index_migration().
+
+Индексы сквозные по всем дисплеям: Spaces первого монитора из plist (1..N),
+затем следующего и т.д. Порядок мониторов — как в plist (он же у
+SLSCopyManagedDisplaySpaces и orderedScreens() в init.lua), главный дисплей
+не обязательно первый. Для одного дисплея это в точности номера Mission Control.
+"""
+
+import threading
+
+from space_core.topology import SpaceTopology
+
+
+def space_key(info) -> str:
+    """Стабильный ключ Space: uuid, а у рабочего стола по умолчанию (uuid пустой) — ManagedSpaceID"""
+    return info.uuid or f"id:{info.managed_id}"
+
+
+def plan_index_migration(old_keys: list, new_keys: list) -> dict:
+    """
+    План переноса данных по индексам: {старый индекс: новый индекс}.
+
+    Только для Spaces, которые есть в обеих раскладках; исчезнувшие в план
+    не попадают (их данные не должны «съехать» на чужой Space).
+    """
+    new_index = {key: i + 1 for i, key in enumerate(new_keys)}
+    return {
+        i + 1: new_index[key]
+        for i, key in enumerate(old_keys)
+        if key in new_index
+    }
+
+
+class SpaceIdentity:
+    """Соответствие сквозной индекс <-> ключ <-> ManagedSpaceID для всех дисплеев"""
+
+    def __init__(self, topology: SpaceTopology):
+        self.topology = topology
+        self.version = 0  # растёт при каждом изменении раскладки
+        self._parses = -1
+        self._keys = []
+        self._index_by_key = {}
+        self._index_by_managed = {}
+        self._key_by_managed = {}
+        self._managed_by_index = {}
+        self._sections = []  # [(display_id, [индексы])]
+        self._current = {}   # display_id -> индекс текущего Space по plist
+        # GUI и фоновая предзагрузка окон обновляют раскладку одновременно
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """Подтянуть раскладку из топологии; True — если она изменилась"""
+        with self._lock:
+            displays = self.topology.displays()
+            if self.topology.parses == self._parses:
+                return False
+            self._parses = self.topology.parses
+            spaces = [s for d in displays for s in d.spaces]
+            self._index_by_managed = {s.managed_id: i + 1 for i, s in enumerate(spaces)}
+            self._current = {d.display_id: self._index_by_managed.get(d.current_id) for d in displays}
+            keys = [space_key(s) for s in spaces]
+            self._key_by_managed = {s.managed_id: key for s, key in zip(spaces, keys)}
+            sections, start = [], 1
+            for d in displays:
+                sections.append((d.display_id, list(range(start, start + len(d.spaces)))))
+                start += len(d.spaces)
+            if keys == self._keys and sections == self._sections:
+                return False
+            self._keys = keys
+            self._sections = sections
+            self._index_by_key = {key: i + 1 for i, key in enumerate(keys)}
+            self._managed_by_index = {i + 1: s.managed_id for i, s in enumerate(spaces)}
+            self.version += 1
+            return True
+
+    def keys(self) -> list:
+        """Ключи Spaces в порядке Mission Control"""
+        self.refresh()
+        return list(self._keys)
+
+    def key(self, index: int):
+        """Ключ Space по 1-based индексу (None, если раскладка неизвестна)"""
+        self.refresh()
+        if 1 <= index <= len(self._keys):
+            return self._keys[index - 1]
+        return None
+
+    # refresh=False — без stat plist: для обхода многих окон подряд после
+    # одного refresh() (разбор кэша окон)
+
+    def index(self, key: str, refresh: bool = True):
+        if refresh:
+            self.refresh()
+        return self._index_by_key.get(key)
+
+    def index_for_managed_id(self, managed_id, refresh: bool = True):
+        if refresh:
+            self.refresh()
+        return self._index_by_managed.get(managed_id)
+
+    def key_for_managed_id(self, managed_id, refresh: bool = True):
+        if refresh:
+            self.refresh()
+        return self._key_by_managed.get(managed_id)
+
+    def managed_ids(self) -> dict:
+        """Карта: номер Space -> ManagedSpaceID"""
+        self.refresh()
+        return dict(self._managed_by_index)
+
+    def sections(self) -> list:
+        """Spaces по дисплеям: [(display_id, [сквозные индексы])]"""
+        self.refresh()
+        return [(display_id, list(indices)) for display_id, indices in self._sections]
+
+    def current_indices(self) -> dict:
+        """display_id -> индекс Space, открытого на дисплее (по plist; может отставать)"""
+        self.refresh()
+        return {k: v for k, v in self._current.items() if v}
@@ -0,0 +1,257 @@
+"""
+Раскладки окон по Spaces: именованные пресеты и планировщик переносов.
+
+Пресет — упорядоченные правила {"app", "title", "space"}: app — имя или
+псевдонимы через запятую (как в space_core.query), title — шаблон fnmatch
+без учёта регистра ("*— README*"; нет — любое окно приложения). Окну
+достаётся первое подошедшее правило, поэтому частные правила идут раньше
+общих.
+
+    preset = capture("work", query.iter_windows(snapshot))
+    LayoutStore().save(preset)
+    layout = plan(preset, query.iter_windows(snapshot), snapshot.spaces_count)
+    backend.move_windows_to_spaces(layout.batch())
+
+plan() — чистая функция от строк окон (query.window_row): каждое окно не на
+своём Space переносится ровно один раз и сразу на целевой, окна на месте и
+без правила не трогаются — меньше переносов не бывает. Переносы
+сгруппированы по целевому Space и уходят в Hammerspoon одним вызовом.
+"""
+
+import fnmatch
+import json
+import re
+import time
+from pathlib import Path
+
+from space_core.config import LAYOUTS_PATH
+from space_core.persist import atomic_write_bytes
+from space_core.query import _names_set
+
+FORMAT_VERSION = 1
+
+_GLOB_CHARS = re.compile(r"([*?\[])")
+_LITERAL = re.compile(r"(?:[^*?\[]|\[[*?\[]\])*")
+_ESCAPED = re.compile(r"\[([*?\[])\]")
+
+
+def exact_title(title: str) -> str:
+    """Шаблон fnmatch, совпадающий только с этим заголовком"""
+    return _GLOB_CHARS.sub(r"[\1]", title)
+
+
+def _literal(pattern: str):
+    """Заголовок, если шаблон совпадает ровно с одной строкой (как у exact_title), иначе None"""
+    if not _LITERAL.fullmatch(pattern):
+        return None
+    return _ESCAPED.sub(r"\1", pattern)
+
+
+class Rule:
+    """Окна приложения app (и заголовка по шаблону title) — на Space space"""
+
+    __slots__ = ("app", "title", "space", "_apps", "_pattern")
+
+    def __init__(self, app: str, space: int, title: str = None):
+        self.app = app
+        self.space = int(space)
+        self.title = title or None
+        self._apps = _names_set(app)
+        self._pattern = self.title.lower() if self.title else None
+
+    def matches(self, row: dict) -> bool:
+        if row.get("app", "").lower() not in self._apps:
+            return False
+        return self.matches_title(row.get("title", "").lower())
+
+    def matches_title(self, title: str) -> bool:
+        """title — уже в нижнем регистре"""
+        return self._pattern is None or fnmatch.fnmatchcase(title, self._pattern)
+
+    def to_dict(self) -> dict:
+        data = {"app": self.app, "space": self.space}
+        if self.title:
+            data["title"] = self.title
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Rule":
+        return cls(data["app"], data["space"], data.get("title"))
+
+    def __repr__(self):
+        return f"Rule({self.app!r}, {self.space}" + (f", title={self.title!r})" if self.title else ")")
+
+
+class Preset:
+    """
+    Именованная раскладка: правила по порядку (первое подошедшее — решает).
+
+    Правила неизменяемы (кортеж) и проиндексированы: точные заголовки — в
+    словаре, шаблоны — списком по приложению, так что окно проверяется
+    только против правил своего приложения, а не всех.
+    """
+
+    def __init__(self, name: str, rules=(), created: float = None):
+        self.name = name
+        self.rules = tuple(rules)
+        self.created = created if created is not None else time.time()
+        self._exact = {}     # (app, заголовок) -> номер первого правила
+        self._patterns = {}  # app -> [(номер, правило)] без точного заголовка
+        for order, rule in enumerate(self.rules):
+            title = _literal(rule._pattern) if rule._pattern is not None else None
+            for app in rule._apps:
+                if title is not None:
+                    self._exact.setdefault((app, title), order)
+                else:
+                    self._patterns.setdefault(app, []).append((order, rule))
+
+    def target(self, row: dict):
+        """Целевой Space окна или None (ни одно правило не подошло)"""
+        app = row.get("app", "").lower()
+        title = row.get("title", "").lower()
+        exact = self._exact.get((app, title))
+        for order, rule in self._patterns.get(app, ()):
+            if exact is not None and order > exact:
+                break
+            if rule.matches_title(title):
+                return rule.space
+        return self.rules[exact].space if exact is not None else None
+
+    def spaces(self) -> list:
+        return sorted({rule.space for rule in self.rules})
+
+    def to_dict(self) -> dict:
+        return {"created": self.created, "rules": [rule.to_dict() for rule in self.rules]}
+
+    @classmethod
+    def from_dict(cls, name: str, data: dict) -> "Preset":
+        return cls(name, [Rule.from_dict(r) for r in data.get("rules", [])], data.get("created"))
+
+
+def capture(name: str, windows, include_minimized: bool = False) -> Preset:
+    """
+    Пресет из текущей раскладки: приложение — на Space, где большинство его
+    окон (при равенстве — меньший номер); окна этого приложения на других
+    Spaces — отдельными правилами по точному заголовку, перед общим.
+    """
+    by_app = {}
+    for row in windows:
+        if row.get("space") is None or (row.get("minimized") and not include_minimized):
+            continue
+        by_app.setdefault(row.get("app", ""), []).append(row)
+
+    specific, general = [], []
+    for app in sorted(by_app, key=str.lower):
+        rows = by_app[app]
+        counts = {}
+        for row in rows:
+            counts[row["space"]] = counts.get(row["space"], 0) + 1
+        home = min(counts, key=lambda space: (-counts[space], space))
+        for row in sorted(rows, key=lambda r: (r["space"], r.get("title", ""))):
+            if row["space"] != home:
+                specific.append(Rule(app, row["space"], exact_title(row.get("title", ""))))
+        general.append(Rule(app, home))
+    return Preset(name, specific + general)
+
+
+class LayoutPlan:
+    """
+    Результат plan(): moves — переносы {"window_id", "app", "title", "from", "to"}
+    по целевому Space; skipped — окна с правилом, которые перенести нельзя
+    (+ "reason"); in_place — сколько окон уже на своём Space.
+    """
+
+    def __init__(self, preset: str, moves: list, skipped: list, in_place: int):
+        self.preset = preset
+        self.moves = moves
+        self.skipped = skipped
+        self.in_place = in_place
+
+    def __len__(self):
+        return len(self.moves)
+
+    def by_space(self) -> dict:
+        """{целевой Space: [переносы]} в порядке Spaces"""
+        groups = {}
+        for move in self.moves:
+            groups.setdefault(move["to"], []).append(move)
+        return groups
+
+    def batch(self) -> list:
+        """[(window_id, space)] для backend.move_windows_to_spaces"""
+        return [(move["window_id"], move["to"]) for move in self.moves]
+
+    def summary(self) -> str:
+        spaces = ", ".join(f"{space}: {len(moves)}" for space, moves in self.by_space().items())
+        return (f"{self.preset}: {len(self.moves)} moves" + (f" ({spaces})" if spaces else "")
+                + f", {self.in_place} in place, {len(self.skipped)} skipped")
+
+
+def plan(preset: Preset, windows, spaces_count: int = None, include_minimized: bool = False) -> LayoutPlan:
+    """
+    Минимальный набор переносов, приводящий окна (строки query.window_row)
+    к пресету. spaces_count — сколько Spaces есть: правила на несуществующие
+    Spaces пропускаются. Свёрнутые окна Mission Control не переносит — по
+    умолчанию они в skipped.
+    """
+    moves, skipped, in_place = [], [], 0
+    for row in windows:
+        target = preset.target(row)
+        if target is None:
+            continue
+        current = row.get("space")
+        if current == target:
+            in_place += 1
+            continue
+        entry = {"window_id": row.get("window_id"), "app": row.get("app", ""),
+                 "title": row.get("title", ""), "from": current, "to": target}
+        if spaces_count is not None and not 1 <= target <= spaces_count:
+            skipped.append(dict(entry, reason="no such space"))
+        elif row.get("minimized") and not include_minimized:
+            skipped.append(dict(entry, reason="minimized"))
+        elif not row.get("window_id"):
+            skipped.append(dict(entry, reason="no window id"))
+        else:
+            moves.append(entry)
+    moves.sort(key=lambda m: (m["to"], m["from"] or 0, m["window_id"]))
+    return LayoutPlan(preset.name, moves, skipped, in_place)
+
+
+class LayoutStore:
+    """Пресеты в JSON-файле {"version", "presets": {имя: {"created", "rules"}}}; запись атомарная"""
+
+    def __init__(self, path=LAYOUTS_PATH):
+        self.path = Path(path)
+
+    def load(self) -> dict:
+        """{имя: Preset}; нет файла — пусто"""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported layouts version {data.get('version')!r}")
+        return {name: Preset.from_dict(name, preset) for name, preset in data.get("presets", {}).items()}
+
+    def get(self, name: str) -> Preset:
+        presets = self.load()
+        if name not in presets:
+            raise KeyError(f"no layout {name!r} (saved: {', '.join(sorted(presets)) or 'none'})")
+        return presets[name]
+
+    def save(self, preset: Preset):
+        presets = self.load()
+        presets[preset.name] = preset
+        self._write(presets)
+
+    def delete(self, name: str) -> bool:
+        presets = self.load()
+        if presets.pop(name, None) is None:
+            return False
+        self._write(presets)
+        return True
+
+    def _write(self, presets: dict):
+        data = {"version": FORMAT_VERSION,
+                "presets": {name: presets[name].to_dict() for name in sorted(presets)}}
+        atomic_write_bytes(self.path, json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8"))
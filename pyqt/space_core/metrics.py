@@ -0,0 +1,285 @@
+"""
+Метрики процесса: счётчики, gauge и гистограммы задержек.
+
+    _moves = metrics.counter("window_moves_total", "Переносы окон", outcome="success")
+    _moves.inc()
+    with metrics.histogram("backend_hs_call_seconds", "Вызовы hs -c", command="lw").time():
+        ...
+
+Гистограмма в духе HDR: значение в микросекундах раскладывается в
+логарифмическую корзину с 16 подкорзинами на октаву (погрешность ≤ 6%),
+память — десятки корзин на всю жизнь процесса, запись — O(1).
+
+Отключение: SPACE_MANAGER_METRICS=0 — тогда counter()/gauge()/histogram()
+отдают общий пустой инструмент, и замер стоит один вызов пустого метода.
+Экспорт: snapshot() (JSON), prometheus_text() (text format 0.0.4).
+"""
+
+import json
+import os
+import threading
+import time
+
+from space_core.persist import atomic_write_bytes
+
+_SUB_BITS = 4  # 16 подкорзин на октаву
+# Границы le для Prometheus, секунды (внутри — мелкие корзины, наружу — привычная сетка)
+PROMETHEUS_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                      0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_EXACT = 1 << (_SUB_BITS + 1)  # до 32 мкс корзины точные
+
+
+def _bucket(us: int) -> int:
+    if us < _EXACT:
+        return us
+    shift = us.bit_length() - _SUB_BITS - 1
+    return (shift << (_SUB_BITS + 1)) | (us >> shift)
+
+
+def _bucket_bounds(key: int) -> tuple:
+    """[нижняя, верхняя) граница корзины в микросекундах"""
+    if key < _EXACT:
+        return key, key + 1
+    shift, mantissa = key >> (_SUB_BITS + 1), key & (_EXACT - 1)
+    return mantissa << shift, (mantissa + 1) << shift
+
+
+class Counter:
+    __slots__ = ("value", "_lock")
+    kind = "counter"
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, n: int = 1):
+        with self._lock:
+            self.value += n
+
+    def export(self) -> dict:
+        return {"value": self.value}
+
+
+class Gauge:
+    __slots__ = ("value",)
+    kind = "gauge"
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def export(self) -> dict:
+        return {"value": self.value}
+
+
+class Histogram:
+    """Задержки в секундах: count, sum, min, max и квантили по корзинам"""
+    __slots__ = ("count", "total", "min", "max", "_buckets", "_lock")
+    kind = "histogram"
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        key = _bucket(int(seconds * 1_000_000))
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            self._buckets[key] = self._buckets.get(key, 0) + 1
+            if self.min is None or seconds < self.min:
+                self.min = seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def time(self):
+        """with histogram.time(): ..."""
+        return _Timer(self)
+
+    def buckets(self) -> list:
+        """[(верхняя граница в секундах, накопленное число)] по возрастанию"""
+        with self._lock:
+            items = sorted(self._buckets.items())
+        result, cumulative = [], 0
+        for key, n in items:
+            cumulative += n
+            result.append((_bucket_bounds(key)[1] / 1_000_000, cumulative))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """Верхняя граница корзины q-квантиля, в секундах (не больше max)"""
+        buckets = self.buckets()
+        if not buckets:
+            return 0.0
+        rank = q * buckets[-1][1]
+        for upper, cumulative in buckets:
+            if cumulative >= rank:
+                return min(upper, self.max)
+        return self.max
+
+    def export(self) -> dict:
+        return {"count": self.count, "sum_ms": _ms(self.total), "min_ms": _ms(self.min or 0.0),
+                "max_ms": _ms(self.max), "p50_ms": _ms(self.quantile(0.5)),
+                "p90_ms": _ms(self.quantile(0.9)), "p99_ms": _ms(self.quantile(0.99))}
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class _NullInstrument:
+    """Инструмент выключенного реестра: все операции пустые"""
+    __slots__ = ()
+
+    def inc(self, n: int = 1):
+        pass
+
+    def set(self, value):
+        pass
+
+    def observe(self, seconds: float):
+        pass
+
+    def time(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL = _NullInstrument()
+
+
+def _series(name: str, labels: dict) -> str:
+    if not labels:
+        return name
+    pairs = ",".join(f'{k}="{_escape(str(v))}"' for k, v in sorted(labels.items()))
+    return f"{name}{{{pairs}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """Инструменты по (имя, метки); повторный запрос возвращает тот же объект"""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started = time.time()
+        self._metrics = {}  # series -> (name, labels, instrument)
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help_text: str, labels: dict):
+        if not self.enabled:
+            return NULL
+        series = _series(name, labels)
+        entry = self._metrics.get(series)
+        if entry is None:
+            with self._lock:
+                entry = self._metrics.get(series)
+                if entry is None:
+                    entry = self._metrics[series] = (name, labels, cls())
+                    self._help.setdefault(name, help_text)
+        return entry[2]
+
+    def counter(self, name: str, help_text: str = "", **labels) -> Counter:
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name: str, help_text: str = "", **labels) -> Gauge:
+        return self._get(Gauge, name, help_text, labels)
+
+    def histogram(self, name: str, help_text: str = "", **labels) -> Histogram:
+        return self._get(Histogram, name, help_text, labels)
+
+    def snapshot(self) -> dict:
+        """{"uptime_s", "counters": {series: value}, "gauges": ..., "histograms": {series: {...}}}"""
+        result = {"uptime_s": round(time.time() - self.started, 1),
+                  "counters": {}, "gauges": {}, "histograms": {}}
+        for series, (_, _, metric) in sorted(self._metrics.items()):
+            exported = metric.export()
+            result[metric.kind + "s"][series] = exported if metric.kind == "histogram" else exported["value"]
+        return result
+
+    def prometheus_text(self) -> str:
+        by_name = {}
+        for name, labels, metric in self._metrics.values():
+            by_name.setdefault(name, []).append((labels, metric))
+        lines = []
+        for name in sorted(by_name):
+            entries = by_name[name]
+            if self._help.get(name):
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {entries[0][1].kind}")
+            for labels, metric in entries:
+                if metric.kind != "histogram":
+                    lines.append(f"{_series(name, labels)} {metric.value}")
+                    continue
+                fine, i, cumulative = metric.buckets(), 0, 0
+                for le in PROMETHEUS_BUCKETS:
+                    # Мелкие корзины сворачиваются в стандартную сетку le
+                    while i < len(fine) and fine[i][0] <= le:
+                        cumulative = fine[i][1]
+                        i += 1
+                    lines.append(f"{_series(name + '_bucket', dict(labels, le=f'{le:g}'))} {cumulative}")
+                lines.append(f"{_series(name + '_bucket', dict(labels, le='+Inf'))} {metric.count}")
+                lines.append(f"{_series(name + '_sum', labels)} {metric.total:.6f}")
+                lines.append(f"{_series(name + '_count', labels)} {metric.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary_lines(self, limit: int = 12) -> list:
+        """Короткая сводка для трея: самые «дорогие» гистограммы и ненулевые счётчики"""
+        snapshot = self.snapshot()
+        histograms = sorted(((series, h) for series, h in snapshot["histograms"].items() if h["count"]),
+                            key=lambda kv: kv[1]["sum_ms"], reverse=True)
+        lines = [f"{series}: p50 {h['p50_ms']} мс, p99 {h['p99_ms']} мс (n={h['count']})"
+                 for series, h in histograms[:limit]]
+        lines += [f"{series}: {value}" for series, value in snapshot["counters"].items() if value]
+        return lines
+
+    def dump_json(self, path):
+        atomic_write_bytes(path, json.dumps(self.snapshot(), ensure_ascii=False, indent=2).encode("utf-8"))
+
+    def write_prometheus(self, path):
+        """Файл для node_exporter textfile collector"""
+        atomic_write_bytes(path, self.prometheus_text().encode("utf-8"))
+
+
+REGISTRY = MetricsRegistry(enabled=os.environ.get("SPACE_MANAGER_METRICS", "1") != "0")
+
+
+def counter(name: str, help_text: str = "", **labels):
+    return REGISTRY.counter(name, help_text, **labels)
+
+
+def gauge(name: str, help_text: str = "", **labels):
+    return REGISTRY.gauge(name, help_text, **labels)
+
+
+def histogram(name: str, help_text: str = "", **labels):
+    return REGISTRY.histogram(name, help_text, **labels)
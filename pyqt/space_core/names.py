@@ -0,0 +1,229 @@
+"""
+Единое хранилище названий Spaces для PyQt, Hammerspoon и SketchyBar.
+
+Один файл ~/.config/space-manager/space_names.json ({"1": "Код", ...}).
+Перечитывается только при изменении (mtime/size/inode), локальные изменения
+сразу пушатся в другие фронтенды: Hammerspoon — smReloadSpaceNames(),
+SketchyBar — `sketchybar --set space.N icon=...`.
+
+PollingWatcher — переносимый fallback (и для тестов на Linux); в Qt-приложении
+основной механизм — QFileSystemWatcher (inotify/FSEvents).
+"""
+
+import json
+import os
+import subprocess
+import threading
+from pathlib import Path
+
+from space_core.persist import atomic_write_bytes
+
+NAMES_PATH = Path.home() / ".config" / "space-manager" / "space_names.json"
+
+# Старые раздельные файлы — источники для первичного заполнения
+LEGACY_NAME_FILES = (
+    Path.home() / ".config" / "sketchybar" / "space_names.json",
+    Path.home() / ".hammerspoon" / "space_names.json",
+)
+
+
+def read_names_file(path) -> dict:
+    """{"N": "имя"} из JSON-файла; пустой dict, если файла нет или он битый"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {str(k): str(v) for k, v in data.items() if v}
+
+
+def push_to_hammerspoon(changed: dict):
+    """Попросить Hammerspoon перечитать названия (без ожидания ответа)"""
+    try:
+        subprocess.Popen(
+            ["hs", "-c", "smReloadSpaceNames()"],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"[NAMES] Hammerspoon push error: {e}", flush=True)
+
+
+def push_to_sketchybar(changed: dict):
+    """Обновить подписи пространств в SketchyBar одним вызовом"""
+    args = ["sketchybar"]
+    for index, name in changed.items():
+        args += ["--set", f"space.{index}", f"icon={name or index}"]
+    try:
+        subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"[NAMES] SketchyBar push error: {e}", flush=True)
+
+
+DEFAULT_PUSHERS = (push_to_hammerspoon, push_to_sketchybar)
+
+
+class SpaceNameStore:
+    """
+    Названия Spaces в памяти + файл на диске.
+
+    listeners: fn(changed: dict, external: bool) — на любое изменение
+    (external=True — пришло из файла, т.е. от другого фронтенда).
+    pushers: fn(changed: dict) — только на локальные изменения через set().
+    В changed пустая строка означает «название удалено».
+    """
+
+    def __init__(self, path=NAMES_PATH, pushers=DEFAULT_PUSHERS):
+        self.path = Path(path)
+        self.pushers = list(pushers)
+        self.listeners = []
+        self.reloads = 0
+        self._names = {}
+        self._stat = None
+        self._lock = threading.Lock()
+
+    def _stat_key(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self):
+        with self._lock:
+            self._stat = self._stat_key()
+            self._names = read_names_file(self.path)
+            self.reloads += 1
+
+    def seed(self, *sources: dict):
+        """Создать файл из старых источников (последний важнее), если его ещё нет"""
+        if self.exists():
+            return
+        merged = {}
+        for source in sources:
+            merged.update({str(k): v for k, v in source.items() if v})
+        with self._lock:
+            self._names = merged
+            self._write_locked()
+
+    def reload_if_changed(self) -> dict:
+        """Перечитать файл, только если он изменился; вернуть изменившиеся названия"""
+        stat = self._stat_key()
+        with self._lock:
+            if stat == self._stat:
+                return {}
+            self._stat = stat
+            old, self._names = self._names, read_names_file(self.path)
+            self.reloads += 1
+            changed = {k: self._names.get(k, "") for k in set(old) | set(self._names)
+                       if old.get(k) != self._names.get(k)}
+        if changed:
+            self._notify(changed, external=True)
+        return changed
+
+    def get(self, index, default: str = "") -> str:
+        return self._names.get(str(index), default)
+
+    def all(self) -> dict:
+        return dict(self._names)
+
+    def set(self, index, name: str):
+        key = str(index)
+        name = (name or "").strip()
+        with self._lock:
+            if self._names.get(key, "") == name:
+                return
+            if name:
+                self._names[key] = name
+            else:
+                self._names.pop(key, None)
+            self._write_locked()
+        changed = {key: name}
+        self._notify(changed, external=False)
+        for push in self.pushers:
+            push(changed)
+
+    def remap(self, moves: dict, known: int = 0) -> dict:
+        """
+        Перенести названия при перестановке Spaces: moves = {старый индекс: новый}.
+
+        Названия Spaces из старой раскладки (индексы 1..known), которых нет в
+        moves, удаляются; индексы за её пределами переносятся как есть, если
+        новое место свободно. Возвращает изменившиеся названия.
+        """
+        with self._lock:
+            old = self._names
+            new = {k: v for k, v in old.items() if not k.isdigit()}
+            for k, v in old.items():
+                if k.isdigit() and int(k) in moves:
+                    new[str(moves[int(k)])] = v
+            for k, v in old.items():
+                if k.isdigit() and int(k) > known and int(k) not in moves:
+                    new.setdefault(k, v)
+            changed = {k: new.get(k, "") for k in set(old) | set(new) if old.get(k) != new.get(k)}
+            if not changed:
+                return {}
+            self._names = new
+            self._write_locked()
+        self._notify(changed, external=False)
+        for push in self.pushers:
+            push(changed)
+        return changed
+
+    def _write_locked(self):
+        payload = json.dumps(self._names, ensure_ascii=False, indent=2, sort_keys=True).encode("utf-8")
+        atomic_write_bytes(self.path, payload)
+        # Своё изменение не должно вызывать перечитывание
+        self._stat = self._stat_key()
+
+    def _notify(self, changed: dict, external: bool):
+        for listener in list(self.listeners):
+            try:
+                listener(changed, external)
+            except Exception as e:
+                print(f"[NAMES] Listener error: {e}", flush=True)
+
+
+class PollingWatcher:
+    """
+    Опрос файла по таймеру в фоновом потоке: store.reload_if_changed().
+
+    check() можно вызывать и вручную (детерминированно в тестах). Сам опрос —
+    один stat(), файл читается только при изменении.
+    """
+
+    def __init__(self, store: SpaceNameStore, interval: float = 1.0):
+        self.store = store
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check(self) -> dict:
+        return self.store.reload_if_changed()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="names-poll", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1.0)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"[NAMES] Poll error: {e}", flush=True)
@@ -0,0 +1,325 @@
+"""
+Сохранение файлов без блокировки GUI: атомарная запись и отложенный писатель.
+
+atomic_write_bytes() пишет во временный файл рядом с целевым, делает fsync
+и os.replace — после сбоя на диске остаётся либо старая, либо новая версия.
+
+WriteBehindWriter принимает снимки данных из GUI-потока (сериализация сразу,
+чтобы фоновый поток не читал изменяемый dict), а на диск в фоновом потоке
+пишет только последний снимок после паузы в изменениях (debounce).
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+def atomic_write_bytes(path, data: bytes):
+    """Записать файл атомарно: temp-файл + fsync + rename (+ fsync каталога)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    try:
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def dump_json_pretty(data) -> bytes:
+    """Формат config.json: читаемый, с кириллицей как есть"""
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+class WriteBehindWriter:
+    """
+    Отложенная атомарная запись одного файла в фоновом потоке.
+
+    schedule(data) — неблокирующий (только сериализация); серия вызовов в
+    пределах delay секунд схлопывается в одну запись. flush() синхронно
+    дописывает последний снимок (вызывать при выходе).
+    """
+
+    def __init__(self, path, delay: float = 0.5, serialize=dump_json_pretty):
+        self.path = Path(path)
+        self.delay = delay
+        self.serialize = serialize
+        self.writes = 0      # выполненных записей на диск
+        self.scheduled = 0   # вызовов schedule()
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._pending = None  # (seq, bytes)
+        self._seq = 0
+        self._written_seq = 0
+        self._last_change = 0.0
+        self._closed = False
+        self._thread = None
+
+    def schedule(self, data):
+        payload = self.serialize(data)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"writer for {self.path} is closed")
+            self._seq += 1
+            self._pending = (self._seq, payload)
+            self._last_change = time.monotonic()
+            self.scheduled += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"write-behind:{self.path.name}", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    @property
+    def dirty(self) -> bool:
+        with self._cond:
+            return self._pending is not None
+
+    def flush(self) -> bool:
+        """Синхронно записать отложенный снимок; True если что-то было записано"""
+        with self._cond:
+            pending, self._pending = self._pending, None
+        if pending is None:
+            return False
+        self._write(*pending)
+        return True
+
+    def close(self):
+        """Записать хвост и остановить фоновый поток"""
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return  # закрыт и писать нечего
+                # Ждём паузы в изменениях — это и схлопывает серию в одну запись
+                while self._pending is not None and not self._closed:
+                    remaining = self._last_change + self.delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                pending, self._pending = self._pending, None
+            if pending is not None:
+                self._write(*pending)
+
+    def _write(self, seq: int, payload: bytes):
+        with self._io_lock:
+            if seq <= self._written_seq:
+                return  # flush() уже записал более свежий снимок
+            try:
+                atomic_write_bytes(self.path, payload)
+                self._written_seq = seq
+                self.writes += 1
+            except Exception as e:
+                print(f"[PERSIST] Write error {self.path}: {e}", flush=True)
+
+
+class StateLog:
+    """
+    Журнал горячего состояния: append-only строки "key<TAB>json".
+
+    Изменение дописывает одну короткую строку (в фоновом потоке, пачками),
+    а не переписывает весь файл. При загрузке строки только раскладываются по
+    ключам (последняя побеждает); JSON разбирается лениво — при первом get().
+    Когда мёртвых записей становится много, журнал компактируется атомарной
+    перезаписью. Пустое значение после TAB — удаление ключа.
+    """
+
+    def __init__(self, path, delay: float = 0.5, compact_min_records: int = 256, compact_ratio: int = 4):
+        self.path = Path(path)
+        self.delay = delay
+        self.compact_min_records = compact_min_records
+        self.compact_ratio = compact_ratio
+        self.appends = 0      # дописанных пачек
+        self.compactions = 0
+        self._raw = {}        # key -> JSON-строка (ещё не разобранная)
+        self._decoded = {}    # key -> разобранное значение
+        self._records = 0     # строк в файле (включая мёртвые)
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._pending = {}    # key -> строка для дозаписи (последняя версия)
+        self._last_change = 0.0
+        self._closed = False
+        self._thread = None
+
+    # === Чтение ===
+
+    def load(self):
+        """Прочитать журнал (без разбора JSON значений)"""
+        try:
+            data = self.path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            print(f"[STATE] Cannot read {self.path}: {e}", flush=True)
+            return
+        raw = {}
+        lines = data.split("\n")
+        # Последний фрагмент без \n — недописанная при сбое строка, пропускаем
+        for line in lines[:-1]:
+            key, sep, value = line.partition("\t")
+            if not sep:
+                continue
+            if value:
+                raw[key] = value
+            else:
+                raw.pop(key, None)
+        with self._cond:
+            self._raw = raw
+            self._decoded = {}
+            self._records = len(lines) - 1
+        if lines[-1]:
+            # Обрывок после сбоя отрезаем, иначе следующая дозапись склеится с ним
+            try:
+                os.truncate(self.path, len(data.encode("utf-8")) - len(lines[-1].encode("utf-8")))
+            except OSError as e:
+                print(f"[STATE] Cannot truncate torn tail of {self.path}: {e}", flush=True)
+
+    def get(self, key: str, default=None):
+        if key in self._decoded:
+            return self._decoded[key]
+        raw = self._raw.get(key)
+        if raw is None:
+            return default
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return default
+        self._decoded[key] = value
+        return value
+
+    def keys(self, prefix: str = "") -> list:
+        return [k for k in self._raw if k.startswith(prefix)]
+
+    def __contains__(self, key):
+        return key in self._raw
+
+    # === Запись ===
+
+    def set(self, key: str, value) -> bool:
+        """Запомнить значение; False если оно не изменилось (ничего не пишем)"""
+        if "\t" in key or "\n" in key:
+            raise ValueError(f"invalid state key: {key!r}")
+        raw = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        with self._cond:
+            if self._raw.get(key) == raw:
+                return False
+            self._raw[key] = raw
+            self._decoded.pop(key, None)
+            self._queue(key, f"{key}\t{raw}\n")
+        return True
+
+    def delete(self, key: str):
+        with self._cond:
+            if key not in self._raw:
+                return
+            del self._raw[key]
+            self._decoded.pop(key, None)
+            self._queue(key, f"{key}\t\n")
+
+    def _queue(self, key: str, line: str):
+        # Вызывается под self._cond
+        if self._closed:
+            raise RuntimeError(f"state log {self.path} is closed")
+        self._pending.pop(key, None)
+        self._pending[key] = line
+        self._last_change = time.monotonic()
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=f"state-log:{self.path.name}", daemon=True)
+            self._thread.start()
+        self._cond.notify()
+
+    def flush(self) -> bool:
+        return self._append_pending()
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def compact(self):
+        """Переписать журнал: по одной строке на живой ключ"""
+        with self._io_lock:
+            with self._cond:
+                # Отложенное тоже уже отражено в _raw — забираем, чтобы не дописать дубли
+                self._pending = {}
+                snapshot = list(self._raw.items())
+            payload = "".join(f"{k}\t{v}\n" for k, v in snapshot).encode("utf-8")
+            try:
+                atomic_write_bytes(self.path, payload)
+            except Exception as e:
+                print(f"[STATE] Compaction error {self.path}: {e}", flush=True)
+                return
+            self._records = len(snapshot)
+            self.compactions += 1
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                while self._pending and not self._closed:
+                    remaining = self._last_change + self.delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            self._append_pending()
+
+    def _append_pending(self) -> bool:
+        """
+        Забрать отложенное и дописать под _io_lock: пачки из flush() и фонового
+        потока не обгоняют друг друга и компактирование, иначе после
+        перезапуска вернулось бы устаревшее значение (последняя строка побеждает).
+        """
+        with self._io_lock:
+            with self._cond:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return False
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("".join(pending.values()))
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._records += len(pending)
+                self.appends += 1
+            except Exception as e:
+                print(f"[STATE] Append error {self.path}: {e}", flush=True)
+                return True
+        if self._records > max(self.compact_min_records, self.compact_ratio * len(self._raw)):
+            self.compact()
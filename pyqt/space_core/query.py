@@ -0,0 +1,79 @@
+"""
+Запросы к снимку кэша окон: строки окон и Spaces с фильтрами.
+
+Общие для демона, CLI и списков терминалов; работают только со снимком
+(space_core.snapshot), поэтому одинаково идут на настоящем и поддельном бэкенде.
+Окна отдаются генератором — вызывающий может выводить их по мере обхода.
+"""
+
+
+def window_row(record) -> dict:
+    """Запись окна из снимка -> строка для вывода (JSON)"""
+    return {
+        "window_id": record.get("id"),
+        "app": record.get("app", ""),
+        "title": record.get("title", ""),
+        "space": record.get("spaceIndex"),
+        "space_id": record.get("spaceId"),
+        "space_key": record.get("space_key"),
+        "display": record.get("display"),
+        "minimized": bool(record.get("minimized", False)),
+    }
+
+
+def _names_set(app) -> frozenset:
+    """Имя приложения или набор псевдонимов -> множество в нижнем регистре"""
+    if app is None:
+        return frozenset()
+    if isinstance(app, str):
+        app = app.split(",")
+    return frozenset(a.strip().lower() for a in app if a and a.strip())
+
+
+def iter_windows(snapshot, app=None, space=None, title: str = None, include_minimized: bool = True):
+    """
+    Окна снимка с фильтрами: app — имя или псевдонимы ("Terminal,Терминал"),
+    space — 1-based индекс, title — подстрока (без учёта регистра).
+    """
+    apps = _names_set(app)
+    needle = title.lower() if title else None
+    for record in snapshot.windows.values():
+        if apps and record.get("app", "").lower() not in apps:
+            continue
+        if space is not None and record.get("spaceIndex") != space:
+            continue
+        if needle and needle not in record.get("title", "").lower():
+            continue
+        if not include_minimized and record.get("minimized"):
+            continue
+        yield window_row(record)
+
+
+def group_windows_by_app(windows: list) -> dict:
+    """Группировать окна по приложениям"""
+    groups = {}
+    for w in windows:
+        app = w.get("app", "Unknown") if isinstance(w, dict) else str(w)
+        if app not in groups:
+            groups[app] = []
+        groups[app].append(w)
+    return groups
+
+
+def space_rows(snapshot, names: dict = None, key_for=None) -> list:
+    """Spaces 1..spaces_count: номер, название, активный ли, число окон, стабильный ключ"""
+    names = names or {}
+    counts = {}
+    for record in snapshot.windows.values():
+        index = record.get("spaceIndex")
+        counts[index] = counts.get(index, 0) + 1
+    rows = []
+    for index in range(1, snapshot.spaces_count + 1):
+        rows.append({
+            "space": index,
+            "name": names.get(str(index), ""),
+            "focused": index == snapshot.focused,
+            "windows": counts.get(index, 0),
+            "key": key_for(index) if key_for is not None else None,
+        })
+    return rows
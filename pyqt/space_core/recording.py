@@ -0,0 +1,183 @@
+"""
+Запись и воспроизведение трафика к бэкенду (Hammerspoon).
+
+Запись: каждый запрос hs -c и канала с ответом, временем от начала сессии
+и длительностью — строкой NDJSON в gzip-файл (ответы lw() повторяются и
+хорошо сжимаются). Включается SPACE_MANAGER_RECORD=путь (GUI) или --record
+(демон, CLI):
+
+    recorder = recording.install_recorder("session.ndjson.gz")
+    ...
+    recorder.close()
+
+Воспроизведение: ReplayBackend отвечает записанными ответами на те же
+запросы (по порядку для каждого запроса) с исходной задержкой, ускоренной
+(speed=10) или без неё (speed=0) — медленную сессию пользователя можно
+повторить на Linux и мерить исправления на ней (benchmarks.bench_replay).
+"""
+
+import gzip
+import json
+import threading
+import time
+from collections import deque
+
+from space_core.channel import BackendError, ChannelError, ReplyError
+
+FORMAT_VERSION = 1
+
+
+class Recorder:
+    """Пишет записи в gzip NDJSON; первая строка — заголовок {"version", "started"}"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.count = 0
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._file = gzip.open(self.path, "wt", encoding="utf-8")
+        self._write({"version": FORMAT_VERSION, "started": time.time()})
+
+    def _write(self, record: dict):
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.count += 1
+
+    def add(self, record: dict, start: float):
+        record["t"] = round(start - self._t0, 6)
+        record["dur"] = round(time.perf_counter() - start, 6)
+        self._write(record)
+
+    def wrap_hs_call(self, hs_call):
+        def recorded(lua_code: str, timeout: float = 2.0) -> str:
+            start = time.perf_counter()
+            output = hs_call(lua_code, timeout=timeout)
+            self.add({"kind": "hs", "req": lua_code, "resp": output}, start)
+            return output
+        return recorded
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class RecordingChannel:
+    """Обёртка BackendChannel: те же available()/call()/close(), каждый call() — в запись"""
+
+    def __init__(self, inner, recorder: Recorder):
+        self.inner = inner
+        self.recorder = recorder
+
+    def available(self) -> bool:
+        return self.inner.available()
+
+    def call(self, cmd: str, *args, timeout: float = None):
+        start = time.perf_counter()
+        record = {"kind": "ch", "cmd": cmd, "args": list(args)}
+        try:
+            result = self.inner.call(cmd, *args, timeout=timeout)
+        except ChannelError as e:
+            record.update(error=str(e), backend=isinstance(e, BackendError), sent=isinstance(e, ReplyError))
+            self.recorder.add(record, start)
+            raise
+        record["result"] = result
+        self.recorder.add(record, start)
+        return result
+
+    def close(self):
+        self.inner.close()
+
+
+def install_recorder(path) -> Recorder:
+    """Обернуть текущий транспорт backend записью в path"""
+    from space_core import backend
+    recorder = Recorder(path)
+    hs_call, channel = backend.get_transport()
+    backend.install_transport(hs_call=recorder.wrap_hs_call(hs_call), channel=RecordingChannel(channel, recorder))
+    print(f"[RECORD] Recording backend traffic to {path}", flush=True)
+    return recorder
+
+
+def load(path) -> tuple:
+    """(заголовок, [записи]) из файла записи"""
+    with gzip.open(str(path), "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported recording version {header.get('version')!r}")
+        return header, [json.loads(line) for line in f if line.strip()]
+
+
+def _channel_key(cmd: str, args) -> str:
+    return json.dumps([cmd, list(args)])
+
+
+class ReplayBackend:
+    """
+    Ответы из записи: для каждого запроса — записанные ответы по очереди,
+    последний повторяется. speed: 1 — исходные задержки, 10 — в 10 раз
+    быстрее, 0 — без задержек. Незаписанный запрос: hs -> "", канал -> ChannelError.
+    """
+
+    def __init__(self, records: list, speed: float = 1.0):
+        self.records = records
+        self.speed = speed
+        self.misses = []
+        self._lock = threading.Lock()
+        self._hs = {}
+        self._channel = {}
+        for record in records:
+            if record.get("kind") == "hs":
+                self._hs.setdefault(record["req"], deque()).append(record)
+            elif record.get("kind") == "ch":
+                self._channel.setdefault(_channel_key(record["cmd"], record["args"]), deque()).append(record)
+
+    @classmethod
+    def from_file(cls, path, speed: float = 1.0) -> "ReplayBackend":
+        return cls(load(path)[1], speed)
+
+    def _next(self, table: dict, key: str):
+        with self._lock:
+            queue = table.get(key)
+            if not queue:
+                self.misses.append(key)
+                return None
+            return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def _wait(self, record: dict):
+        if self.speed:
+            time.sleep(record.get("dur", 0.0) / self.speed)
+
+    def hs_call(self, lua_code: str, timeout: float = 2.0) -> str:
+        record = self._next(self._hs, lua_code)
+        if record is None:
+            return ""
+        self._wait(record)
+        return record["resp"]
+
+    # === Канал: тот же интерфейс, что у BackendChannel ===
+
+    def available(self) -> bool:
+        return bool(self._channel)
+
+    def call(self, cmd: str, *args, timeout: float = None):
+        record = self._next(self._channel, _channel_key(cmd, args))
+        if record is None:
+            raise ChannelError(f"{cmd}: not in recording")
+        self._wait(record)
+        if "error" in record:
+            error = BackendError if record.get("backend") else ReplyError if record.get("sent") else ChannelError
+            raise error(record["error"])
+        return record["result"]
+
+    def close(self):
+        pass
+
+    def install(self):
+        """Направить backend в запись вместо Hammerspoon"""
+        from space_core import backend
+        backend.install_transport(hs_call=self.hs_call, channel=self)
+        return self
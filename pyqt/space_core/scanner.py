@@ -0,0 +1,219 @@
+"""
+Сканирование окон всех Spaces без блокировки GUI.
+
+SpaceScanner — конечный автомат: step() делает один переход и возвращает,
+через сколько секунд вызвать его снова (None — сканирование закончено).
+Переход к следующему Space происходит, когда бэкенд подтвердил переключение
+(focused() вернул нужный Space), а не после фиксированной паузы; если
+подтверждения нет за confirm_timeout, Space пропускается.
+
+Если бэкенд умеет перечислить окна по Spaces без переключения
+(enumerate_all() не None), визуального переключения нет вовсе.
+
+Драйвер шагов — снаружи: фоновый поток в приложении (ScanThread) или
+ручные вызовы step() с поддельными часами в тестах.
+"""
+
+import threading
+import time
+
+IDLE = "idle"
+ENUMERATE = "enumerate"
+SWITCH = "switch"
+CONFIRM = "confirm"
+COLLECT = "collect"
+RETURN = "return"
+CONFIRM_RETURN = "confirm_return"
+DONE = "done"
+CANCELLED = "cancelled"
+
+
+class ScanBackend:
+    """Что нужно сканеру от бэкенда (индексы Spaces — 1-based, сквозные)"""
+
+    def enumerate_all(self):
+        """{индекс: [окна]} без переключения Spaces или None, если не умеет"""
+        return None
+
+    def focused(self) -> int:
+        raise NotImplementedError
+
+    def goto(self, index: int):
+        """Начать переключение (не дожидаясь его окончания)"""
+        raise NotImplementedError
+
+    def current_windows(self) -> list:
+        raise NotImplementedError
+
+
+class SpaceScanner:
+    """
+    Автомат сканирования Spaces 1..total.
+
+    Колбэки (вызываются из потока, где идёт step()):
+        on_progress(done, total), on_space(index, windows),
+        on_switching() — перед первым визуальным переключением,
+        on_finished(result: dict, cancelled: bool).
+    """
+
+    def __init__(self, backend: ScanBackend, total: int, poll_interval: float = 0.05,
+                 confirm_timeout: float = 2.0, settle_delay: float = 0.1, clock=time.monotonic):
+        self.backend = backend
+        self.total = total
+        self.poll_interval = poll_interval
+        self.confirm_timeout = confirm_timeout
+        self.settle_delay = settle_delay  # после подтверждения — дать окнам отрисоваться
+        self.clock = clock
+        self.state = IDLE
+        self.result = {}       # индекс -> окна
+        self.skipped = []      # Spaces без подтверждения переключения
+        self.on_progress = None
+        self.on_space = None
+        self.on_switching = None
+        self.on_finished = None
+        self._targets = []
+        self._target = None
+        self._original = None
+        self._deadline = 0.0
+        self._cancel = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (DONE, CANCELLED)
+
+    def cancel(self):
+        """Остановить после текущего шага (с возвратом на исходный Space)"""
+        self._cancel.set()
+
+    def step(self):
+        """Один переход; задержка до следующего step() в секундах или None"""
+        if self.finished:
+            return None
+        if self._cancel.is_set() and self.state in (IDLE, ENUMERATE):
+            return self._finish(CANCELLED)
+        if self._cancel.is_set() and self.state in (SWITCH, CONFIRM, COLLECT):
+            self.state = RETURN
+        return getattr(self, f"_on_{self.state}")()
+
+    # === Состояния ===
+
+    def _on_idle(self):
+        self.state = ENUMERATE
+        return 0.0
+
+    def _on_enumerate(self):
+        spaces = self.backend.enumerate_all()
+        if spaces is not None:
+            # Бэкенд знает окна всех Spaces — переключаться не нужно
+            for index in range(1, self.total + 1):
+                self._record(index, spaces.get(index, []))
+            return self._finish(DONE)
+        self._original = self.backend.focused()
+        self._targets = list(range(1, self.total + 1))
+        # Текущий Space — первым: его можно собрать без переключения
+        if self._original in self._targets:
+            self._targets.remove(self._original)
+            self._targets.insert(0, self._original)
+        self.state = SWITCH
+        return 0.0
+
+    def _on_switch(self):
+        if not self._targets:
+            self.state = RETURN
+            return 0.0
+        self._target = self._targets.pop(0)
+        if self._target == self.backend.focused():
+            self.state = COLLECT
+            return 0.0
+        if self.on_switching is not None and not self.result and not self.skipped:
+            self.on_switching()
+        self.backend.goto(self._target)
+        self._deadline = self.clock() + self.confirm_timeout
+        self.state = CONFIRM
+        return self.poll_interval
+
+    def _on_confirm(self):
+        if self.backend.focused() == self._target:
+            self.state = COLLECT
+            return self.settle_delay
+        if self.clock() >= self._deadline:
+            print(f"[SCAN] Space {self._target}: switch not confirmed, skipped", flush=True)
+            self.skipped.append(self._target)
+            self._report()
+            self.state = SWITCH
+            return 0.0
+        return self.poll_interval
+
+    def _on_collect(self):
+        self._record(self._target, self.backend.current_windows())
+        self.state = SWITCH
+        return 0.0
+
+    def _on_return(self):
+        if self._original is None or self.backend.focused() == self._original:
+            return self._finish(CANCELLED if self._cancel.is_set() else DONE)
+        self.backend.goto(self._original)
+        self._deadline = self.clock() + self.confirm_timeout
+        self.state = CONFIRM_RETURN
+        return self.poll_interval
+
+    def _on_confirm_return(self):
+        if self.backend.focused() == self._original or self.clock() >= self._deadline:
+            return self._finish(CANCELLED if self._cancel.is_set() else DONE)
+        return self.poll_interval
+
+    # === Вспомогательное ===
+
+    def _record(self, index: int, windows: list):
+        self.result[index] = windows
+        if self.on_space is not None:
+            self.on_space(index, windows)
+        self._report()
+
+    def _report(self):
+        if self.on_progress is not None:
+            self.on_progress(len(self.result) + len(self.skipped), self.total)
+
+    def _finish(self, state: str):
+        self.state = state
+        if self.on_finished is not None:
+            self.on_finished(self.result, state == CANCELLED)
+        return None
+
+
+class ScanThread:
+    """Прогон SpaceScanner в фоновом потоке; cancel() будит ожидание сразу"""
+
+    def __init__(self, scanner: SpaceScanner):
+        self.scanner = scanner
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="space-scan", daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self.scanner.cancel()
+        self._wake.set()
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        try:
+            while True:
+                delay = self.scanner.step()
+                if delay is None:
+                    return
+                if delay > 0:
+                    self._wake.wait(delay)
+                    self._wake.clear()
+        except Exception as e:
+            print(f"[SCAN] Error: {e}", flush=True)
+            self.scanner._finish(CANCELLED)
@@ -0,0 +1,243 @@
+"""
+Инкрементальный индекс поиска окон с ранжированием по недавнему фокусу (MRU).
+
+Индекс поддерживается изменениями (sync/upsert/remove/set_space/touch),
+а не пересборкой: на каждое нажатие клавиши search() не сканирует кэш окон.
+
+Ранжирование: сначала окна, где каждое слово запроса встречается подстрокой,
+затем нечёткие совпадения (символы по порядку); внутри группы — по свежести
+фокуса. Кандидатов дают posting-списки символов и биграмм (пересечение множеств
+идёт в C), обход идёт от самых свежих окон и останавливается, как только набран
+limit результатов, поэтому типичный запрос не трогает весь индекс.
+"""
+
+from collections import OrderedDict
+
+
+def _space_number(space):
+    """Номер Space как int (в кэше workspace — строка "3"), как в query.window_row"""
+    if isinstance(space, str):
+        return int(space) if space.isdigit() else None
+    return space
+
+
+class WindowEntry:
+    """Запись индекса: данные окна + нормализованная строка для поиска"""
+
+    __slots__ = ("window_id", "app", "title", "space", "haystack")
+
+    def __init__(self, window_id: int, app: str, title: str, space):
+        self.window_id = window_id
+        self.app = app
+        self.title = title
+        self.space = _space_number(space)
+        self.haystack = f"{app} {title}".lower()
+
+    def as_dict(self) -> dict:
+        return {
+            "window_id": self.window_id,
+            "app": self.app,
+            "title": self.title,
+            "space": self.space,
+        }
+
+
+def _grams(text: str) -> set:
+    """Символы и биграммы строки — ключи posting-списков"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+def _is_subsequence(needle: str, haystack: str) -> bool:
+    pos = 0
+    find = haystack.find
+    for ch in needle:
+        pos = find(ch, pos) + 1
+        if not pos:
+            return False
+    return True
+
+
+class WindowSearchIndex:
+    """Индекс окон всех Spaces: нечёткий поиск по app+title, ранжирование MRU"""
+
+    def __init__(self):
+        # Порядок OrderedDict = свежесть фокуса: конец — самое недавнее окно
+        self._entries = OrderedDict()
+        self._postings = {}  # символ/биграмма -> множество window_id, где встречается
+        self.version = 0
+        self._order_version = 0  # меняется при любом изменении порядка MRU
+        self._positions = {}
+        self._positions_version = -1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, window_id):
+        return window_id in self._entries
+
+    # === Изменения ===
+
+    def upsert(self, window_id: int, app: str, title: str, space=None):
+        """Добавить окно или обновить его данные; свежесть фокуса сохраняется"""
+        entry = self._entries.get(window_id)
+        if entry is not None and entry.app == app and entry.title == title:
+            entry.space = _space_number(space)
+            return
+        if entry is not None:
+            self._unindex(entry)
+        new_entry = WindowEntry(window_id, app, title, space)
+        self._entries[window_id] = new_entry
+        if entry is None:
+            # Новое окно ещё не было в фокусе — в хвост очереди MRU
+            self._entries.move_to_end(window_id, last=False)
+            self._order_version += 1
+        self._index(new_entry)
+        self.version += 1
+
+    def remove(self, window_id: int):
+        entry = self._entries.pop(window_id, None)
+        if entry is not None:
+            self._unindex(entry)
+            self.version += 1
+            self._order_version += 1
+
+    def set_space(self, window_id: int, space):
+        entry = self._entries.get(window_id)
+        if entry is not None:
+            entry.space = _space_number(space)
+
+    def touch(self, window_id: int):
+        """Отметить фокус окна (поднимает его в ранжировании)"""
+        if window_id in self._entries:
+            self._entries.move_to_end(window_id)
+            self._order_version += 1
+
+    def sync(self, windows):
+        """
+        Привести индекс к списку окон (dict с window_id/id, app, title, workspace).
+
+        Меняются только отличающиеся записи; исчезнувшие окна удаляются.
+        """
+        seen = set()
+        for w in windows:
+            wid = w.get("window_id") or w.get("id")
+            if not wid:
+                continue
+            seen.add(wid)
+            self.upsert(wid, w.get("app", ""), w.get("title", ""), w.get("workspace", w.get("space")))
+        for wid in [wid for wid in self._entries if wid not in seen]:
+            self.remove(wid)
+
+    def clear(self):
+        self._entries.clear()
+        self._postings.clear()
+        self.version += 1
+        self._order_version += 1
+
+    def _index(self, entry: WindowEntry):
+        wid = entry.window_id
+        for gram in _grams(entry.haystack):
+            bucket = self._postings.get(gram)
+            if bucket is None:
+                self._postings[gram] = {wid}
+            else:
+                bucket.add(wid)
+
+    def _unindex(self, entry: WindowEntry):
+        wid = entry.window_id
+        for gram in _grams(entry.haystack):
+            bucket = self._postings.get(gram)
+            if bucket is not None:
+                bucket.discard(wid)
+                if not bucket:
+                    del self._postings[gram]
+
+    # === Поиск ===
+
+    def recent(self, limit: int = 20) -> list:
+        """Самые недавние окна (пустой запрос)"""
+        result = []
+        for entry in reversed(self._entries.values()):
+            result.append(entry.as_dict())
+            if len(result) >= limit:
+                break
+        return result
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """Окна, подходящие под запрос, в порядке релевантности"""
+        tokens = sorted(set(query.lower().split()), key=len, reverse=True)
+        if not tokens:
+            return self.recent(limit)
+
+        # Точные совпадения: у окна должны быть все биграммы каждого слова
+        exact_keys = set()
+        for t in tokens:
+            exact_keys.update(_grams(t) if len(t) == 1 else (t[i:i + 2] for i in range(len(t) - 1)))
+        candidates = self._candidates(exact_keys)
+        exact = []
+        if candidates:
+            for entry in self._walk(candidates):
+                hay = entry.haystack
+                for t in tokens:
+                    if t not in hay:
+                        break
+                else:
+                    exact.append(entry)
+                    if len(exact) >= limit:
+                        break
+
+        # Нечёткие — только чтобы добрать до limit
+        fuzzy = []
+        if len(exact) < limit:
+            candidates = self._candidates(set("".join(tokens)))
+            if candidates:
+                taken = {e.window_id for e in exact}
+                need = limit - len(exact)
+                for entry in self._walk(candidates):
+                    if entry.window_id in taken:
+                        continue
+                    hay = entry.haystack
+                    for t in tokens:
+                        if not _is_subsequence(t, hay):
+                            break
+                    else:
+                        fuzzy.append(entry)
+                        if len(fuzzy) >= need:
+                            break
+
+        return [e.as_dict() for e in exact + fuzzy]
+
+    def _candidates(self, keys) -> set:
+        """Пересечение posting-списков (надмножество совпадений; проверка — в search)"""
+        buckets = []
+        for key in keys:
+            bucket = self._postings.get(key)
+            if not bucket:
+                return set()
+            buckets.append(bucket)
+        buckets.sort(key=len)
+        # Почти полные списки почти не сужают выбор, а пересечение с ними дорого
+        dense = len(self._entries) * 3 // 4
+        result = buckets[0]
+        for bucket in buckets[1:]:
+            if len(result) <= 32 or len(bucket) > dense:
+                break
+            result = result & bucket
+        return result
+
+    def _walk(self, candidates):
+        """Кандидаты в порядке MRU (сначала самые недавние)"""
+        entries = self._entries
+        if len(candidates) * 8 < len(entries):
+            ordered = sorted(candidates, key=self._mru_positions().__getitem__, reverse=True)
+            return (entries[wid] for wid in ordered)
+        return (e for e in reversed(entries.values()) if e.window_id in candidates)
+
+    def _mru_positions(self) -> dict:
+        """window_id -> позиция в очереди MRU (пересчёт только после изменений порядка)"""
+        if self._positions_version != self._order_version:
+            self._positions = {wid: i for i, wid in enumerate(self._entries)}
+            self._positions_version = self._order_version
+        return self._positions
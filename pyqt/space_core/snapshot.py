@@ -0,0 +1,94 @@
+"""
+Неизменяемые снимки состояния бэкенда с публикацией одной заменой ссылки.
+
+Писатель строит новый BackendSnapshot (окна, активный Space, дисплеи) и
+публикует его присваиванием SnapshotStore._current — в CPython это атомарно.
+Читатель берёт store.current один раз и дальше работает с согласованным
+снимком: без блокировок, а версия говорит, какое именно состояние он видит.
+Писатели сериализуются между собой блокировкой (read-modify-write).
+"""
+
+import threading
+from types import MappingProxyType
+
+_EMPTY = MappingProxyType({})
+
+
+def freeze_record(record) -> MappingProxyType:
+    """Запись окна/дисплея только для чтения (копия исходного dict)"""
+    return record if isinstance(record, MappingProxyType) else MappingProxyType(dict(record))
+
+
+class BackendSnapshot:
+    """
+    Снимок: windows ("app|title" -> запись окна), focused (1-based индекс
+    активного Space), spaces_count, displays (записи от ls()), fetched_at
+    (time.time() получения окон; 0 — ещё не получали).
+    """
+
+    __slots__ = ("version", "windows", "focused", "spaces_count", "displays", "fetched_at")
+
+    def __init__(self, version: int = 0, windows=_EMPTY, focused: int = 1, spaces_count: int = 16,
+                 displays=(), fetched_at: float = 0.0):
+        set_ = object.__setattr__
+        set_(self, "version", version)
+        set_(self, "windows", windows if isinstance(windows, MappingProxyType) else MappingProxyType(
+            {k: freeze_record(v) for k, v in windows.items()}))
+        set_(self, "focused", focused)
+        set_(self, "spaces_count", spaces_count)
+        set_(self, "displays", tuple(freeze_record(d) for d in displays))
+        set_(self, "fetched_at", fetched_at)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"BackendSnapshot is immutable (tried to set {name!r})")
+
+    def replace(self, **changes) -> "BackendSnapshot":
+        """Новый снимок со следующей версией и изменёнными полями"""
+        fields = {name: getattr(self, name) for name in self.__slots__ if name != "version"}
+        fields.update(changes)
+        return BackendSnapshot(self.version + 1, **fields)
+
+    def __repr__(self):
+        return (f"BackendSnapshot(v{self.version}, {len(self.windows)} windows, focused={self.focused}, "
+                f"spaces={self.spaces_count}, displays={len(self.displays)})")
+
+
+class SnapshotStore:
+    """Текущий снимок + сериализованные писатели; чтение — без блокировок"""
+
+    def __init__(self, initial: BackendSnapshot = None):
+        self._current = initial if initial is not None else BackendSnapshot()
+        self._write_lock = threading.Lock()
+        self.listeners = []  # fn(snapshot) после каждой публикации (в потоке писателя)
+
+    @property
+    def current(self) -> BackendSnapshot:
+        return self._current
+
+    @property
+    def version(self) -> int:
+        return self._current.version
+
+    def publish(self, **changes) -> BackendSnapshot:
+        """Опубликовать текущий снимок с изменёнными полями"""
+        return self.update(lambda snapshot: snapshot.replace(**changes))
+
+    def update(self, build) -> BackendSnapshot:
+        """
+        build(текущий снимок) -> новый снимок или тот же (ничего не менять).
+
+        Вызов сериализован с другими писателями, поэтому build видит
+        последнюю версию и ничьи изменения не теряются.
+        """
+        with self._write_lock:
+            snapshot = self._current
+            new = build(snapshot)
+            if new is snapshot:
+                return snapshot
+            self._current = new  # единственная точка публикации
+        for listener in list(self.listeners):
+            try:
+                listener(new)
+            except Exception as e:
+                print(f"[SNAPSHOT] Listener error: {e}", flush=True)
+        return new
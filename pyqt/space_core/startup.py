@@ -0,0 +1,89 @@
+"""
+Разбивка времени старта по параллельным дорожкам.
+
+Старт идёт двумя дорожками: backend (предзагрузка окон из Hammerspoon в
+фоновом потоке) и ui (QApplication, SpaceManager, первая отрисовка).
+StartupTimeline записывает отрезки каждой дорожки от общего нуля, а
+report() показывает обе дорожки, момент готовности и сколько стоил бы
+последовательный старт.
+"""
+
+import threading
+import time
+
+
+class StartupTimeline:
+    """Отрезки (дорожка, фаза, начало, конец) в секундах от t0; потокобезопасно"""
+
+    def __init__(self, t0: float = None, clock=time.perf_counter):
+        self.clock = clock
+        self.t0 = clock() if t0 is None else t0
+        self._spans = []
+        self._lock = threading.Lock()
+
+    def add(self, track: str, phase: str, start: float, end: float):
+        with self._lock:
+            self._spans.append((track, phase, start - self.t0, end - self.t0))
+
+    def span(self, track: str, phase: str):
+        """with timeline.span("ui", "SpaceManager"): ..."""
+        return _Span(self, track, phase)
+
+    def mark(self, track: str, phase: str):
+        """Мгновенное событие (например, первая отрисовка)"""
+        now = self.clock()
+        self.add(track, phase, now, now)
+
+    def tracks(self) -> dict:
+        """{дорожка: [(фаза, начало, конец)]} в порядке записи"""
+        with self._lock:
+            spans = list(self._spans)
+        result = {}
+        for track, phase, start, end in spans:
+            result.setdefault(track, []).append((phase, start, end))
+        return result
+
+    def summary(self) -> dict:
+        """Для JSON/логов: фазы и отметки в мс, конец каждой дорожки, готовность и последовательная сумма"""
+        tracks = self.tracks()
+        result = {"tracks": {}, "ready_ms": 0.0, "serial_ms": 0.0}
+        for track, spans in tracks.items():
+            busy = sum(end - start for _, start, end in spans)
+            finished = max(end for _, _, end in spans)
+            result["tracks"][track] = {
+                "phases": {phase: round((end - start) * 1000, 1) for phase, start, end in spans if end > start},
+                "marks": {phase: round(start * 1000, 1) for phase, start, end in spans if end == start},
+                "busy_ms": round(busy * 1000, 1),
+                "finished_ms": round(finished * 1000, 1),
+            }
+            result["ready_ms"] = max(result["ready_ms"], round(finished * 1000, 1))
+            result["serial_ms"] = round(result["serial_ms"] + busy * 1000, 1)
+        return result
+
+    def report(self) -> list:
+        """Строки для лога: по строке на дорожку и итог"""
+        summary = self.summary()
+        lines = []
+        for track, info in summary["tracks"].items():
+            phases = ", ".join([f"{phase} {ms:.0f}ms" for phase, ms in info["phases"].items()] +
+                               [f"{phase} at {ms:.0f}ms" for phase, ms in info["marks"].items()])
+            lines.append(f"{track}: {phases} (done at {info['finished_ms']:.0f}ms)")
+        lines.append(f"ready at {summary['ready_ms']:.0f}ms (serial would be {summary['serial_ms']:.0f}ms)")
+        return lines
+
+
+class _Span:
+    __slots__ = ("timeline", "track", "phase", "start")
+
+    def __init__(self, timeline: StartupTimeline, track: str, phase: str):
+        self.timeline = timeline
+        self.track = track
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = self.timeline.clock()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.timeline.add(self.track, self.phase, self.start, self.timeline.clock())
+        return False
@@ -0,0 +1,123 @@
+"""
+Список окон терминала: запрос к общему индексу окон + сменные приёмники вывода.
+
+Запрос и форматирование не зависят от платформы (работают и на поддельном
+бэкенде); от macOS зависит только StickiesSink — доставка текста в Stickies.
+
+    python -m space_core.cli terminals                 # текущий Space, stdout
+    python -m space_core.cli terminals --all --sink stickies
+"""
+
+import subprocess
+import sys
+
+from space_core.persist import atomic_write_bytes
+
+# Имя процесса Terminal.app зависит от языка системы
+TERMINAL_APPS = ("Terminal", "Терминал")
+
+TITLE_WIDTH = 55
+LIMIT = 30
+
+
+def terminal_rows(source, scope: str = "here", apps=TERMINAL_APPS) -> list:
+    """Окна терминалов из источника (space_core.cli: демон или backend); scope — here | all"""
+    space = source.focused()["space"] if scope == "here" else None
+    if not isinstance(apps, str):
+        apps = ",".join(apps)
+    rows = [row for row in source.windows(app=apps, space=space) if row.get("title")]
+    rows.sort(key=lambda row: (row.get("space") or 0, row.get("window_id") or 0))
+    return rows
+
+
+def _shorten(title: str, width: int) -> str:
+    return title[:width] + "..." if len(title) > width else title
+
+
+def format_listing(rows: list, scope: str = "here", width: int = TITLE_WIDTH, limit: int = LIMIT) -> str:
+    """Текст записки: заголовок с числом окон и нумерованный список (для all — с номером Space)"""
+    lines = [f"🖥 ТЕРМИНАЛЫ ({len(rows)}):", ""]
+    for i, row in enumerate(rows[:limit], 1):
+        title = _shorten(row["title"], width)
+        lines.append(f"{i}. [{row.get('space')}] {title}" if scope == "all" else f"{i}. {title}")
+    if not rows:
+        lines.append("(нет окон терминала)")
+    elif len(rows) > limit:
+        lines.append(f"... и ещё {len(rows) - limit} окон")
+    return "\n".join(lines) + "\n"
+
+
+class StdoutSink:
+    def deliver(self, text: str):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+
+class FileSink:
+    """Записать в файл атомарно (например, для виджета или SketchyBar)"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def deliver(self, text: str):
+        atomic_write_bytes(self.path, text.encode("utf-8"))
+
+
+# Текст идёт аргументом (argv), без отдельного pbcopy; в записку он попадает
+# вставкой через буфер обмена, прежнее содержимое буфера возвращается.
+# Готовности Stickies ждём коротким опросом и не перезапускаем его
+_STICKIES_SCRIPT = '''
+on run argv
+    -- У Stickies нет словаря AppleScript: текст попадает в записку только
+    -- вставкой, поэтому буфер обмена пользователя сохраняем и возвращаем
+    set savedClipboard to missing value
+    try
+        set savedClipboard to (the clipboard as record)
+    on error
+        try
+            set savedClipboard to the clipboard
+        end try
+    end try
+    set the clipboard to item 1 of argv
+    try
+        tell application "Stickies" to activate
+        tell application "System Events"
+            tell process "Stickies"
+                repeat 40 times
+                    if frontmost then exit repeat
+                    delay 0.05
+                end repeat
+                try
+                    click menu item "Новая заметка" of menu "Файл" of menu bar 1
+                on error
+                    click menu item "Новая записка" of menu "Файл" of menu bar 1
+                end try
+                click menu item "Вставить" of menu "Правка" of menu bar 1
+            end tell
+        end tell
+        delay 0.2
+    on error errorMessage number errorNumber
+        if savedClipboard is not missing value then set the clipboard to savedClipboard
+        error errorMessage number errorNumber
+    end try
+    if savedClipboard is not missing value then set the clipboard to savedClipboard
+end run
+'''
+
+
+class StickiesSink:
+    """Новая записка Stickies с текстом (macOS, нужен доступ к System Events)"""
+
+    def deliver(self, text: str):
+        subprocess.run(["osascript", "-", text], input=_STICKIES_SCRIPT, text=True,
+                       stdout=subprocess.DEVNULL, timeout=10.0, check=True)
+
+
+def make_sink(kind: str = "stdout", path: str = None):
+    if kind == "file":
+        if not path:
+            raise ValueError("file sink needs --output PATH")
+        return FileSink(path)
+    if kind == "stickies":
+        return StickiesSink()
+    return StdoutSink()
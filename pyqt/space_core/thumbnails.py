@@ -0,0 +1,250 @@
+"""
+Миниатюры окон: источник захвата, LRU-кэш с лимитом по байтам, фоновый загрузчик.
+
+Захват и уменьшение выполняются в пуле потоков (QImage потокобезопасен),
+в GUI-поток приходит только сигнал ready(window_id, generation). Ключ кэша —
+(window_id, generation): generation растёт, когда меняется заголовок окна,
+и старые версии той же миниатюры вытесняются сразу. Содержимое окна меняется
+и без смены заголовка (терминал, браузер), поэтому миниатюра старше max_age
+захватывается заново; неудачные захваты (например, до выдачи доступа к
+записи экрана) повторяются через retry_failed секунд.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, QSize, Qt, pyqtSignal
+from PyQt6.QtGui import QColor, QImage, QPainter
+
+THUMB_SIZE = QSize(240, 150)
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_MAX_AGE = 60.0       # секунд до повторного захвата той же миниатюры
+DEFAULT_RETRY_FAILED = 60.0  # секунд до повтора неудачного захвата
+MAX_FAILED = 4096            # сколько неудачных ключей помнить
+
+
+class ThumbnailCache:
+    """LRU-кэш миниатюр с ограничением суммарного размера в байтах"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()  # (wid, gen) -> (image, nbytes, время захвата)
+        self._generations = {}       # wid -> gen, который лежит в кэше
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, window_id: int, generation: int):
+        key = (window_id, generation)
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def stored_at(self, window_id: int, generation: int):
+        """Когда миниатюра положена в кэш (time.monotonic) или None"""
+        with self._lock:
+            item = self._items.get((window_id, generation))
+            return item[2] if item is not None else None
+
+    def put(self, window_id: int, generation: int, image, nbytes: int):
+        """Положить миниатюру; устаревший generation того же окна удаляется"""
+        with self._lock:
+            old_gen = self._generations.get(window_id)
+            if old_gen is not None:
+                self._drop((window_id, old_gen))
+            if nbytes > self.max_bytes:
+                return
+            self._items[(window_id, generation)] = (image, nbytes, time.monotonic())
+            self._generations[window_id] = generation
+            self.total_bytes += nbytes
+            while self.total_bytes > self.max_bytes and self._items:
+                (wid, _), (_, size, _) = self._items.popitem(last=False)
+                self._generations.pop(wid, None)
+                self.total_bytes -= size
+
+    def discard(self, window_id: int):
+        with self._lock:
+            gen = self._generations.get(window_id)
+            if gen is not None:
+                self._drop((window_id, gen))
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._generations.clear()
+            self.total_bytes = 0
+
+    def _drop(self, key):
+        item = self._items.pop(key, None)
+        if item is not None:
+            self.total_bytes -= item[1]
+            self._generations.pop(key[0], None)
+
+
+class ThumbnailSource:
+    """Интерфейс источника: capture(window_id) -> QImage полного размера или None"""
+
+    def capture(self, window_id: int):
+        raise NotImplementedError
+
+
+class QuartzThumbnailSource(ThumbnailSource):
+    """Захват окна через CGWindowListCreateImage (macOS)"""
+
+    def capture(self, window_id: int):
+        try:
+            import Quartz
+            cg_image = Quartz.CGWindowListCreateImage(
+                Quartz.CGRectNull,
+                Quartz.kCGWindowListOptionIncludingWindow,
+                window_id,
+                Quartz.kCGWindowImageBoundsIgnoreFraming | Quartz.kCGWindowImageNominalResolution
+            )
+            if cg_image is None:
+                return None
+            width = Quartz.CGImageGetWidth(cg_image)
+            height = Quartz.CGImageGetHeight(cg_image)
+            if not width or not height:
+                return None
+            bytes_per_row = Quartz.CGImageGetBytesPerRow(cg_image)
+            data = bytes(Quartz.CGDataProviderCopyData(Quartz.CGImageGetDataProvider(cg_image)))
+            # CG отдаёт BGRA premultiplied-first = ARGB32 premultiplied на little-endian
+            image = QImage(data, width, height, bytes_per_row, QImage.Format.Format_ARGB32_Premultiplied)
+            return image.copy()  # отвязать от буфера data
+        except Exception as e:
+            print(f"[THUMB] Capture error for {window_id}: {e}", flush=True)
+            return None
+
+
+class FakeThumbnailSource(ThumbnailSource):
+    """Синтетический источник для тестов и бенчмарков: цвет зависит от window_id"""
+
+    def __init__(self, width: int = 1440, height: int = 900, delay: float = 0.0):
+        self.width = width
+        self.height = height
+        self.delay = delay
+        self.captured = 0
+
+    def capture(self, window_id: int):
+        if self.delay:
+            time.sleep(self.delay)
+        self.captured += 1
+        image = QImage(self.width, self.height, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(QColor.fromHsv((window_id * 37) % 360, 160, 200))
+        painter = QPainter(image)
+        painter.fillRect(0, 0, self.width, self.height // 12, QColor(40, 40, 42))
+        painter.end()
+        return image
+
+
+class ThumbnailLoader(QObject):
+    """
+    Асинхронная загрузка миниатюр: захват + уменьшение в пуле потоков.
+
+    request() сразу возвращает готовую миниатюру из кэша или ставит захват
+    в очередь (повторные запросы того же ключа не дублируются) и возвращает
+    None; по готовности испускается ready(window_id, generation). Миниатюра
+    старше max_age возвращается как есть, но захват ставится снова.
+    """
+
+    ready = pyqtSignal(int, int)
+
+    def __init__(self, source: ThumbnailSource, size: QSize = THUMB_SIZE,
+                 max_bytes: int = DEFAULT_MAX_BYTES, workers: int = 2,
+                 max_age: float = DEFAULT_MAX_AGE, retry_failed: float = DEFAULT_RETRY_FAILED):
+        super().__init__()
+        self.source = source
+        self.size = size
+        self.max_age = max_age
+        self.retry_failed = retry_failed
+        self.cache = ThumbnailCache(max_bytes)
+        self._pending = set()
+        self._failed = OrderedDict()  # ключ -> время неудачи (до retry_failed не повторяем)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumb")
+
+    def get(self, window_id: int, generation: int = 0):
+        """Только кэш, без захвата"""
+        return self.cache.get(window_id, generation)
+
+    def request(self, window_id: int, generation: int = 0):
+        if not window_id:
+            return None
+        image = self.cache.get(window_id, generation)
+        now = time.monotonic()
+        if image is not None:
+            stored_at = self.cache.stored_at(window_id, generation)
+            if stored_at is not None and now - stored_at < self.max_age:
+                return image
+        key = (window_id, generation)
+        with self._lock:
+            failed_at = self._failed.get(key)
+            if failed_at is not None and now - failed_at >= self.retry_failed:
+                del self._failed[key]
+                failed_at = None
+            if key in self._pending or failed_at is not None or self._executor is None:
+                return image
+            self._pending.add(key)
+        self._executor.submit(self._work, window_id, generation)
+        return image
+
+    def _work(self, window_id: int, generation: int):
+        try:
+            image = self.source.capture(window_id)
+            if image is None or image.isNull():
+                with self._lock:
+                    self._failed[(window_id, generation)] = time.monotonic()
+                    self._failed.move_to_end((window_id, generation))
+                    while len(self._failed) > MAX_FAILED:
+                        self._failed.popitem(last=False)
+                return
+            # Уменьшаем один раз; дальше UI берёт готовую картинку
+            thumb = image.scaled(
+                self.size,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation
+            ).convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+            self.cache.put(window_id, generation, thumb, thumb.sizeInBytes())
+        except Exception as e:
+            print(f"[THUMB] Worker error for {window_id}: {e}", flush=True)
+            return
+        finally:
+            with self._lock:
+                self._pending.discard((window_id, generation))
+        self.ready.emit(window_id, generation)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def wait_idle(self, timeout: float = 5.0) -> bool:
+        """Дождаться завершения всех захватов (для тестов и бенчмарков)"""
+        deadline = time.monotonic() + timeout
+        while self.pending_count():
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.001)
+        return True
+
+    def reset(self):
+        """Сбросить кэш и список неудачных захватов (например, после смены источника)"""
+        with self._lock:
+            self._failed.clear()
+        self.cache.clear()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,141 @@
+"""
+Топология Spaces из ~/Library/Preferences/com.apple.spaces.plist.
+
+plist разбирается только при изменении файла (ключ — mtime/size/inode),
+повторные запросы берут готовый результат из памяти — без plistlib и без
+форка `defaults`. Доступны списки Spaces по каждому дисплею.
+
+Формат (важное):
+    SpacesDisplayConfiguration -> Management Data -> Monitors[] ->
+        "Display Identifier" ("Main" или UUID дисплея),
+        "Current Space" {ManagedSpaceID, uuid},
+        "Spaces" [{ManagedSpaceID, uuid, type}]   # type 4 — полноэкранное приложение
+"""
+
+import os
+import threading
+from pathlib import Path
+
+SPACES_PLIST = Path.home() / "Library" / "Preferences" / "com.apple.spaces.plist"
+
+SPACE_TYPE_FULLSCREEN = 4
+
+
+class SpaceInfo:
+    """Один Space: ManagedSpaceID, uuid и признак полноэкранного приложения"""
+
+    __slots__ = ("managed_id", "uuid", "fullscreen")
+
+    def __init__(self, managed_id: int, uuid: str, fullscreen: bool = False):
+        self.managed_id = managed_id
+        self.uuid = uuid
+        self.fullscreen = fullscreen
+
+    def as_dict(self) -> dict:
+        return {"managed_id": self.managed_id, "uuid": self.uuid, "fullscreen": self.fullscreen}
+
+    def __repr__(self):
+        return f"SpaceInfo({self.managed_id}, {self.uuid!r}{', fullscreen' if self.fullscreen else ''})"
+
+
+class DisplaySpaces:
+    """Spaces одного дисплея в порядке Mission Control"""
+
+    __slots__ = ("display_id", "spaces", "current_id")
+
+    def __init__(self, display_id: str, spaces: list, current_id: int = 0):
+        self.display_id = display_id
+        self.spaces = spaces
+        self.current_id = current_id
+
+    def as_dict(self) -> dict:
+        return {
+            "display_id": self.display_id,
+            "current_id": self.current_id,
+            "spaces": [s.as_dict() for s in self.spaces],
+        }
+
+
+def parse_spaces_plist(data: dict) -> list:
+    """Разобрать содержимое com.apple.spaces.plist в список DisplaySpaces"""
+    monitors = (data.get("SpacesDisplayConfiguration", {})
+                .get("Management Data", {})
+                .get("Monitors", []))
+    displays = []
+    for monitor in monitors:
+        raw_spaces = monitor.get("Spaces") or []
+        if not raw_spaces:
+            continue  # «виртуальные» записи без Spaces (коллапсированные дисплеи)
+        spaces = [
+            SpaceInfo(int(s.get("ManagedSpaceID", s.get("id64", 0))),
+                      s.get("uuid", ""),
+                      s.get("type", 0) == SPACE_TYPE_FULLSCREEN)
+            for s in raw_spaces
+        ]
+        current = monitor.get("Current Space") or {}
+        displays.append(DisplaySpaces(
+            monitor.get("Display Identifier", ""),
+            spaces,
+            int(current.get("ManagedSpaceID", 0)),
+        ))
+    return displays
+
+
+class SpaceTopology:
+    """Кэш топологии Spaces, перечитывается только при изменении plist"""
+
+    def __init__(self, path=SPACES_PLIST):
+        self.path = Path(path)
+        self.parses = 0  # сколько раз реально разбирали plist
+        self._stat = None
+        self._displays = []
+        self._lock = threading.Lock()
+
+    def _stat_key(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def displays(self) -> list:
+        """Список DisplaySpaces; plist разбирается, только если файл изменился"""
+        stat = self._stat_key()
+        with self._lock:
+            if stat == self._stat:
+                return self._displays
+            displays = []
+            if stat is not None:
+                try:
+                    import plistlib  # только при разборе: в кэшированном пути не нужен
+                    with open(self.path, "rb") as f:
+                        displays = parse_spaces_plist(plistlib.load(f))
+                except Exception as e:
+                    print(f"[TOPOLOGY] plist error: {e}", flush=True)
+                self.parses += 1
+            self._stat = stat
+            self._displays = displays
+            return displays
+
+    def changed(self) -> bool:
+        """Изменился ли plist с последнего разбора (только stat)"""
+        return self._stat_key() != self._stat
+
+    def invalidate(self):
+        with self._lock:
+            self._stat = None
+
+    def main_spaces(self) -> list:
+        """Spaces главного дисплея (первого в plist)"""
+        displays = self.displays()
+        return displays[0].spaces if displays else []
+
+    def count(self, display: int = 0) -> int:
+        """Количество Spaces на дисплее (0 — главный); 0, если plist недоступен"""
+        displays = self.displays()
+        if display >= len(displays):
+            return 0
+        return len(displays[display].spaces)
+
+    def total(self) -> int:
+        return sum(len(d.spaces) for d in self.displays())
@@ -0,0 +1,130 @@
+"""
+Трассировка живой сессии в формате Chrome trace-event (открывается в Perfetto
+и chrome://tracing).
+
+    with trace.span("backend", "hs -c", command="lw"):
+        ...
+    trace.TRACER.write(path)
+
+Отрезки пишутся в кольцевой буфер фиксированного размера (старые вытесняются),
+поэтому трассировку можно держать включённой постоянно. Выключенный трассировщик
+отдаёт общий пустой контекст — span() стоит одну проверку флага.
+Включение: трей «🔴 Трассировка» или SPACE_MANAGER_TRACE=1 при старте.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from space_core.persist import atomic_write_bytes
+
+CAPACITY = 100_000  # отрезков в буфере (~10-20 МБ в памяти при полном буфере)
+
+
+class Tracer:
+    """Кольцевой буфер завершённых отрезков: (категория, имя, начало, длительность, поток, args)"""
+
+    def __init__(self, capacity: int = CAPACITY, enabled: bool = False):
+        self.enabled = enabled
+        self.capacity = capacity
+        self.dropped = 0
+        self._events = deque(maxlen=capacity)
+        self._threads = {}
+        self._t0 = time.perf_counter_ns()
+
+    def span(self, category: str, name: str, **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, category, name, args)
+
+    def instant(self, category: str, name: str, **args):
+        if self.enabled:
+            self._record(category, name, time.perf_counter_ns(), None, args)
+
+    def _record(self, category: str, name: str, start_ns: int, duration_ns, args: dict):
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        if len(self._events) == self.capacity:
+            self.dropped += 1
+        self._events.append((category, name, start_ns, duration_ns, tid, args))
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self._events.clear()
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._events)
+
+    def export(self) -> dict:
+        """{"traceEvents": [...]} — complete-события (ph X), мгновенные (ph i) и имена потоков"""
+        pid = os.getpid()
+        events = [{"ph": "M", "name": "process_name", "pid": pid, "tid": 0, "args": {"name": "space-manager"}}]
+        for tid, thread_name in list(self._threads.items()):
+            events.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": thread_name}})
+        for category, name, start_ns, duration_ns, tid, args in list(self._events):
+            event = {"name": name, "cat": category, "pid": pid, "tid": tid,
+                     "ts": (start_ns - self._t0) / 1000}
+            if duration_ns is None:
+                event.update(ph="i", s="t")
+            else:
+                event.update(ph="X", dur=duration_ns / 1000)
+            if args:
+                event["args"] = args
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"capacity": self.capacity, "dropped": self.dropped}}
+
+    def write(self, path):
+        atomic_write_bytes(path, json.dumps(self.export(), ensure_ascii=False).encode("utf-8"))
+
+
+class _Span:
+    __slots__ = ("tracer", "category", "name", "args", "start")
+
+    def __init__(self, tracer: Tracer, category: str, name: str, args: dict):
+        self.tracer = tracer
+        self.category = category
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer._record(self.category, self.name, self.start, time.perf_counter_ns() - self.start, self.args)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+TRACER = Tracer(enabled=os.environ.get("SPACE_MANAGER_TRACE") == "1")
+
+
+def span(category: str, name: str, **args):
+    return TRACER.span(category, name, **args)
+
+
+def instant(category: str, name: str, **args):
+    TRACER.instant(category, name, **args)
@@ -8,321 +8,94 @@ Space Manager v2.0 - Продвинутый менеджер рабочих ст
 Автор: Клэр для Ларри
 """
 
+import os
 import sys
 import json
-import subprocess
-import re
 import threading
-import ctypes
-from ctypes import c_uint32, c_uint64, c_void_p, c_int
+import time
 from pathlib import Path
+
+_STARTED = time.perf_counter()  # начало импорта модуля — ноль разбивки старта
+
+if __name__ == "__main__" and len(sys.argv) > 1:
+    # Headless-запросы (list-windows, find, ...) отвечают до импорта Qt
+    from space_core.cli import COMMANDS, main as cli_main
+    if set(sys.argv[1:]) & set(COMMANDS):
+        sys.exit(cli_main())
+
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QGridLayout, QPushButton,
     QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QSystemTrayIcon,
-    QMenu, QDialog, QSpinBox, QMessageBox, QFrame, QScrollArea,
+    QMenu, QDialog, QSpinBox, QMessageBox, QInputDialog, QFrame, QScrollArea, QListWidget, QListWidgetItem,
     QGraphicsDropShadowEffect, QGraphicsBlurEffect, QGraphicsOpacityEffect
 )
 from PyQt6.QtCore import (
-    Qt, QTimer, QSize, QMetaObject, Q_ARG, pyqtSignal, QObject,
+    Qt, QTimer, QSize, QMetaObject, Q_ARG, pyqtSignal, QObject, QFileSystemWatcher,
     QPropertyAnimation, QEasingCurve, QSequentialAnimationGroup, QParallelAnimationGroup,
-    QMimeData, QProcess
+    QMimeData, QProcess, QEvent
 )
 from PyQt6.QtGui import QIcon, QKeySequence, QShortcut, QFont, QAction, QPixmap, QPainter, QColor, QFontDatabase, QDrag
-from AppKit import NSWorkspace, NSImage, NSBitmapImageRep, NSPNGFileType, NSRunningApplication
-from Foundation import NSURL, NSData
-import objc
-from pynput import keyboard
-import Quartz
-from Quartz import (
-    CGWindowListCopyWindowInfo,
-    kCGWindowListOptionOnScreenOnly,
-    kCGWindowListExcludeDesktopElements,
-    kCGNullWindowID
+from space_core.backend import (
+    HammerspoonScanBackend, activate_window, focus_window_by_id, get_display_focus,
+    get_display_sections, get_focused_window_id, get_focused_workspace, get_latency_log,
+    get_search_index, get_snapshot, get_space_identity, get_space_topology, get_spaces_count,
+    get_window_id_by_title, get_windows_by_workspace, move_window_to_space,
+    refresh_windows_cache, reindex_windows_cache, start_prefetch, submit_window_moves, switch_space
+)
+from space_core import census, layouts, metrics, trace
+from space_core.config import (
+    CONFIG_DIR, CONFIG_PATH, METRICS_JSON_PATH, METRICS_PROM_PATH, SETTINGS_KEYS, SETTINGS_PATH, STATE_PATH
 )
+from space_core.names import LEGACY_NAME_FILES, NAMES_PATH, SpaceNameStore, read_names_file
+from space_core.persist import StateLog, WriteBehindWriter
+from space_core.query import iter_windows
+from space_core.scanner import ScanThread, SpaceScanner
+from space_core.hotkeys import HotkeyEngine, key_name
+from space_core.identity import plan_index_migration
+from space_core.startup import StartupTimeline
+from space_core.thumbnails import (
+    ThumbnailLoader, ThumbnailSource, QuartzThumbnailSource
+)
+
+# AppKit (иконки) и pynput (hotkeys) импортируются при первом использовании
 
-CONFIG_PATH = Path.home() / "Клэр" / "apps" / "space-manager" / "config.json"
+# Метрики UI (space_core.metrics): обновление карточек и отрисовка окна
+_ui_refresh = {source: metrics.histogram("ui_refresh_seconds", "Обновление карточек", source=source)
+               for source in ("cache", "backend")}
+_ui_set_apps = metrics.histogram("ui_set_apps_seconds", "SpaceCard.set_apps на карточку")
+_ui_paint = metrics.histogram("ui_paint_seconds", "Отрисовка окна Space Manager (UpdateRequest)")
 
 # Кэш иконок приложений
 _app_icon_cache = {}
 _running_apps_cache = {}  # Кэш запущенных приложений
+_thumbnail_loader = None  # Миниатюры окон (см. get_thumbnail_loader)
 
-# SkyLight API для работы со Spaces
-_skylight = None
-_sls_connection = None
-_space_ids_cache = {}
-
-
-def _init_skylight():
-    """Инициализировать SkyLight framework"""
-    global _skylight, _sls_connection
-    if _skylight is not None:
-        return True
-    try:
-        _skylight = ctypes.CDLL('/System/Library/PrivateFrameworks/SkyLight.framework/SkyLight')
-
-        # SLSMainConnectionID
-        SLSMainConnectionID = _skylight.SLSMainConnectionID
-        SLSMainConnectionID.restype = c_uint32
-        _sls_connection = SLSMainConnectionID()
-
-        return _sls_connection > 0
-    except Exception as e:
-        print(f"SkyLight init error: {e}")
-        return False
-
-
-def get_space_ids_map():
-    """Получить карту: номер Space -> ManagedSpaceID"""
-    global _space_ids_cache
-    if _space_ids_cache:
-        return _space_ids_cache
-
-    if not _init_skylight():
-        return {}
-
-    try:
-        SLSCopyManagedDisplaySpaces = _skylight.SLSCopyManagedDisplaySpaces
-        SLSCopyManagedDisplaySpaces.argtypes = [c_uint32]
-        SLSCopyManagedDisplaySpaces.restype = c_void_p
-
-        spaces_ref = SLSCopyManagedDisplaySpaces(_sls_connection)
-        if not spaces_ref:
-            return {}
-
-        spaces = objc.objc_object(c_void_p=spaces_ref)
-
-        result = {}
-        for display in spaces:
-            if isinstance(display, dict):
-                space_list = display.get('Spaces', [])
-                for i, s in enumerate(space_list):
-                    space_id = s.get('ManagedSpaceID')
-                    if space_id:
-                        # Индекс начинается с 1
-                        result[i + 1] = int(space_id)
-
-        _space_ids_cache = result
-        return result
-    except Exception as e:
-        print(f"get_space_ids error: {e}")
-        return {}
-
-
-# ============================================================================
-# HAMMERSPOON BACKEND (заменяет AeroSpace)
-# ============================================================================
-# Кэш окон (обновляется при refresh_apps)
-_windows_cache = {}
-_windows_cache_time = 0
-_focused_space_cache = 1  # Кэш текущего активного space (1-based index)
-_spaces_count_cache = 16  # Количество spaces
-
-def _hs_call(lua_code: str, timeout: float = 2.0) -> str:
-    """Вызвать Hammerspoon CLI и получить результат"""
-    try:
-        result = subprocess.run(
-            ['hs', '-c', lua_code],
-            capture_output=True, text=True, timeout=timeout,
-            stdin=subprocess.DEVNULL
-        )
-        if result.returncode == 0:
-            return result.stdout.strip()
-    except FileNotFoundError:
-        print("[HS] Hammerspoon CLI (hs) not found. Install: brew install hammerspoon", flush=True)
-    except subprocess.TimeoutExpired:
-        print(f"[HS] Timeout calling: {lua_code[:50]}...", flush=True)
-    except Exception as e:
-        print(f"[HS] Error: {e}", flush=True)
-    return ""
-
-def get_hammerspoon_windows_sync() -> list:
-    """Синхронное получение окон через Hammerspoon (вызывать ДО Qt)"""
-    try:
-        output = _hs_call('return lw()', timeout=3.0)
-        if output:
-            return json.loads(output)
-    except json.JSONDecodeError as e:
-        print(f"[HS] JSON decode error: {e}", flush=True)
-    except Exception as e:
-        print(f"[HS] get_windows error: {e}", flush=True)
-    return []
-
-def get_focused_workspace() -> int:
-    """Получить текущий активный space из кэша (1-based index)"""
-    global _focused_space_cache
-    return _focused_space_cache
-
-def get_focused_workspace_sync() -> int:
-    """Получить текущий активный space напрямую от Hammerspoon"""
-    try:
-        output = _hs_call('return fs()', timeout=1.0)
-        if output and output.isdigit():
-            return int(output)
-    except Exception as e:
-        print(f"[HS] get_focused error: {e}", flush=True)
-    return 1
-
-
-def update_focused_workspace_sync() -> int:
-    """Синхронное обновление активного space (вызывать ДО Qt!)"""
-    global _focused_space_cache, _spaces_count_cache
-    try:
-        output = _hs_call('return ls()', timeout=2.0)
-        if output:
-            data = json.loads(output)
-            _focused_space_cache = data.get('focusedIndex', 1)
-            _spaces_count_cache = data.get('count', 16)
-            print(f"[PRE-CACHE] Focused space: {_focused_space_cache}, total: {_spaces_count_cache}", flush=True)
-            return _focused_space_cache
-    except Exception as e:
-        print(f"[HS] update_focused_workspace error: {e}", flush=True)
-    return _focused_space_cache
-
-
-def refresh_windows_cache():
-    """Обновить кэш окон через Hammerspoon"""
-    global _windows_cache, _windows_cache_time
-    import time
-
-    try:
-        # Используем pre-cached данные если свежие (< 3 сек)
-        if _windows_cache_time and (time.time() - _windows_cache_time) < 3:
-            print(f"[CACHE] Using cached data ({len(_windows_cache)} windows)", flush=True)
-            return
-
-        print("[CACHE] Refreshing windows via Hammerspoon...", flush=True)
-        windows = get_hammerspoon_windows_sync()
-        _parse_hammerspoon_windows(windows)
-        print(f"[CACHE] Refreshed: {len(_windows_cache)} windows", flush=True)
-    except Exception as e:
-        print(f"[HS] Cache refresh error: {e}", flush=True)
-
-# Алиас для совместимости
-refresh_aerospace_cache = refresh_windows_cache
-
-
-def _parse_hammerspoon_windows(windows: list):
-    """Парсить список окон от Hammerspoon"""
-    global _windows_cache, _windows_cache_time
-    import time
-
-    _windows_cache = {}
-    for w in windows:
-        wid = w.get('id')
-        app = w.get('app', 'Unknown')
-        title = w.get('title', '')
-        space_idx = w.get('spaceIndex')  # 1-based index
-
-        key = f"{app}|{title}"
-        _windows_cache[key] = {
-            'id': wid,
-            'workspace': str(space_idx) if space_idx else '?',
-            'app': app,
-            'title': title,
-            'spaceIndex': space_idx,
-            'visible': w.get('visible', True),
-            'minimized': w.get('minimized', False)
-        }
-    _windows_cache_time = time.time()
-    print(f"[CACHE] Hammerspoon cache updated: {len(_windows_cache)} windows", flush=True)
-
-# Алиасы для совместимости
-_aerospace_windows_cache = _windows_cache
-_aerospace_cache_time = _windows_cache_time
 
+def get_thumbnail_loader() -> ThumbnailLoader:
+    """Общий загрузчик миниатюр окон (создаётся при первом обращении)"""
+    global _thumbnail_loader
+    if _thumbnail_loader is None:
+        _thumbnail_loader = ThumbnailLoader(QuartzThumbnailSource())
+    return _thumbnail_loader
 
-def get_windows_by_workspace():
-    """Получить окна сгруппированные по space index"""
-    result = {}
-    for key, data in _windows_cache.items():
-        ws = data['workspace']
-        if ws not in result:
-            result[ws] = []
-        result[ws].append({
-            'app': data['app'],
-            'title': data['title'],
-            'window_id': data['id']
-        })
-    return result
 
+def icon_cache_bytes() -> int:
+    """Байты пикселей в кэше иконок приложений (для переписи ресурсов)"""
+    return sum(p.width() * p.height() * p.depth() // 8 for p in _app_icon_cache.values())
 
-def get_window_id_by_title(app_name: str, window_title: str) -> int:
-    """Найти Window ID по имени приложения и заголовку окна."""
-    if not _windows_cache:
-        print(f"[GET_ID] Cache empty!", flush=True)
-        return 0
-
-    # Точное совпадение
-    key = f"{app_name}|{window_title}"
-    if key in _windows_cache:
-        wid = _windows_cache[key]['id']
-        print(f"[GET_ID] Exact match: {app_name} -> {wid}", flush=True)
-        return wid
-
-    # Частичное совпадение (title может быть обрезан)
-    for cached_key, data in _windows_cache.items():
-        cached_app = data['app']
-        cached_title = data['title']
-        if cached_app == app_name:
-            # Проверяем совпадение начала title (первые 30 символов)
-            if (cached_title[:30] == window_title[:30] or
-                window_title.startswith(cached_title[:30]) or
-                cached_title.startswith(window_title[:30])):
-                wid = data['id']
-                print(f"[GET_ID] Partial match: {app_name} -> {wid}", flush=True)
-                return wid
-
-    print(f"[GET_ID] Not found: {app_name} | {window_title[:40]}", flush=True)
-    return 0
-
-
-def update_window_workspace_in_cache(window_id: int, new_workspace: int):
-    """Обновить workspace окна в кэше"""
-    global _windows_cache
-    for key, data in _windows_cache.items():
-        if data.get('id') == window_id:
-            old_ws = data.get('workspace')
-            data['workspace'] = str(new_workspace)
-            data['spaceIndex'] = new_workspace
-            print(f"[CACHE] Updated window {window_id} space: {old_ws} -> {new_workspace}", flush=True)
-            return True
-    return False
-
-
-def move_window_to_space(window_id: int, target_space_num: int) -> tuple:
-    """
-    Переместить окно на указанный Space.
-
-    Returns: (success: bool, message: str)
-
-    Использует Hammerspoon + PaperWM Mission Control simulation.
-    """
-    print(f"[MOVE] Moving window {window_id} to space {target_space_num}...", flush=True)
-
-    # Hammerspoon через Mission Control (основной метод)
-    try:
-        output = _hs_call(f'return mw({window_id}, {target_space_num})', timeout=10.0)
-        if output:
-            result = json.loads(output)
-            if result.get('success'):
-                update_window_workspace_in_cache(window_id, target_space_num)
-                print(f"[MOVE] Success via Hammerspoon", flush=True)
-                return True, "Перемещено через Hammerspoon"
-            else:
-                error = result.get('error', 'unknown error')
-                print(f"[MOVE] Hammerspoon error: {error}", flush=True)
-                return False, f"Ошибка: {error}"
-    except json.JSONDecodeError as e:
-        print(f"[MOVE] JSON error: {e}", flush=True)
-    except Exception as e:
-        print(f"[MOVE] Hammerspoon error: {e}", flush=True)
 
-    return False, "Hammerspoon не доступен. Установите: brew install hammerspoon"
+def set_thumbnail_source(source: ThumbnailSource):
+    """Подменить источник миниатюр (FakeThumbnailSource для тестов/бенчмарков)"""
+    loader = get_thumbnail_loader()
+    loader.source = source
+    loader.reset()
+    return loader
 
 
 def _get_running_apps_map():
     """Получить словарь запущенных приложений: имя -> NSRunningApplication"""
     global _running_apps_cache
+    from AppKit import NSWorkspace
     workspace = NSWorkspace.sharedWorkspace()
     apps = workspace.runningApplications()
     result = {}
@@ -339,6 +112,8 @@ def get_app_icon(app_name: str, target_size: int = 16) -> QPixmap:
     if cache_key in _app_icon_cache:
         return _app_icon_cache[cache_key]
 
+    from AppKit import NSBitmapImageRep, NSPNGFileType, NSWorkspace
+
     icon = None
     workspace = NSWorkspace.sharedWorkspace()
     app_name_lower = app_name.lower()
@@ -391,46 +166,6 @@ def get_app_icon(app_name: str, target_size: int = 16) -> QPixmap:
     return pixmap
 
 
-def group_windows_by_app(windows: list) -> dict:
-    """Группировать окна по приложениям"""
-    groups = {}
-    for w in windows:
-        app = w.get("app", "Unknown") if isinstance(w, dict) else str(w)
-        if app not in groups:
-            groups[app] = []
-        groups[app].append(w)
-    return groups
-
-
-def activate_window(app_name: str, window_title: str):
-    """Активировать конкретное окно приложения"""
-    # Экранируем кавычки в названии
-    escaped_title = window_title.replace('"', '\\"').replace("'", "'\"'\"'")
-    escaped_app = app_name.replace('"', '\\"')
-
-    script = f'''
-    tell application "{escaped_app}"
-        activate
-    end tell
-    delay 0.1
-    tell application "System Events"
-        tell process "{escaped_app}"
-            set frontmost to true
-            try
-                set targetWindow to first window whose name contains "{escaped_title}"
-                perform action "AXRaise" of targetWindow
-            end try
-        end tell
-    end tell
-    '''
-
-    subprocess.Popen(
-        ["osascript", "-e", script],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL
-    )
-
-
 class DragHeader(QFrame):
     """Заголовок для перетаскивания окна"""
 
@@ -456,79 +191,6 @@ class DragHeader(QFrame):
         self.setCursor(Qt.CursorShape.OpenHandCursor)
 
 
-def get_windows_on_current_space(include_minimized: bool = False):
-    """Получить список окон на ТЕКУЩЕМ Space (опционально со свёрнутыми)"""
-    try:
-        from Quartz import kCGWindowListOptionAll
-
-        if include_minimized:
-            options = kCGWindowListOptionAll | kCGWindowListExcludeDesktopElements
-        else:
-            options = kCGWindowListOptionOnScreenOnly | kCGWindowListExcludeDesktopElements
-
-        windows = CGWindowListCopyWindowInfo(options, kCGNullWindowID)
-
-        skip_apps = {'Window Server', 'Dock', 'Control Center', 'Spotlight',
-                     'SystemUIServer', 'NotificationCenter', 'CursorUIViewService',
-                     'Notification Center', 'com.apple.WebKit', 'universalAccessAuthWarn',
-                     'TextInputMenuAgent', 'Пункт управления'}
-
-        result = []
-        for w in windows:
-            owner = w.get('kCGWindowOwnerName', '')
-            layer = w.get('kCGWindowLayer', 0)
-            title = w.get('kCGWindowName', '')
-            on_screen = w.get('kCGWindowIsOnscreen', True)
-
-            # Только обычные окна (layer=0), пропускаем системные
-            if layer == 0 and owner and owner not in skip_apps and title:
-                result.append({
-                    "app": owner,
-                    "title": title,
-                    "minimized": not on_screen
-                })
-
-        return result
-    except Exception as e:
-        print(f"Quartz error: {e}")
-        return []
-
-
-def get_spaces_count():
-    """Получить количество Spaces из системных настроек"""
-    try:
-        # Читаем plist напрямую
-        import plistlib
-        plist_path = Path.home() / "Library/Preferences/com.apple.spaces.plist"
-        if plist_path.exists():
-            with open(plist_path, 'rb') as f:
-                data = plistlib.load(f)
-                # Ищем SpacesDisplayConfiguration -> Space Properties
-                for display in data.get("SpacesDisplayConfiguration", {}).get("Management Data", {}).get("Monitors", []):
-                    spaces = display.get("Spaces", [])
-                    if spaces:
-                        return len(spaces)
-    except Exception as e:
-        print(f"plist error: {e}")
-
-    # Fallback через defaults
-    try:
-        result = subprocess.run(
-            ["defaults", "read", "com.apple.spaces"],
-            capture_output=True, text=True, timeout=2
-        )
-        if result.returncode == 0:
-            # Считаем uuid = (это маркер каждого Space)
-            count = result.stdout.count('"uuid" =')
-            if count == 0:
-                count = result.stdout.count('uuid =')
-            if count > 0:
-                return count
-    except:
-        pass
-    return 4  # По умолчанию
-
-
 def get_optimal_grid(total_spaces: int) -> tuple:
     """Подобрать оптимальный размер сетки (максимум 4x4)"""
     if total_spaces <= 2:
@@ -545,37 +207,6 @@ def get_optimal_grid(total_spaces: int) -> tuple:
         return (4, 4)  # Максимум 4x4
 
 
-def get_frontmost_app():
-    """Получить активное приложение"""
-    script = '''
-    tell application "System Events"
-        return name of first process whose frontmost is true
-    end tell
-    '''
-    try:
-        result = subprocess.run(
-            ["osascript", "-e", script],
-            capture_output=True, text=True, timeout=2
-        )
-        return result.stdout.strip()
-    except:
-        return ""
-
-
-def get_space_count():
-    """Попытаться определить количество Spaces"""
-    # Читаем из com.apple.spaces plist
-    try:
-        result = subprocess.run(
-            ["defaults", "read", "com.apple.spaces", "spans-displays"],
-            capture_output=True, text=True
-        )
-        # Это не даёт прямого числа spaces, но можно использовать как workaround
-    except:
-        pass
-    return 9  # Вернём максимум по умолчанию
-
-
 class AppItemWidget(QWidget):
     """Компактный виджет приложения с иконкой и QMenu при клике"""
 
@@ -664,6 +295,7 @@ class AppItemWidget(QWidget):
                 menu.addAction(more)
 
             menu.exec(event.globalPosition().toPoint())
+            menu.deleteLater()  # иначе меню копятся дочерними объектами до удаления виджета
         else:
             super().mousePressEvent(event)
 
@@ -671,7 +303,7 @@ class AppItemWidget(QWidget):
 class WindowItemWidget(QPushButton):
     """Виджет отдельного окна (на основе QPushButton для надёжного приёма событий мыши)"""
 
-    def __init__(self, title: str, is_active_space: bool = False, minimized: bool = False, app_name: str = "", space_num: int = 0, window_id: int = 0):
+    def __init__(self, title: str, is_active_space: bool = False, minimized: bool = False, app_name: str = "", space_num: int = 0, window_id: int = 0, generation: int = 0):
         super().__init__()
         self.app_name = app_name
         self.window_title = title
@@ -679,7 +311,10 @@ class WindowItemWidget(QPushButton):
         self.is_active = is_active_space
         self.space_num = space_num  # Текущий Space окна
         self.window_id = window_id  # AeroSpace window ID для перемещения
+        self.generation = generation  # Поколение содержимого (ключ миниатюры)
         self._drag_start_pos = None
+        self._nested = False  # Внутри своего меню или drag (вложенный цикл событий)
+        self._discarded = False
 
         self.setFixedHeight(24)
         self.setMouseTracking(True)
@@ -717,7 +352,8 @@ class WindowItemWidget(QPushButton):
         """Обработка клика - активировать окно"""
         if not self.minimized:
             print(f"[CLICK] Button clicked: {self.app_name}", flush=True)
-            activate_window(self.app_name, self.window_title)
+            window_id = self.window_id or get_window_id_by_title(self.app_name, self.window_title)
+            focus_window_by_id(window_id, self.app_name, self.window_title)
             main_window = self.window()
             if main_window:
                 QTimer.singleShot(300, main_window.hide)
@@ -760,14 +396,27 @@ class WindowItemWidget(QPushButton):
                 }}
             """)
 
+    def _space_card(self):
+        """Карточка SpaceCard, в которой находится виджет"""
+        w = self.parent()
+        while w is not None and not isinstance(w, SpaceCard):
+            w = w.parent()
+        return w
+
     def enterEvent(self, event):
         print(f"[HOVER] Enter: {self.app_name}")
         if not self.minimized:
             self._update_style(hovered=True)
+            card = self._space_card()
+            if card and self.window_id:
+                card.show_preview(self.window_id, self.generation, self.mapToGlobal(self.rect().topRight()))
         super().enterEvent(event)
 
     def leaveEvent(self, event):
         self._update_style(hovered=False)
+        card = self._space_card()
+        if card:
+            card.hide_preview()
         super().leaveEvent(event)
 
     def mousePressEvent(self, event):
@@ -829,7 +478,26 @@ class WindowItemWidget(QPushButton):
                 action = move_menu.addAction(f"Space {i}")
                 action.triggered.connect(lambda checked, target=i: self._move_to_space(target))
 
-        menu.exec(event.globalPos())
+        self._exec_nested(lambda: menu.exec(event.globalPos()))
+        menu.deleteLater()
+
+    def _exec_nested(self, run):
+        """Вложенный цикл (меню, drag): удаление строки откладывается до выхода из него"""
+        self._nested = True
+        try:
+            run()
+        finally:
+            self._nested = False
+        if self._discarded:
+            self.deleteLater()
+
+    def discard(self):
+        """Убрать строку из карточки: скрыть сразу, удалить, как только она не на стеке"""
+        self.setVisible(False)
+        self.setEnabled(False)
+        self._discarded = True
+        if not self._nested:
+            self.deleteLater()
 
     def _move_to_space(self, target_space: int):
         """Переместить окно на указанный Space"""
@@ -849,9 +517,8 @@ class WindowItemWidget(QPushButton):
                 # Мгновенное обновление UI (без полного refresh)
                 main_window = self.window()
                 if main_window and hasattr(main_window, 'space_cards'):
-                    # Скрываем себя (убираем из source карточки)
-                    self.setVisible(False)
-                    self.setEnabled(False)
+                    # Убираем себя из source карточки
+                    self.discard()
 
                     # Добавляем в target карточку
                     if target_space in main_window.space_cards:
@@ -896,13 +563,16 @@ class WindowItemWidget(QPushButton):
 
         # Меняем курсор на drag
         self.setCursor(Qt.CursorShape.ClosedHandCursor)
-        drag.exec(Qt.DropAction.MoveAction)
-        self.setCursor(Qt.CursorShape.PointingHandCursor)
+        self._exec_nested(lambda: drag.exec(Qt.DropAction.MoveAction))
+        if not self._discarded:
+            self.setCursor(Qt.CursorShape.PointingHandCursor)
 
 
 class SpaceCard(QFrame):
     """Карточка для одного Space — Apple style с иконками и анимациями"""
 
+    MAX_VISIBLE = 5  # Окон напрямую в карточке, остальные — в «Смотреть все»
+
     def __init__(self, space_num: int, name: str = "", apps: list = None, is_active: bool = False, exists: bool = True):
         super().__init__()
         self.space_num = space_num
@@ -910,13 +580,18 @@ class SpaceCard(QFrame):
         self.apps = apps or []
         self.is_active = is_active
         self.exists = exists
+        self.on_display = False  # Открыт на другом (не сфокусированном) дисплее
         self._glow_animation = None
         self._is_drop_target = False  # Для визуализации drop
+        self._preview = None  # Всплывающая миниатюра окна (создаётся лениво)
+        self._preview_key = None  # (window_id, generation) ожидаемой миниатюры
+        self._preview_anchor = None
 
         self.setFixedSize(250, 190)
         if exists:
             self.setCursor(Qt.CursorShape.PointingHandCursor)
             self.setAcceptDrops(True)  # Принимаем drop
+            get_thumbnail_loader().ready.connect(self._on_thumbnail_ready)
         self.init_ui()
         self.update_style()
 
@@ -996,6 +671,16 @@ class SpaceCard(QFrame):
                 QLabel { color: #ffffff; background: transparent; }
             """)
             self._start_glow()
+        elif self.on_display:
+            self.setStyleSheet("""
+                SpaceCard {
+                    background-color: rgba(58, 58, 60, 0.6);
+                    border: 1px solid rgba(10, 132, 255, 0.7);
+                    border-radius: 12px;
+                }
+                QLabel { color: #ffffff; background: transparent; }
+            """)
+            self._stop_glow()
         else:
             self.setStyleSheet("""
                 SpaceCard {
@@ -1032,6 +717,11 @@ class SpaceCard(QFrame):
         self.is_active = active
         self.update_style()
 
+    def set_on_display(self, on_display: bool):
+        if on_display != self.on_display:
+            self.on_display = on_display
+            self.update_style()
+
     def set_name(self, name: str):
         self.space_name = name
         self.name_label.setText(name if name else "")
@@ -1084,6 +774,10 @@ class SpaceCard(QFrame):
         super().dragLeaveEvent(event)
 
     def dropEvent(self, event):
+        with trace.span("ui", "drop", space=self.space_num):
+            self._drop(event)
+
+    def _drop(self, event):
         """Обрабатываем drop — перемещаем окно"""
         print(f"[DROP] dropEvent triggered on Space {self.space_num}")
         self._is_drop_target = False
@@ -1146,6 +840,56 @@ class SpaceCard(QFrame):
             print(f"Drop error: {e}")
             event.ignore()
 
+    # === Миниатюры окон ===
+
+    def show_preview(self, window_id: int, generation: int, anchor):
+        """Показать миниатюру окна рядом с карточкой (anchor — глобальная точка строки)"""
+        self._preview_key = (window_id, generation)
+        self._preview_anchor = anchor
+        image = get_thumbnail_loader().request(window_id, generation)
+        if image is not None:
+            self._show_preview_image(image)
+        # Иначе покажем, когда придёт сигнал ready
+
+    def hide_preview(self):
+        self._preview_key = None
+        if self._preview is not None:
+            self._preview.hide()
+
+    def _on_thumbnail_ready(self, window_id: int, generation: int):
+        if self._preview_key != (window_id, generation):
+            return
+        image = get_thumbnail_loader().get(window_id, generation)
+        if image is not None:
+            self._show_preview_image(image)
+
+    def _show_preview_image(self, image):
+        if self._preview is None:
+            self._preview = QLabel(self, Qt.WindowType.ToolTip | Qt.WindowType.FramelessWindowHint)
+            self._preview.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+            self._preview.setStyleSheet("background: rgba(28, 28, 30, 0.95); border-radius: 6px; padding: 4px;")
+        self._preview.setPixmap(QPixmap.fromImage(image))
+        self._preview.adjustSize()
+
+        # Справа от карточки, а если не влезает — слева
+        card_right = self.mapToGlobal(self.rect().topRight()).x()
+        x = card_right + 8
+        y = self._preview_anchor.y() - self._preview.height() // 2
+        screen = self.screen().availableGeometry() if self.screen() else None
+        if screen is not None:
+            if x + self._preview.width() > screen.right():
+                x = self.mapToGlobal(self.rect().topLeft()).x() - self._preview.width() - 8
+            y = max(screen.top(), min(y, screen.bottom() - self._preview.height()))
+        self._preview.move(x, y)
+        self._preview.show()
+
+    def _prefetch_thumbnails(self, windows: list):
+        """Заранее запросить миниатюры видимых окон, чтобы hover был мгновенным"""
+        loader = get_thumbnail_loader()
+        for w in windows:
+            if isinstance(w, dict) and w.get("window_id") and not w.get("minimized", False):
+                loader.request(w["window_id"], w.get("gen", 0))
+
     def _update_drop_style(self):
         """Стиль при наведении drag"""
         if self._is_drop_target:
@@ -1178,16 +922,25 @@ class SpaceCard(QFrame):
                 widget = item.widget()
                 if hasattr(widget, 'app_name') and hasattr(widget, 'window_title'):
                     if widget.app_name == app_name and widget.window_title.startswith(window_title[:20]):
-                        # Только скрываем — удаление при полном refresh
-                        widget.setVisible(False)
-                        widget.setEnabled(False)
+                        # Источник drop ещё внутри drag.exec — удалится после него
+                        widget.discard()
                         break
 
     def _add_window_to_card(self, app_name: str, window_title: str, window_id: int):
         """Добавить окно в эту карточку (мгновенно)"""
         win_widget = WindowItemWidget(window_title, self.is_active, False, app_name, self.space_num, window_id)
-        # Вставляем в начало
+        rows = []
+        for i in range(self.apps_layout.count()):
+            widget = self.apps_layout.itemAt(i).widget()
+            if isinstance(widget, WindowItemWidget):
+                if not widget._discarded:
+                    rows.append(widget)
+            elif isinstance(widget, QLabel):
+                widget.deleteLater()  # "Empty"
+        # Вставляем в начало; строк не больше, чем показывает set_apps
         self.apps_layout.insertWidget(0, win_widget)
+        for widget in rows[self.MAX_VISIBLE - 1:]:
+            widget.discard()
 
     def set_apps(self, windows: list):
         """Установить список окон - каждое окно отдельной строкой с иконкой"""
@@ -1207,7 +960,9 @@ class SpaceCard(QFrame):
             self.apps_layout.addWidget(empty_label)
             return
 
-        max_visible = 5  # Показываем до 5 окон напрямую
+        max_visible = self.MAX_VISIBLE
+        if self.exists:
+            self._prefetch_thumbnails(windows[:max_visible])
 
         # Показываем первые окна
         for i, w in enumerate(windows[:max_visible]):
@@ -1215,8 +970,9 @@ class SpaceCard(QFrame):
             title = w.get("title", "") if isinstance(w, dict) else str(w)
             minimized = w.get("minimized", False) if isinstance(w, dict) else False
             window_id = w.get("window_id", 0) if isinstance(w, dict) else 0
+            generation = w.get("gen", 0) if isinstance(w, dict) else 0
             if title:
-                win_widget = WindowItemWidget(title, self.is_active, minimized, app_name, self.space_num, window_id)
+                win_widget = WindowItemWidget(title, self.is_active, minimized, app_name, self.space_num, window_id, generation)
                 self.apps_layout.addWidget(win_widget)
                 print(f"[WIDGET] Created WindowItemWidget: {app_name} - {title[:30]}, space={self.space_num}, wid={window_id}", flush=True)
 
@@ -1278,16 +1034,18 @@ class SpaceCard(QFrame):
                     action.setEnabled(False)
                 else:
                     # Подключаем активацию окна при клике
+                    window_id = w.get("window_id", 0) if isinstance(w, dict) else 0
                     action.triggered.connect(
-                        lambda checked, a=app_name, t=title: self._activate_and_hide(a, t)
+                        lambda checked, a=app_name, t=title, wid=window_id: self._activate_and_hide(a, t, wid)
                     )
                 menu.addAction(action)
 
         menu.exec(button.mapToGlobal(button.rect().bottomLeft()))
+        menu.deleteLater()
 
-    def _activate_and_hide(self, app_name: str, title: str):
+    def _activate_and_hide(self, app_name: str, title: str, window_id: int = 0):
         """Активировать окно и скрыть Space Manager"""
-        activate_window(app_name, title)
+        focus_window_by_id(window_id or get_window_id_by_title(app_name, title), app_name, title)
         main_window = self.window()
         if main_window:
             QTimer.singleShot(300, main_window.hide)
@@ -1311,7 +1069,7 @@ class SpaceCard(QFrame):
             while w:
                 print(f"[SPACECARD] checking parent: {w.__class__.__name__}", flush=True)
                 if isinstance(w, WindowItemWidget):
-                    print(f"[SPACECARD] Found WindowItemWidget! Ignoring this event.", flush=True)
+                    print("[SPACECARD] Found WindowItemWidget! Ignoring this event.", flush=True)
                     # Игнорируем событие - дочерний виджет его обработает
                     event.ignore()
                     return
@@ -1494,6 +1252,118 @@ class RenameDialog(QDialog):
         self.name_edit.returnPressed.connect(self.accept)
 
 
+class CommandPalette(QFrame):
+    """Палитра поиска окон по всем Spaces — ввод с клавиатуры, Enter активирует"""
+
+    MAX_RESULTS = 12
+
+    activated = pyqtSignal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("commandPalette")
+        self.setFixedWidth(520)
+        self.setStyleSheet("""
+            QFrame#commandPalette {
+                background-color: rgba(44, 44, 46, 0.98);
+                border: 0.5px solid rgba(255, 255, 255, 0.15);
+                border-radius: 10px;
+            }
+            QLineEdit {
+                background: transparent;
+                color: #ffffff;
+                border: none;
+                padding: 8px 10px;
+                font-family: ".AppleSystemUIFont";
+                font-size: 15px;
+            }
+            QListWidget {
+                background: transparent;
+                color: #e5e5e7;
+                border: none;
+                outline: none;
+                font-family: ".AppleSystemUIFont";
+                font-size: 12px;
+            }
+            QListWidget::item {
+                padding: 5px 8px;
+                border-radius: 4px;
+            }
+            QListWidget::item:selected {
+                background-color: rgba(10, 132, 255, 0.8);
+                color: #ffffff;
+            }
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(6, 6, 6, 6)
+        layout.setSpacing(4)
+
+        self.input = QLineEdit()
+        self.input.setPlaceholderText("Поиск окна по всем Spaces...")
+        self.input.textChanged.connect(self._on_text_changed)
+        self.input.installEventFilter(self)
+        layout.addWidget(self.input)
+
+        self.results = QListWidget()
+        self.results.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.results.itemClicked.connect(lambda item: self._activate_row(self.results.row(item)))
+        layout.addWidget(self.results)
+
+        self._matches = []
+        self.hide()
+
+    def open(self, text: str = ""):
+        self.input.setText(text)
+        self._on_text_changed(text)  # даже если текст не изменился
+        self.show()
+        self.raise_()
+        self.input.setFocus()
+        self.input.end(False)
+
+    def close_palette(self):
+        self.hide()
+        self.input.blockSignals(True)
+        self.input.clear()
+        self.input.blockSignals(False)
+
+    def _on_text_changed(self, text: str):
+        self._matches = get_search_index().search(text, limit=self.MAX_RESULTS)
+        self.results.clear()
+        for w in self._matches:
+            title = w["title"] or "(без названия)"
+            title = title[:60] + "..." if len(title) > 60 else title
+            self.results.addItem(QListWidgetItem(f"{w['app']}: {title}    · Space {w['space']}"))
+        if self._matches:
+            self.results.setCurrentRow(0)
+        rows = max(1, min(len(self._matches), 8))
+        self.results.setFixedHeight(rows * 26 + 4)
+        self.results.setVisible(bool(self._matches))
+        self.adjustSize()
+
+    def _activate_row(self, row: int):
+        if 0 <= row < len(self._matches):
+            self.activated.emit(self._matches[row])
+
+    def eventFilter(self, obj, event):
+        from PyQt6.QtCore import QEvent
+        if obj is self.input and event.type() == QEvent.Type.KeyPress:
+            key = event.key()
+            if key in (Qt.Key.Key_Down, Qt.Key.Key_Up):
+                step = 1 if key == Qt.Key.Key_Down else -1
+                count = self.results.count()
+                if count:
+                    self.results.setCurrentRow((self.results.currentRow() + step) % count)
+                return True
+            if key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+                self._activate_row(self.results.currentRow())
+                return True
+            if key == Qt.Key.Key_Escape:
+                self.close_palette()
+                return True
+        return super().eventFilter(obj, event)
+
+
 class SpaceManager(QMainWindow):
     """Главное окно Space Manager v2"""
 
@@ -1520,7 +1390,14 @@ class SpaceManager(QMainWindow):
             "active_space": 1,
             "show_apps": True
         }
+        # Настройки и горячее состояние хранятся раздельно; запись — в фоне
+        self._settings_writer = WriteBehindWriter(SETTINGS_PATH)
+        self.state = StateLog(STATE_PATH)
+        # Названия Spaces — общие с Hammerspoon и SketchyBar
+        self.names = SpaceNameStore(NAMES_PATH)
+        self.names.listeners.append(self._on_names_changed)
         self.load_config()
+        self.sync_space_identity()
 
         # Обновить если изменилось количество Spaces
         if self.config["total_spaces"] != detected_spaces:
@@ -1529,9 +1406,28 @@ class SpaceManager(QMainWindow):
             self.save_config()
 
         self.space_cards = {}
+        self.hotkeys = None  # HotkeyEngine (создаётся в main вместе со слушателем)
+        self.startup = None  # StartupTimeline (main): разбивка старта по дорожкам
+        self.first_painted = False
+        self._display_headers = []
+        self._scan = None  # ScanThread текущего сканирования Spaces
+        self._hidden_for_scan = False
+        self._scan_signals = ScanSignals()
+        self._scan_signals.progress.connect(self._on_scan_progress)
+        self._scan_signals.space.connect(self._on_scan_space)
+        self._scan_signals.switching.connect(self._on_scan_switching)
+        self._scan_signals.finished.connect(self._on_scan_finished)
+        self.tray_icon = None
+        self._tray_menu = None
+        self._census = None  # space_core.census.Census (создаётся при первой переписи)
+        self.layouts = layouts.LayoutStore()
+        self._layout_signals = LayoutSignals()
+        self._layout_signals.applied.connect(self._on_layout_applied)
         self.init_ui()
         self.setup_shortcuts()
         self.setup_tray()
+        self.setup_names_watcher()
+        self.setup_topology_watcher()
 
         # Таймер отключён - AppleScript тормозит
         # self.update_timer = QTimer()
@@ -1539,18 +1435,171 @@ class SpaceManager(QMainWindow):
         # self.update_timer.start(3000)
 
     def load_config(self):
-        if CONFIG_PATH.exists():
+        """Прочитать настройки и журнал состояния (значения журнала — лениво)"""
+        self.state.load()
+        legacy_names = {}
+        if SETTINGS_PATH.exists():
+            saved = self._read_json(SETTINGS_PATH)
+            if saved:
+                self.config.update({k: v for k, v in saved.items() if k in SETTINGS_KEYS})
+                legacy_names = saved.get("space_names", {})
+        elif CONFIG_PATH.exists():
+            legacy_names = self._migrate_legacy_config()
+        self.config["active_space"] = self.state.get("active_space", self.config["active_space"])
+
+        if self.names.exists():
+            self.names.load()
+        else:
+            # Первый запуск с общим хранилищем: собрать названия из старых файлов
+            self.names.seed(*(read_names_file(p) for p in LEGACY_NAME_FILES), legacy_names)
+        self.config["space_names"] = self.names.all()
+
+    def _read_json(self, path: Path) -> dict:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            # Не затираем битый файл молча — откладываем в сторону для разбора
+            broken = path.with_suffix(path.suffix + '.corrupt')
+            print(f"[CONFIG] Cannot read {path}: {e}; moved to {broken.name}", flush=True)
             try:
-                with open(CONFIG_PATH, 'r') as f:
-                    saved = json.load(f)
-                    self.config.update(saved)
-            except:
+                path.replace(broken)
+            except OSError:
                 pass
+            return {}
+
+    def _migrate_legacy_config(self):
+        """Разложить старый config.json на settings.json и журнал состояния"""
+        legacy = self._read_json(CONFIG_PATH)
+        if not legacy:
+            return {}
+        print(f"[CONFIG] Migrating {CONFIG_PATH.name} -> {SETTINGS_PATH.name} + {STATE_PATH.name}", flush=True)
+        self.config.update({k: v for k, v in legacy.items() if k in SETTINGS_KEYS})
+        if "active_space" in legacy:
+            self.state.set("active_space", legacy["active_space"])
+        for num, windows in legacy.get("space_windows", {}).items():
+            self.state.set(f"space_windows/{num}", windows)
+        if "minimized_windows" in legacy:
+            self.state.set("minimized_windows", legacy["minimized_windows"])
+        self.save_config()
+        return legacy.get("space_names", {})
 
     def save_config(self):
-        CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-        with open(CONFIG_PATH, 'w') as f:
-            json.dump(self.config, f, indent=2, ensure_ascii=False)
+        """Запланировать запись настроек (без дискового I/O в GUI-потоке)"""
+        self._settings_writer.schedule({k: self.config[k] for k in SETTINGS_KEYS if k in self.config})
+
+    def _windows_state_key(self, space_num: int) -> str:
+        # По стабильному ключу Space, а без plist (не macOS) — по позиции
+        return f"space_windows/{get_space_identity().key(space_num) or space_num}"
+
+    def saved_windows(self, space_num: int) -> list:
+        """Последний сохранённый снимок окон Space (из журнала состояния)"""
+        return self.state.get(self._windows_state_key(space_num), [])
+
+    def store_windows(self, space_num: int, windows: list):
+        """Сохранить снимок окон Space (дозапись одной строки, если изменился)"""
+        self.state.set(self._windows_state_key(space_num), windows)
+
+    def sync_space_identity(self) -> bool:
+        """
+        Сверить раскладку Spaces с прошлой (space_order в журнале) и перенести
+        данные, привязанные к позициям; True — если раскладка изменилась.
+        """
+        keys = get_space_identity().keys()
+        if not keys:
+            return False  # plist недоступен — остаёмся на позициях
+        old_keys = self.state.get("space_order")
+        if old_keys == keys:
+            return False
+        if old_keys is None:
+            # Первый запуск с ключами: снимки окон по позициям -> по ключам
+            for num, key in enumerate(keys, 1):
+                legacy = f"space_windows/{num}"
+                if legacy in self.state:
+                    self.state.set(f"space_windows/{key}", self.state.get(legacy, []))
+                    self.state.delete(legacy)
+        else:
+            # Названия читают Hammerspoon и SketchyBar по позиции — переносим их
+            moves = plan_index_migration(old_keys, keys)
+            renamed = self.names.remap(moves, known=len(old_keys))
+            active = self.config["active_space"]
+            if moves.get(active, active) != active:
+                self.set_active_space(moves[active])
+            moved = reindex_windows_cache()
+            print(f"[SPACES] Layout changed: {len(old_keys)} -> {len(keys)} spaces, "
+                  f"names moved: {len(renamed)}, cached windows moved: {moved}", flush=True)
+        self.state.set("space_order", keys)
+        return True
+
+    def setup_topology_watcher(self):
+        """Следить за com.apple.spaces.plist: перестановка/добавление Spaces"""
+        self._topology_watcher = QFileSystemWatcher(self)
+        self._topology_watcher.fileChanged.connect(self._check_topology)
+        if get_space_topology().path.exists():
+            self._topology_watcher.addPath(str(get_space_topology().path))
+
+    def _check_topology(self, *args):
+        # cfprefsd заменяет plist атомарно — вернуть файл под наблюдение
+        path = str(get_space_topology().path)
+        if get_space_topology().path.exists() and path not in self._topology_watcher.files():
+            self._topology_watcher.addPath(path)
+        if not self.sync_space_identity():
+            return
+        count = len(get_space_identity().keys())
+        if count != self.config["total_spaces"]:
+            self.config["total_spaces"] = count
+            self.config["rows"], self.config["cols"] = get_optimal_grid(count)
+            self.save_config()
+        self.rebuild_grid()
+        if get_snapshot().windows:
+            self.refresh_apps_from_cache()
+        self.setup_tray()
+
+    def set_active_space(self, space_num: int):
+        self.config["active_space"] = space_num
+        self.state.set("active_space", space_num)
+
+    def setup_names_watcher(self):
+        """Следить за общим файлом названий (inotify/FSEvents, иначе — опрос)"""
+        self._names_watcher = QFileSystemWatcher(self)
+        self._names_watcher.directoryChanged.connect(self._check_names)
+        self._names_watcher.fileChanged.connect(self._check_names)
+        try:
+            self.names.path.parent.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            pass
+        watching = self._names_watcher.addPath(str(self.names.path.parent))
+        if self.names.exists():
+            self._names_watcher.addPath(str(self.names.path))
+        if not watching:
+            # Fallback: один stat() раз в 2 секунды, файл читается только при изменении
+            self._names_poll = QTimer(self)
+            self._names_poll.timeout.connect(self._check_names)
+            self._names_poll.start(2000)
+
+    def _check_names(self, *args):
+        self.names.reload_if_changed()
+        # Атомарная замена файла снимает его с наблюдения — вернуть
+        path = str(self.names.path)
+        if self.names.exists() and path not in self._names_watcher.files():
+            self._names_watcher.addPath(path)
+
+    def _on_names_changed(self, changed: dict, external: bool):
+        """Названия изменились (здесь или в Hammerspoon/SketchyBar) — обновить UI"""
+        if external:
+            print(f"[NAMES] Reloaded from {self.names.path.name}: {changed}", flush=True)
+        self.config["space_names"] = self.names.all()
+        if not self.space_cards:
+            return  # ещё в __init__, UI не построен
+        for key, name in changed.items():
+            if key.isdigit() and int(key) in self.space_cards:
+                self.space_cards[int(key)].set_name(name)
+        self.setup_tray()  # Обновить меню трея
+
+    def flush_config(self):
+        """Дописать отложенные изменения настроек и состояния (при выходе)"""
+        self._settings_writer.close()
+        self.state.close()
 
     def init_ui(self):
         # Главный контейнер — Apple vibrancy style
@@ -1643,10 +1692,11 @@ class SpaceManager(QMainWindow):
         refresh_btn.setStyleSheet(btn_style)
         controls.addWidget(refresh_btn)
 
-        scan_btn = QPushButton("Scan All")
-        scan_btn.clicked.connect(self.scan_all_spaces)
-        scan_btn.setStyleSheet(btn_style)
-        controls.addWidget(scan_btn)
+        self.scan_btn = QPushButton("Scan All")
+        self.scan_btn.setToolTip("Собрать окна всех Spaces (повторное нажатие — отмена)")
+        self.scan_btn.clicked.connect(self.scan_all_spaces)
+        self.scan_btn.setStyleSheet(btn_style)
+        controls.addWidget(self.scan_btn)
 
         # Кнопка для свёрнутых окон
         self.minimized_btn = QPushButton("📥")
@@ -1664,44 +1714,81 @@ class SpaceManager(QMainWindow):
 
         main_layout.addLayout(controls)
 
+        # Палитра поиска поверх сетки (открывается вводом текста)
+        self.palette = CommandPalette(container)
+        self.palette.activated.connect(self._activate_from_palette)
+
         self.adjustSize()
         self.center_on_screen()
 
     def rebuild_grid(self):
-        # Удалить старые карточки
+        # Удалить старые карточки и заголовки дисплеев
         for card in self.space_cards.values():
             card.deleteLater()
         self.space_cards.clear()
+        for header in self._display_headers:
+            header.deleteLater()
+        self._display_headers = []
+
+        sections = get_display_sections()
+        if sections:
+            self._build_display_sections(sections)
+        else:
+            self._build_single_grid()
+        self.apply_display_focus()
+        self.adjustSize()
+
+    def _make_card(self, space_num: int, exists: bool) -> "SpaceCard":
+        name = self.config["space_names"].get(str(space_num), "")
+        is_active = (space_num == self.config["active_space"]) if exists else False
 
+        # Загрузить сохранённые окна из конфига
+        saved_windows = self.saved_windows(space_num) if exists else []
+
+        card = SpaceCard(space_num, name, [], is_active, exists=exists)
+        if exists:
+            card.set_apps(saved_windows)  # Показать сохранённые окна сразу
+        else:
+            card.name_label.setText("")  # Пустой для несуществующих
+        self.space_cards[space_num] = card
+        return card
+
+    def _build_single_grid(self):
+        """Один дисплей: сетка rows x cols, лишние ячейки — пустые карточки"""
         rows = self.config["rows"]
         cols = self.config["cols"]
         total = self.config["total_spaces"]
-        active = self.config["active_space"]
-        names = self.config["space_names"]
 
         space_num = 1
-        grid_size = rows * cols  # Всего ячеек в сетке
-
         for row in range(rows):
             for col in range(cols):
                 exists = space_num <= total  # Существует ли этот Space
-                name = names.get(str(space_num), "")
-                is_active = (space_num == active) if exists else False
-
-                # Загрузить сохранённые окна из конфига
-                saved_windows = self.config.get("space_windows", {}).get(str(space_num), []) if exists else []
-
-                card = SpaceCard(space_num, name, [], is_active, exists=exists)
-                if exists:
-                    card.set_apps(saved_windows)  # Показать сохранённые окна сразу
-                else:
-                    card.name_label.setText("")  # Пустой для несуществующих
-
-                self.grid_layout.addWidget(card, row, col)
-                self.space_cards[space_num] = card
+                self.grid_layout.addWidget(self._make_card(space_num, exists), row, col)
                 space_num += 1
 
-        self.adjustSize()
+    def _build_display_sections(self, sections: list):
+        """Несколько дисплеев: секция с заголовком на каждый монитор"""
+        cols = self.config["cols"]
+        row = 0
+        for number, (display_id, indices) in enumerate(sections, 1):
+            # Порядок секций — как мониторы в plist: основной дисплей (в plist — "Main")
+            # не обязательно первый
+            header = QLabel(f"Дисплей {number}" + (" — основной" if display_id == "Main" else ""))
+            header.setFont(QFont(".AppleSystemUIFont", 11, QFont.Weight.Medium))
+            header.setStyleSheet("color: #98989d; background: transparent;")
+            header.setToolTip(str(display_id))
+            self.grid_layout.addWidget(header, row, 0, 1, cols)
+            self._display_headers.append(header)
+            row += 1
+            for i, space_num in enumerate(indices):
+                self.grid_layout.addWidget(self._make_card(space_num, True), row + i // cols, i % cols)
+            row += (len(indices) + cols - 1) // cols
+
+    def apply_display_focus(self):
+        """Подсветить Spaces, открытые сейчас на остальных дисплеях"""
+        visible = set(get_display_focus().values())
+        for num, card in self.space_cards.items():
+            card.set_on_display(card.exists and num in visible)
 
     def center_on_screen(self):
         screen = QApplication.primaryScreen().geometry()
@@ -1711,9 +1798,14 @@ class SpaceManager(QMainWindow):
         )
 
     def setup_shortcuts(self):
-        # Escape для скрытия
+        # Escape: закрыть палитру поиска, иначе скрыть окно
         esc_shortcut = QShortcut(QKeySequence("Escape"), self)
-        esc_shortcut.activated.connect(self.hide)
+        esc_shortcut.activated.connect(self._on_escape)
+
+        # Ctrl+F и / — поиск окна по всем Spaces
+        for seq in ("Ctrl+F", "/"):
+            search_shortcut = QShortcut(QKeySequence(seq), self)
+            search_shortcut.activated.connect(lambda: self.open_palette())
 
         # Ctrl+Q для выхода
         quit_shortcut = QShortcut(QKeySequence("Ctrl+Q"), self)
@@ -1724,13 +1816,48 @@ class SpaceManager(QMainWindow):
             shortcut = QShortcut(QKeySequence(str(i)), self)
             shortcut.activated.connect(lambda n=i: self.switch_to_space(n))
 
+    def _on_escape(self):
+        if self.palette.isVisible():
+            self.palette.close_palette()
+        else:
+            self.hide()
+
+    def open_palette(self, text: str = ""):
+        container = self.centralWidget()
+        self.palette.open(text)
+        self.palette.move((container.width() - self.palette.width()) // 2, 52)
+
+    def _activate_from_palette(self, window: dict):
+        print(f"[PALETTE] Activate {window['app']} (ID={window['window_id']})", flush=True)
+        self.palette.close_palette()
+        focus_window_by_id(window["window_id"], window["app"], window["title"])
+        QTimer.singleShot(300, self.hide)
+
+    def keyPressEvent(self, event):
+        """Печать текста в оверлее открывает палитру поиска"""
+        text = event.text()
+        modifiers = event.modifiers() & (Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.MetaModifier)
+        if (not self.palette.isVisible() and not modifiers and text
+                and text.isprintable() and text.strip() and not text.isdigit()):
+            self.open_palette(text)
+            return
+        super().keyPressEvent(event)
+
+    def hideEvent(self, event):
+        self.palette.close_palette()
+        super().hideEvent(event)
+
     def setup_tray(self):
-        self.tray_icon = QSystemTrayIcon(self)
-        self.tray_icon.setToolTip("Space Manager - Ctrl+` для открытия")
+        """Значок трея создаётся один раз; при смене названий и настроек пересобирается меню"""
+        if self.tray_icon is None:
+            self.tray_icon = QSystemTrayIcon(self)
+            self.tray_icon.setToolTip("Space Manager - Ctrl+` для открытия")
+            self.tray_icon.activated.connect(self.tray_activated)
 
+        # Действия — дети меню: удаляются вместе со старым меню
         tray_menu = QMenu()
 
-        show_action = QAction("🖥️ Показать", self)
+        show_action = QAction("🖥️ Показать", tray_menu)
         show_action.triggered.connect(self.show_and_raise)
         tray_menu.addAction(show_action)
 
@@ -1739,24 +1866,203 @@ class SpaceManager(QMainWindow):
         # Быстрое переключение на Spaces из трея
         for i in range(1, min(10, self.config["total_spaces"] + 1)):
             name = self.config["space_names"].get(str(i), f"Desktop {i}")
-            action = QAction(f"{i}: {name}", self)
+            action = QAction(f"{i}: {name}", tray_menu)
             action.triggered.connect(lambda checked, n=i: self.switch_to_space(n))
             tray_menu.addAction(action)
 
         tray_menu.addSeparator()
 
-        quit_action = QAction("Выход", self)
+        latency_action = QAction("⏱ Задержки действий", tray_menu)
+        latency_action.triggered.connect(self.show_latency)
+        tray_menu.addAction(latency_action)
+
+        metrics_action = QAction("📊 Метрики", tray_menu)
+        metrics_action.triggered.connect(self.show_metrics)
+        tray_menu.addAction(metrics_action)
+
+        trace_action = QAction("🔴 Трассировка", tray_menu)
+        trace_action.setCheckable(True)
+        trace_action.setChecked(trace.TRACER.enabled)
+        trace_action.toggled.connect(self.toggle_trace)
+        tray_menu.addAction(trace_action)
+
+        layouts_menu = tray_menu.addMenu("🗂 Раскладки")
+        for name in self._layout_names():
+            action = QAction(f"Применить: {name}", layouts_menu)
+            action.triggered.connect(lambda checked, n=name: self.apply_layout(n))
+            layouts_menu.addAction(action)
+        layouts_menu.addSeparator()
+        save_layout_action = QAction("💾 Сохранить текущую…", layouts_menu)
+        save_layout_action.triggered.connect(self.save_layout)
+        layouts_menu.addAction(save_layout_action)
+
+        census_action = QAction("🧮 Перепись ресурсов", tray_menu)
+        census_action.triggered.connect(self.dump_census)
+        tray_menu.addAction(census_action)
+
+        quit_action = QAction("Выход", tray_menu)
         quit_action.triggered.connect(QApplication.quit)
         tray_menu.addAction(quit_action)
 
+        old_menu = self.tray_icon.contextMenu()
         self.tray_icon.setContextMenu(tray_menu)
-        self.tray_icon.activated.connect(self.tray_activated)
+        self._tray_menu = tray_menu  # QMenu без родителя — держим ссылку сами
+        if old_menu is not None:
+            old_menu.deleteLater()
         self.tray_icon.show()
 
+    def show_latency(self):
+        """Задержки активации/переключения по путям (канал, hs -c, AppleScript)"""
+        summary = get_latency_log().summary()
+        lines = [f"{path}: p50 {s['p50_ms']} мс, p99 {s['p99_ms']} мс (n={s['count']})"
+                 for path, s in sorted(summary.items())]
+        for line in lines:
+            print(f"[LATENCY] {line}", flush=True)
+        self.tray_icon.showMessage("Задержки действий", "\n".join(lines) or "Пока нет замеров",
+                                   QSystemTrayIcon.MessageIcon.Information, 5000)
+
+    def show_metrics(self):
+        """Сводка метрик в трее; полный дамп — metrics.json и metrics.prom в CONFIG_DIR"""
+        if not metrics.REGISTRY.enabled:
+            self.tray_icon.showMessage("Метрики", "Выключены (SPACE_MANAGER_METRICS=0)",
+                                       QSystemTrayIcon.MessageIcon.Information, 5000)
+            return
+        lines = metrics.REGISTRY.summary_lines()
+        for line in lines:
+            print(f"[METRICS] {line}", flush=True)
+        try:
+            metrics.REGISTRY.dump_json(METRICS_JSON_PATH)
+            metrics.REGISTRY.write_prometheus(METRICS_PROM_PATH)
+            print(f"[METRICS] Saved {METRICS_JSON_PATH}, {METRICS_PROM_PATH}", flush=True)
+        except OSError as e:
+            print(f"[METRICS] Export error: {e}", flush=True)
+        self.tray_icon.showMessage("Метрики", "\n".join(lines[:8]) or "Пока нет замеров",
+                                   QSystemTrayIcon.MessageIcon.Information, 5000)
+
+    def toggle_trace(self, enabled: bool):
+        """Включить трассировку; при выключении сохранить буфер в CONFIG_DIR/trace-*.json (Perfetto)"""
+        if enabled:
+            trace.TRACER.clear()
+            trace.TRACER.enable()
+            print("[TRACE] Enabled", flush=True)
+            return
+        trace.TRACER.disable()
+        path = CONFIG_DIR / time.strftime("trace-%Y%m%d-%H%M%S.json")
+        try:
+            trace.TRACER.write(path)
+        except OSError as e:
+            print(f"[TRACE] Save error: {e}", flush=True)
+            return
+        print(f"[TRACE] {len(trace.TRACER)} spans saved to {path} (dropped {trace.TRACER.dropped})", flush=True)
+        self.tray_icon.showMessage("Трассировка", f"Сохранено: {path}\nОткрыть: ui.perfetto.dev",
+                                   QSystemTrayIcon.MessageIcon.Information, 5000)
+
+    def _layout_names(self) -> list:
+        try:
+            return sorted(self.layouts.load())
+        except (OSError, ValueError) as e:
+            print(f"[LAYOUT] Load error: {e}", flush=True)
+            return []
+
+    def save_layout(self):
+        """Сохранить текущую раскладку окон по Spaces под именем (space_core.layouts)"""
+        name, ok = QInputDialog.getText(self, "Сохранить раскладку", "Название:")
+        name = name.strip()
+        if not ok or not name:
+            return
+        preset = layouts.capture(name, iter_windows(get_snapshot()))
+        try:
+            self.layouts.save(preset)
+        except (OSError, ValueError) as e:
+            print(f"[LAYOUT] Save error: {e}", flush=True)
+            return
+        print(f"[LAYOUT] Saved {name!r}: {len(preset.rules)} rules, spaces {preset.spaces()}", flush=True)
+        self.setup_tray()  # новый пункт в «Раскладки»
+        self.tray_icon.showMessage("Раскладка сохранена", f"{name}: {len(preset.rules)} правил",
+                                   QSystemTrayIcon.MessageIcon.Information, 3000)
+
+    def apply_layout(self, name: str):
+        """Перенести окна по раскладке: план по кэшу, переносы одним пакетом в фоне"""
+        try:
+            preset = self.layouts.get(name)
+        except KeyError as e:
+            print(f"[LAYOUT] {e.args[0]}", flush=True)
+            return
+        except (OSError, ValueError) as e:
+            print(f"[LAYOUT] Load error: {e}", flush=True)
+            return
+        snapshot = get_snapshot()
+        layout = layouts.plan(preset, iter_windows(snapshot), snapshot.spaces_count)
+        print(f"[LAYOUT] {layout.summary()}", flush=True)
+        if not layout.moves:
+            self.tray_icon.showMessage("Раскладка", f"{name}: все окна на месте",
+                                       QSystemTrayIcon.MessageIcon.Information, 3000)
+            return
+        future = submit_window_moves(layout.batch())
+        future.add_done_callback(lambda f: self._layout_signals.applied.emit(name, f))
+
+    def _on_layout_applied(self, name: str, future):
+        try:
+            results = future.result()
+        except Exception as e:
+            print(f"[LAYOUT] Apply error: {e}", flush=True)
+            return
+        moved = sum(1 for ok, _ in results.values() if ok)
+        print(f"[LAYOUT] {name}: {moved}/{len(results)} windows moved", flush=True)
+        self.refresh_apps_from_cache()
+        self.tray_icon.showMessage("Раскладка", f"{name}: перенесено {moved} из {len(results)}",
+                                   QSystemTrayIcon.MessageIcon.Information, 3000)
+
+    def dump_census(self):
+        """Виджеты, QObject и память сейчас и с прошлой переписи -> CONFIG_DIR/census-*.json"""
+        if self._census is None:
+            self._census = census.Census(roots=[self, QApplication.instance()], sources={
+                "icon_cache_bytes": icon_cache_bytes,
+                "thumbnail_cache_bytes": lambda: get_thumbnail_loader().cache.total_bytes,
+            })
+        path = CONFIG_DIR / time.strftime("census-%Y%m%d-%H%M%S.json")
+        try:
+            report = self._census.dump(path)
+        except OSError as e:
+            print(f"[CENSUS] Save error: {e}", flush=True)
+            return
+        counts = report["counts"]
+        widgets = sum(v for k, v in counts.items() if k.startswith("widgets/"))
+        lines = census.format_changes(report["changes"]) or [f"{widgets} виджетов (первая перепись)"]
+        for line in lines + report["growth"]:
+            print(f"[CENSUS] {line}", flush=True)
+        print(f"[CENSUS] Saved {path}", flush=True)
+        self.tray_icon.showMessage("Перепись ресурсов", "\n".join(lines[:8]),
+                                   QSystemTrayIcon.MessageIcon.Information, 5000)
+
     def tray_activated(self, reason):
         if reason == QSystemTrayIcon.ActivationReason.Trigger:
             self.show_and_raise()
 
+    def handle_hotkey(self, action: str, arg: int):
+        """Аккорд из HotkeyEngine (уже без автоповтора и дребезга)"""
+        print(f"[HOTKEY] {action} {arg or ''}", flush=True)
+        with trace.span("hotkey", action, arg=arg):
+            if action == "toggle":
+                # Показываем окно мгновенно (используем pre-cached данные)
+                self.show_and_raise()
+            elif action == "switch":
+                self.switch_to_space(arg)
+            elif action == "move":
+                self.move_focused_window(arg)
+
+    def move_focused_window(self, space_num: int):
+        """Перенести активное окно на Space (в фоне: перенос через Mission Control небыстрый)"""
+        def work():
+            window_id = get_focused_window_id()
+            if not window_id:
+                print("[HOTKEY] No focused window", flush=True)
+                return
+            success, message = move_window_to_space(window_id, space_num)
+            print(f"[HOTKEY] Move {window_id} -> {space_num}: {message}", flush=True)
+
+        threading.Thread(target=work, name="hotkey-move", daemon=True).start()
+
     def show_and_raise(self):
         print("[SHOW] show_and_raise called!", flush=True)
         # Fade-in анимация
@@ -1786,25 +2092,33 @@ class SpaceManager(QMainWindow):
         old_active = self.config.get("active_space", 1)
         if focused_ws != old_active:
             print(f"[REFRESH-CACHE] Active workspace: {old_active} -> {focused_ws}", flush=True)
-            self.config["active_space"] = focused_ws
+            self.set_active_space(focused_ws)
             # Обновляем визуальное состояние карточек
             if old_active in self.space_cards:
                 self.space_cards[old_active].set_active(False)
             if focused_ws in self.space_cards:
                 self.space_cards[focused_ws].set_active(True)
 
+        self.apply_display_focus()
+
         # Получаем окна из кэша по workspace
         windows_by_ws = get_windows_by_workspace()
         print(f"[REFRESH-CACHE] Workspaces: {list(windows_by_ws.keys())}, active: {focused_ws}", flush=True)
 
         # Обновляем все SpaceCard с данными из кэша
-        for space_num, card in self.space_cards.items():
-            ws_key = str(space_num)
-            windows = windows_by_ws.get(ws_key, [])
-            card.set_apps(windows)
+        with _ui_refresh["cache"].time(), trace.span("ui", "refresh", source="cache"):
+            for space_num, card in self.space_cards.items():
+                ws_key = str(space_num)
+                windows = windows_by_ws.get(ws_key, [])
+                with _ui_set_apps.time(), trace.span("ui", "set_apps", space=space_num, windows=len(windows)):
+                    card.set_apps(windows)
 
     def refresh_apps(self):
         """Обновить список окон используя данные Hammerspoon"""
+        # Раскладка могла смениться без события от наблюдателя (один stat)
+        if get_space_topology().changed():
+            self._check_topology()
+
         # Обновляем кэш окон (если устарел)
         refresh_windows_cache()
 
@@ -1813,7 +2127,7 @@ class SpaceManager(QMainWindow):
         old_active = self.config.get("active_space", 1)
         if focused_ws != old_active:
             print(f"[REFRESH] Active workspace changed: {old_active} -> {focused_ws}", flush=True)
-            self.config["active_space"] = focused_ws
+            self.set_active_space(focused_ws)
             # Обновляем визуальное состояние карточек
             if old_active in self.space_cards:
                 self.space_cards[old_active].set_active(False)
@@ -1825,68 +2139,67 @@ class SpaceManager(QMainWindow):
         print(f"[REFRESH] AeroSpace workspaces: {list(windows_by_ws.keys())}, active: {focused_ws}", flush=True)
 
         # Обновляем все SpaceCard с данными AeroSpace
-        for space_num, card in self.space_cards.items():
-            ws_key = str(space_num)
-            windows = windows_by_ws.get(ws_key, [])
-            card.set_apps(windows)
-
-        # Сохраняем в конфиг
-        self.config["space_windows"] = {str(k): v for k, v in windows_by_ws.items()}
+        with _ui_refresh["backend"].time(), trace.span("ui", "refresh", source="backend"):
+            for space_num, card in self.space_cards.items():
+                ws_key = str(space_num)
+                windows = windows_by_ws.get(ws_key, [])
+                with _ui_set_apps.time(), trace.span("ui", "set_apps", space=space_num, windows=len(windows)):
+                    card.set_apps(windows)
+
+        # Сохраняем снимок (в журнал попадут только изменившиеся Spaces)
+        for space_num in self.space_cards:
+            if space_num <= self.config["total_spaces"]:
+                self.store_windows(space_num, windows_by_ws.get(str(space_num), []))
 
     def scan_all_spaces(self):
-        """Пройтись по всем Spaces и собрать окна"""
-        import time
+        """Собрать окна всех Spaces в фоне; повторный вызов — отмена"""
+        if self._scan is not None and self._scan.is_alive():
+            print("[SCAN] Cancel requested", flush=True)
+            self._scan.cancel()
+            return
 
-        self.hide()  # Скрыть окно чтобы не мешало
+        scanner = SpaceScanner(HammerspoonScanBackend(), self.config["total_spaces"])
+        # Колбэки идут из потока сканера — в GUI через очередь сигналов
+        scanner.on_progress = self._scan_signals.progress.emit
+        scanner.on_space = self._scan_signals.space.emit
+        scanner.on_switching = self._scan_signals.switching.emit
+        scanner.on_finished = lambda result, cancelled: self._scan_signals.finished.emit(cancelled)
+        self._hidden_for_scan = False
+        self.scan_btn.setText("Scan…")
+        self._scan = ScanThread(scanner).start()
 
-        total = self.config["total_spaces"]
-        original_space = self.config.get("active_space", 1)
-
-        # Собрать окна с каждого Space
-        for space_num in range(1, min(total + 1, 10)):  # Ctrl+1-9 работает до 9
-            # Переключиться на Space
-            key_code = 17 + space_num
-            script = f'tell application "System Events" to key code {key_code} using control down'
-            subprocess.run(["osascript", "-e", script], capture_output=True, timeout=2)
-            time.sleep(0.3)  # Подождать переключения
-
-            # Собрать только видимые окна (свёрнутые глобальные - не привязаны к Space)
-            windows = get_windows_on_current_space(include_minimized=False)
-            if windows:
-                if "space_windows" not in self.config:
-                    self.config["space_windows"] = {}
-                self.config["space_windows"][str(space_num)] = windows[:10]
-
-                # Обновить карточку
-                if space_num in self.space_cards:
-                    self.space_cards[space_num].set_apps(windows)
-
-        # Вернуться на исходный Space
-        if original_space <= 9:
-            key_code = 17 + original_space
-            script = f'tell application "System Events" to key code {key_code} using control down'
-            subprocess.run(["osascript", "-e", script], capture_output=True, timeout=2)
-
-        self.config["active_space"] = original_space
-        self.save_config()
+    def _on_scan_progress(self, done: int, total: int):
+        self.scan_btn.setText(f"{done}/{total} ✕")
+
+    def _on_scan_space(self, space_num: int, windows: list):
+        if windows:
+            self.store_windows(space_num, windows[:10])
+        if space_num in self.space_cards:
+            self.space_cards[space_num].set_apps(windows)
+
+    def _on_scan_switching(self):
+        # Переключение видно пользователю — окно не должно мешать
+        self._hidden_for_scan = self.isVisible()
+        self.hide()
 
-        # Показать окно снова
-        time.sleep(0.3)
-        self.show_and_raise()
+    def _on_scan_finished(self, cancelled: bool):
+        print(f"[SCAN] {'Cancelled' if cancelled else 'Done'}", flush=True)
+        self.scan_btn.setText("Scan All")
+        self._scan = None
+        if self._hidden_for_scan:
+            self._hidden_for_scan = False
+            self.show_and_raise()
 
     def _update_apps_ui(self, windows):
         """Обновить UI с окнами (без свёрнутых - они отдельно)"""
         active = self.config.get("active_space", 1)
 
         # Сохранить окна для текущего Space (только видимые)
-        if "space_windows" not in self.config:
-            self.config["space_windows"] = {}
         if windows:
-            self.config["space_windows"][str(active)] = windows[:10]
-            self.save_config()
+            self.store_windows(active, windows[:10])
 
         # Обновить счётчик свёрнутых на кнопке
-        minimized_count = len(self.config.get("minimized_windows", []))
+        minimized_count = len(self.state.get("minimized_windows", []))
         if minimized_count > 0:
             self.minimized_btn.setText(f"📥 {minimized_count}")
         else:
@@ -1894,7 +2207,7 @@ class SpaceManager(QMainWindow):
 
         # Показать окна на всех карточках (БЕЗ свёрнутых)
         for num, card in self.space_cards.items():
-            saved_windows = self.config.get("space_windows", {}).get(str(num), [])
+            saved_windows = self.saved_windows(num)
 
             if num == active and windows:
                 card.set_apps(windows)
@@ -1905,7 +2218,7 @@ class SpaceManager(QMainWindow):
 
     def show_minimized_menu(self):
         """Показать меню со свёрнутыми окнами"""
-        minimized = self.config.get("minimized_windows", [])
+        minimized = self.state.get("minimized_windows", [])
 
         if not minimized:
             # Пустое меню
@@ -1927,6 +2240,7 @@ class SpaceManager(QMainWindow):
             action.setEnabled(False)
             menu.addAction(action)
             menu.exec(self.minimized_btn.mapToGlobal(self.minimized_btn.rect().topLeft()))
+            menu.deleteLater()
             return
 
         menu = QMenu(self)
@@ -1961,6 +2275,7 @@ class SpaceManager(QMainWindow):
                 menu.addAction(action)
 
         menu.exec(self.minimized_btn.mapToGlobal(self.minimized_btn.rect().topLeft()))
+        menu.deleteLater()
 
     def _unminimize_window(self, app_name: str, title: str):
         """Развернуть свёрнутое окно"""
@@ -1975,26 +2290,15 @@ class SpaceManager(QMainWindow):
 
         # Обновить UI сразу
         old_active = self.config["active_space"]
-        self.config["active_space"] = space_num
+        self.set_active_space(space_num)  # Дозапись в журнал — в фоне
 
         if old_active in self.space_cards:
             self.space_cards[old_active].set_active(False)
         if space_num in self.space_cards:
             self.space_cards[space_num].set_active(True)
 
-        self.save_config()
-
-        # Асинхронно переключить Space (не блокируя UI)
-        # key codes: 18=1, 19=2, 20=3, 21=4, 22=5, 23=6, 24=7, 25=8, 26=9
-        key_code = 17 + space_num
-        script = f'tell application "System Events" to key code {key_code} using control down'
-
-        # Используем Popen чтобы не блокировать
-        subprocess.Popen(
-            ["osascript", "-e", script],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
+        # Переключение — в фоновом потоке действий (не блокируя UI)
+        switch_space(space_num)
 
         # Скрыть окно через 2 секунды
         QTimer.singleShot(2000, self.hide)
@@ -2005,11 +2309,9 @@ class SpaceManager(QMainWindow):
         dialog = RenameDialog(self, space_num, current_name)
         if dialog.exec():
             new_name = dialog.name_edit.text().strip()
-            self.config["space_names"][str(space_num)] = new_name
-            if space_num in self.space_cards:
-                self.space_cards[space_num].set_name(new_name)
-            self.save_config()
-            self.setup_tray()  # Обновить меню трея
+            # Хранилище запишет файл, обновит UI через _on_names_changed
+            # и отправит название в Hammerspoon и SketchyBar
+            self.names.set(space_num, new_name)
 
     def show_settings(self):
         dialog = SettingsDialog(
@@ -2040,6 +2342,13 @@ class SpaceManager(QMainWindow):
         self.hide()
         self.setWindowOpacity(1)
 
+    def event(self, event):
+        if event.type() == QEvent.Type.UpdateRequest:
+            # Отрисовка всего окна идёт синхронно внутри UpdateRequest
+            with _ui_paint.time(), trace.span("ui", "paint"):
+                return super().event(event)
+        return super().event(event)
+
     def closeEvent(self, event):
         event.ignore()
         self.hide_animated()
@@ -2047,7 +2356,41 @@ class SpaceManager(QMainWindow):
 
 class HotkeySignal(QObject):
     """Сигнал для безопасного вызова из другого потока"""
-    toggle = pyqtSignal()
+    action = pyqtSignal(str, int)  # Аккорд из таблицы HotkeyEngine: (действие, номер Space)
+
+
+class PrefetchSignal(QObject):
+    """Предзагрузка окон закончилась (сигнал из фонового потока)"""
+    done = pyqtSignal()
+
+
+class FirstPaintProbe(QObject):
+    """Отметить в разбивке старта первую отрисовку окна и сообщить об этом"""
+    def __init__(self, timeline: StartupTimeline, on_paint):
+        super().__init__()
+        self.timeline = timeline
+        self.on_paint = on_paint
+
+    def eventFilter(self, obj, event):
+        from PyQt6.QtCore import QEvent
+        if event.type() == QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            self.timeline.mark("ui", "first paint")
+            self.on_paint()
+        return False
+
+
+class LayoutSignals(QObject):
+    """Раскладка применена (сигнал из фонового потока действий): (имя, Future)"""
+    applied = pyqtSignal(str, object)
+
+
+class ScanSignals(QObject):
+    """Сигналы сканера Spaces (он работает в своём потоке)"""
+    progress = pyqtSignal(int, int)
+    space = pyqtSignal(int, object)
+    switching = pyqtSignal()
+    finished = pyqtSignal(bool)
 
 
 class DebugEventFilter(QObject):
@@ -2064,73 +2407,83 @@ class DebugEventFilter(QObject):
         return False  # Не перехватываем, просто логируем
 
 
-def precache_windows():
-    """Предварительное кэширование окон через Hammerspoon ДО запуска Qt"""
-    global _windows_cache, _windows_cache_time
-
-    print("[PRE-CACHE] Loading windows via Hammerspoon before Qt...", flush=True)
-    try:
-        # Кэшируем список окон
-        windows = get_hammerspoon_windows_sync()
-        if windows:
-            print(f"[PRE-CACHE] Got {len(windows)} windows", flush=True)
-            _parse_hammerspoon_windows(windows)
-
-        # Кэшируем текущий активный space
-        update_focused_workspace_sync()
-    except Exception as e:
-        print(f"[PRE-CACHE] Error: {e}", flush=True)
-
-# Алиас для совместимости
-precache_aerospace_windows = precache_windows
-
-
 def main():
-    # Кэшируем окна через Hammerspoon ДО создания Qt приложения
-    precache_windows()
-
-    app = QApplication(sys.argv)
-    app.setQuitOnLastWindowClosed(False)
-    app.setApplicationName("Space Manager")
+    from pynput import keyboard
+
+    # Две дорожки старта: окна из Hammerspoon грузятся в фоне, пока строится UI;
+    # первая отрисовка берёт то, что уже есть в кэше, остальное придёт сигналом
+    timeline = StartupTimeline(_STARTED)
+    timeline.add("ui", "imports", _STARTED, time.perf_counter())
+    prefetch_signal = PrefetchSignal()
+    # Запись трафика к Hammerspoon для воспроизведения на другой машине (space_core.recording)
+    recorder = None
+    if os.environ.get("SPACE_MANAGER_RECORD"):
+        from space_core.recording import install_recorder
+        recorder = install_recorder(os.environ["SPACE_MANAGER_RECORD"])
+    # Места роста памяти Python в переписи ресурсов (замедляет каждое выделение)
+    if os.environ.get("SPACE_MANAGER_TRACEMALLOC") == "1":
+        census.start_tracing()
+    prefetch = start_prefetch(timeline, on_done=prefetch_signal.done.emit)
+
+    with timeline.span("ui", "QApplication"):
+        app = QApplication(sys.argv)
+        app.setQuitOnLastWindowClosed(False)
+        app.setApplicationName("Space Manager")
 
     # Глобальный фильтр для отладки
     debug_filter = DebugEventFilter()
     app.installEventFilter(debug_filter)
 
-    window = SpaceManager()
-    window.show_and_raise()  # Показать и загрузить приложения
-
-    # Сигнал для toggle из hotkey потока
+    with timeline.span("ui", "SpaceManager"):
+        window = SpaceManager()
+    window.startup = timeline
+
+    reported = []
+
+    def report_startup():
+        if prefetch.done.is_set() and window.first_painted and not reported:
+            reported.append(True)
+            for line in timeline.report():
+                print(f"[STARTUP] {line}", flush=True)
+
+    def on_first_paint():
+        window.first_painted = True
+        report_startup()
+
+    def on_prefetch_done():
+        window.refresh_apps_from_cache()  # доставить предзагруженные окна в карточки
+        report_startup()
+
+    prefetch_signal.done.connect(on_prefetch_done)
+    if prefetch.done.is_set():
+        on_prefetch_done()  # закончилась раньше, чем подключили сигнал
+    paint_probe = FirstPaintProbe(timeline, on_first_paint)
+    window.installEventFilter(paint_probe)
+    with timeline.span("ui", "show"):
+        window.show_and_raise()  # Показать из того, что уже в кэше
+    app.aboutToQuit.connect(get_thumbnail_loader().shutdown)
+    app.aboutToQuit.connect(window.flush_config)
+    if recorder is not None:
+        app.aboutToQuit.connect(recorder.close)
+
+    # Сигнал для действий из hotkey потока
     hotkey_signal = HotkeySignal()
-    hotkey_signal.toggle.connect(window.show_and_raise)
+    hotkey_signal.action.connect(window.handle_hotkey)
 
-    # Глобальный hotkey: Ctrl+`
-    current_keys = set()
-    tilde_codes = {'`', '~', '§', '±'}  # Разные раскладки
-
-    def on_press(key):
-        current_keys.add(key)
-        # Ctrl + ` (тильда)
-        is_tilde = False
-        try:
-            if hasattr(key, 'char') and key.char in tilde_codes:
-                is_tilde = True
-        except:
-            pass
-        if keyboard.Key.ctrl in current_keys and is_tilde:
-            # Показываем окно мгновенно (используем pre-cached данные)
-            hotkey_signal.toggle.emit()
-
-    def on_release(key):
-        current_keys.discard(key)
+    # Глобальные hotkeys: таблица аккордов в space_core.hotkeys.DEFAULT_CHORDS
+    engine = HotkeyEngine(dispatch=hotkey_signal.action.emit)
+    window.hotkeys = engine
 
     # Запуск listener в отдельном потоке
-    listener = keyboard.Listener(on_press=on_press, on_release=on_release)
+    listener = keyboard.Listener(
+        on_press=lambda key: engine.press(key_name(key)),
+        on_release=lambda key: engine.release(key_name(key)),
+    )
     listener.daemon = True
     listener.start()
 
     print("Space Manager запущен!", flush=True)
-    print("Hotkey: Ctrl+`", flush=True)
+    print("Hotkeys: Ctrl+` — показать, Ctrl+Alt+N — Space N, Ctrl+Alt+Shift+N — перенести окно", flush=True)
 
     sys.exit(app.exec())
 